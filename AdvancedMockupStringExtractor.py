@@ -31,32 +31,63 @@ into XML-files that can be used as input for translation-memory-systems.
 __version__ = "1.0.3"
 
 import argparse
+import collections
+import copy
+import cProfile
 import glob
 import logging
+import multiprocessing
+import multiprocessing.pool
 import os
+import posixpath
 import re
+import sqlite3
+import subprocess
 import sys
+import tarfile
+import threading
+import time
+import zipfile
+import zlib
 
 from lxml import etree
 
+from BmprReader import BmprReader
+from ExportReader import ExportReader
+from ExtractionCache import ExtractionCache
+from ExtractionResult import Diagnostic, ExtractionError, ExtractionResult
+from ExtractionStatistics import ExtractionStatistics, NullStatistics
+from GitChanges import GitChanges
+from MockupFileFinder import MockupFileFinder
 from OutputExporter import OutputExporter
+from PseudoLocalizer import PseudoLocalizer
 from TextElement import TextElement
-from TextFormatFixer import TextFormatFixer
+from TextNormalizer import TextNormalizer
+from SqliteTextRegistry import SqliteTextRegistry
+from TextRegistry import TextRegistry
 
 logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.WARNING)
 
 class AdvancedMockupStringExtractor():
-    """Class handling the extracting-process of text from Mockup-files."""
+    """ Class handling the extracting-process of text from Mockup-files.
+
+        The extracted texts, the ignored texts and the diagnostics are held by every instance. The method extract
+        works on a copy of the extractor with its own texts, so one extractor can extract many projects, also from
+        several threads at once, as long as they do not share a cache or statistics.
+    """
 
     controlElementsWithText = ["com.balsamiq.mockups::Label", "com.balsamiq.mockups::Paragraph", "com.balsamiq.mockups::TextArea", "com.balsamiq.mockups::TextInput", "com.balsamiq.mockups::SubTitle", "com.balsamiq.mockups::Button", "com.balsamiq.mockups::RadioButton", "com.balsamiq.mockups::Accordion", "com.balsamiq.mockups::Tooltip", "com.balsamiq.mockups::IconLabel", "com.balsamiq.mockups::ComboBox", "com.balsamiq.mockups::ButtonBar", "com.balsamiq.mockups::TabBar", "com.balsamiq.mockups::CheckBox", "com.balsamiq.mockups::Link"]
     # pylint: disable-msg=W0105
     """List of names of mockup-elements containing text."""
 
-    texts = []
-    """List with all recognized text in balsamiq-objects."""
-    
-    ignored = []
-    """List with ignored texts in balsamiq-objects."""
+    controlHandlers = dict([(control_type, 'extract_text_from_control') for control_type in controlElementsWithText] +
+                           [("com.balsamiq.mockups::ButtonBar", 'extract_text_from_buttonbar_tabbar'),
+                            ("com.balsamiq.mockups::TabBar", 'extract_text_from_buttonbar_tabbar'),
+                            ("com.balsamiq.mockups::ComboBox", 'extract_text_from_combobox')])
+    """Names of the methods extracting the texts of mockup-elements by the names of the mockup-elements containing text."""
+
+    controlPropertyTags = frozenset(['customID', 'text', 'customData'])
+    """Tags of the properties of mockup-elements read by the extraction."""
 
     IgnoreTags = ["IGNORE", "IGNOREEXCLUDE"]
     """Tag indicating that element in balsamiq-file should be ignored."""
@@ -64,52 +95,425 @@ class AdvancedMockupStringExtractor():
     listItemPattern = re.compile('\*%20[a-zA-z0-9 ]*(%0A){0,1}')
     """Pattern of regular expression that will be used to determine if a text containes list-items."""
 
+    listItemSeparatorPattern = re.compile('\*%20')
+    """Pattern of regular expression that separates the list-items of a text."""
+
+    boldPattern = re.compile(r'\*(.*?)\*')
+    """Pattern of regular expression that matches markdown-markup for bold text."""
+
+    italicPattern = re.compile(r'_(.*?)_')
+    """Pattern of regular expression that matches markdown-markup for italic text."""
+
+    whitespacePattern = re.compile('\s+')
+    """Pattern of regular expression that matches a sequence of whitespaces."""
+
+    archiveExtensions = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2')
+    """Extensions of the archives whose mockup-files are read without unpacking them."""
+
+    copySources = 256
+    """Number of files whose events are kept for copies of them, the files used last are kept."""
 
-    def __init__(self, input_file_dir=None, fake=None, force=False):
+    EVENT_FORMAT = 6
+    """Version of the events recorded for a mockup-file, cached events of other versions are not used."""
+
+    baseline_texts = frozenset()
+    """Texts of a previous export the ignored texts are looked up in as well, see check_baseline."""
+
+
+    def __init__(self, input_file_dir=None, force=False, jobs=1, cache=None, finder=None, statistics=None, spill_directory=None):
         """ Constructor.
-            If input_file is given, only this file will be parsed. Otherwise all bmml-files in directory and subdirectories
-            will be parsed.
+            If input_file_dir is given, the texts of this file or of the mockup-files in this directory are extracted
+            into the extractor. Use extract instead to get the texts of a project as ExtractionResult.
 
             @param input_file_dir: file or directory that should be parsed (default None)
+            @param force: flag indicating if the extraction should go on after errors (default False)
+            @param jobs: number of processes that parse mockup-files in parallel, 0 for one per cpu (default 1)
+            @param cache: ExtractionCache holding the elements of unchanged files from former runs (default None)
+            @param finder: MockupFileFinder searching directories recursively for mockup-files (default None)
+            @param statistics: ExtractionStatistics recording timings and counters of the extraction (default None)
+            @param spill_directory: directory the texts are stored in by a SqliteTextRegistry instead of memory (default None)
         """
-        self.faketranslation = fake
         self.force = force
+        self.jobs = jobs
+        self.cache = cache
+        self.finder = finder
+        self.statistics = statistics or NullStatistics()
+        self.spill_directory = spill_directory
+        self.reset()
         if input_file_dir:
-            if os.path.isfile(input_file_dir):
-                self.extract_text(input_file_dir)
-            else:
-                self.extract_text_from_directory(input_file_dir)
+            self.extract_input(input_file_dir)
+
+    def reset(self):
+        """Remove all extracted texts, ignored texts and diagnostics from the extractor."""
+        if self.spill_directory:
+            self.texts = SqliteTextRegistry(directory=self.spill_directory)
+        else:
+            self.texts = TextRegistry()
+        self.ignored = []
+        self.diagnostics = []
+
+    def extract(self, input_file_dir, check=False):
+        """ Extract the texts of a mockup-file or of all mockup-files in a directory and return them.
+            The texts are extracted by a copy of the extractor, so the extractor itself is not changed.
+
+            If the mockups are checked, the extraction is not aborted by errors, so all problems are collected in
+            one pass, and elements without identifier and ignored texts without not ignored text are reported too.
+
+            @param input_file_dir: file or directory that should be parsed.
+            @param check: flag indicating if the mockups are checked (default False)
+            @return: ExtractionResult holding the texts, the ignored texts and the diagnostics.
+            @raise ExtractionError: if an error in the mockups aborts the extraction and the force-flag is not set.
+        """
+        extraction = copy.copy(self)
+        extraction.reset()
+        if check:
+            extraction.force = True
+        extraction.extract_input(input_file_dir)
+        if check:
+            extraction.check_texts()
+        return extraction.result()
+
+    def extract_changed(self, input_file_dir, changed_files, baseline, check=False, replaced=()):
+        """ Extract the texts of the changed mockup-files only and check them against the texts of a previous export.
+            Only the files found like by extract whose path is one of the changed files are parsed. The texts are held
+            in memory, because the changed files are few.
+
+            @param input_file_dir: file or directory that should be parsed.
+            @param changed_files: paths of the added and modified files, like listed by GitChanges.
+            @param baseline: TextElements read by ExportReader from the previous export of the unchanged files.
+            @param check: flag indicating if the mockups are checked (default False)
+            @param replaced: TextElements read by ExportReader from the previous export of the changed and deleted files (default ())
+            @return: ExtractionResult holding the texts that are not in the baseline, the ignored texts and the diagnostics.
+            @raise ExtractionError: if an error in the mockups aborts the extraction and the force-flag is not set.
+        """
+        changed = set(os.path.normpath(changed_file) for changed_file in changed_files)
+        if os.path.isfile(input_file_dir):
+            input_files = [input_file_dir]
         else:
-            self.extract_text_from_directory(".")
+            input_files = self.find_input_files(input_file_dir, self.finder)
+        extraction = copy.copy(self)
+        extraction.spill_directory = None
+        extraction.reset()
+        if check:
+            extraction.force = True
+        extraction.extract_text_from_files(input_file for input_file in input_files if os.path.normpath(input_file) in changed)
+        extraction.warn_shared_identifiers(baseline, replaced)
+        extraction.check_baseline(baseline)
+        if check:
+            extraction.check_texts()
+        return extraction.result()
+
+    def warn_shared_identifiers(self, baseline, replaced):
+        """ Log a warning if the extracted texts or the previous texts of the changed and deleted files share identifiers
+            with texts of the unchanged files, or if previous texts of these files are not found anymore. A full
+            extraction keeps only the first of equal texts of several files, so the previous export can lack texts of
+            the unchanged files that were exported for a changed or deleted file only, and the merged export lacks them too.
+            The texts of elements holding more than one text are never left out, so they are not compared.
+
+            @param baseline: TextElements read by ExportReader from the previous export of the unchanged files.
+            @param replaced: TextElements read by ExportReader from the previous export of the changed and deleted files.
+        """
+        exporter = OutputExporter([])
+        extracted = set(exporter.exported_element(text) for text in self.texts if text.index == '')
+        kept = set(text for text in baseline if text.index == '')
+        replaced = [text for text in replaced if text.index == '']
+        identifiers = set(text.identifier for text in extracted)
+        identifiers.update(text.identifier for text in replaced)
+        shared = identifiers.intersection(text.identifier for text in kept)
+        shared.update(text.identifier for text in replaced if text not in extracted and text not in kept)
+        if shared:
+            shared = sorted(shared)
+            logging.warning("%d IDs of changed or deleted files are used in unchanged files as well or their texts are not found anymore, equal texts of unchanged files can be missing from the merged export, run without --since for a complete export: %s",
+                            len(shared), ', '.join(shared[:10]) + (', ...' if len(shared) > 10 else ''))
+
+    def check_baseline(self, baseline):
+        """ Check the extracted texts against the texts of a previous export, like they were extracted together.
+            Texts with the same identifier but a different text than a text of the export are reported, texts equal
+            to a text of the export are removed. Like by add_combined_text_element, the texts of elements holding more
+            than one text are kept unchecked. The texts are compared in the form they are read back from an export.
+
+            @param baseline: TextElements read by ExportReader from the previous export.
+        """
+        previous = {}
+        for text in baseline:
+            previous.setdefault(text.identifier, []).append(text)
+        self.baseline_texts = frozenset(text.text for text in baseline)
+        exporter = OutputExporter([])
+        texts, self.texts = self.texts, TextRegistry()
+        for text in texts:
+            if text.index != '':
+                self.texts.append(text)
+                continue
+            exported = exporter.exported_element(text)
+            others = previous.get(exported.identifier, [])
+            if exported in others:
+                self.statistics.count('deduplicated_texts')
+                continue
+            self.texts.append(text)
+            for old in others:
+                if old.text != exported.text:
+                    self.report(logging.ERROR, 'conflicting_id', text.filename, text.identifier, "Element has got same ID but different text like element of previous export: \n\tID: %s\n\ttext: %s\n\tfilename: %s\n\n\tID: %s\n\ttext: %s\n\tfilename: %s", exported.identifier, exported.text, exported.filename, old.identifier, old.text, old.filename)
+                    if not self.force:
+                        self.abort()
+
+    def extract_input(self, input_file_dir):
+        """ Extract the texts of a mockup-file or of all mockup-files in a directory into the extractor.
+
+            @param input_file_dir: file or directory that should be parsed.
+        """
+        if os.path.isfile(input_file_dir):
+            self.extract_text_from_files([input_file_dir])
+        else:
+            self.extract_text_from_directory(input_file_dir)
+
+    def result(self):
+        """ Return the texts, ignored texts and diagnostics extracted so far as ExtractionResult.
+            Texts spilled to disk are not read into memory, the result holds the SqliteTextRegistry instead.
+        """
+        texts = self.texts
+        if not texts.spilled:
+            texts = tuple(texts)
+        return ExtractionResult(texts, tuple(self.ignored), tuple(self.diagnostics))
 
 
     def extract_text(self, input_file):
         """ Extract text from mockup-elements by calling corresponding method for each mockup-element-type.
+            The file is parsed by a MockupFileExtraction, the elements found are added when the whole file was parsed.
 
             Keyword arguments:
             @param input_file: mockup-file that should be parsed for texts.
         """
-        logging.info("Extracting text from file " + input_file)
-        try:
-            tree = etree.parse(input_file)
-        except etree.XMLSyntaxError:
-            logging.error("XML syntaxerror in file " + input_file)
-            if self.force:
-                return
-            else:
-                sys.exit(-1)
-        root = tree.getroot()
-        for element in root.iter():
-            try:
-                self.extract_element_info(element, input_file)
-            except KeyError:
-                pass
+        self.add_events(extract_file_events(self.file_arguments(input_file)))
 
     def extract_text_from_directory(self, input_path):
-        for infile in glob.glob(os.path.join(input_path, '*.bmml')):
-                self.extract_text(infile)
-        for infile in glob.glob(os.path.join(input_path + "/assets", '*.bmml')):
-                self.extract_text(infile)
+        """ Extract text from the mockup-files and project-files in a directory and in its subdirectory assets.
+            If a MockupFileFinder is given, all mockup-files found by it in the directory-tree are parsed instead.
+
+            @param input_path: directory that should be searched for mockup-files.
+        """
+        if self.finder:
+            self.extract_text_from_files(self.statistics.timed('discovery', self.find_input_files(input_path, self.finder)))
+            return
+        with self.statistics.stage('discovery'):
+            input_files = self.find_input_files(input_path)
+        self.extract_text_from_files(input_files)
+
+    @staticmethod
+    def find_input_files(input_path, finder=None):
+        """ Return the mockup-files and project-files in a directory and in its subdirectory assets.
+            If a MockupFileFinder is given, an iterator over all files found by it in the directory-tree is returned.
+
+            @param input_path: directory that should be searched for mockup-files.
+            @param finder: MockupFileFinder searching directories recursively for mockup-files (default None)
+        """
+        if finder:
+            return finder.find(input_path)
+        input_files = []
+        for directory in (input_path, input_path + "/assets"):
+            input_files.extend(glob.glob(os.path.join(directory, '*.bmml')))
+            input_files.extend(glob.glob(os.path.join(directory, '*.bmpr')))
+        return input_files
+
+    def extract_text_from_files(self, input_files):
+        """ Extract text from all given mockup-files in the given order.
+            The files can be given by an iterator, they are parsed while it yields further files. If a cache is given,
+            only files that changed since they were cached are parsed, their state is taken for the cache before they
+            are parsed. Files with the same content as a file parsed
+            before are not parsed again, the events of that file are used with the name of the copy instead. Only the
+            events of the copySources files used last are kept, so the memory does not grow with the number of files.
+            A copy of a file whose events were dropped is parsed and its events are kept for further copies.
+            If more than one job is configured, the files are parsed by a pool of processes. The elements found are
+            added in the order of the files, so the result is the same as parsing them one after another.
+
+            @param input_files: iterable of mockup-files that should be parsed for texts.
+        """
+        settings = None
+        if self.cache:
+            settings = self.cache_settings()
+        jobs = self.jobs or multiprocessing.cpu_count()
+        if isinstance(input_files, list) and len(input_files) < 2:
+            jobs = 1
+        with self.statistics.stage('extraction'):
+            pool = None
+            pending = collections.deque()
+            contents = ContentIndex()
+            sources = collections.OrderedDict()
+            try:
+                for infile in input_files:
+                    events = None
+                    if self.cache:
+                        events = self.cache.get(infile, settings)
+                    if events is not None:
+                        pending.append((infile, events, False, None, None))
+                        self.add_pending_events(pending, settings, False)
+                        continue
+                    state = None
+                    if self.cache:
+                        state = self.cache.file_state(infile)
+                    original = contents.find_copy(infile)
+                    if original in sources:
+                        source_file, events = sources[original] = sources.pop(original)
+                        pending.append((infile, events, True, source_file, state))
+                    else:
+                        if jobs > 1:
+                            if pool is None:
+                                pool = multiprocessing.Pool(jobs)
+                            events = pool.apply_async(extract_file_events, [self.file_arguments(infile)])
+                        else:
+                            events = extract_file_events(self.file_arguments(infile))
+                        sources[original or infile] = (infile, events)
+                        pending.append((infile, events, True, None, state))
+                        if len(sources) > self.copySources:
+                            sources.popitem(False)
+                    self.add_pending_events(pending, settings, False)
+                self.add_pending_events(pending, settings, True)
+            finally:
+                if pool:
+                    pool.terminate()
+                    pool.join()
+                if self.cache:
+                    self.cache.commit()
+
+    def add_pending_events(self, pending, settings, wait):
+        """ Add the events of the files at the front of a queue as long as they are available.
+            The events of copies are taken from the file with the same content and renamed to the copy.
+            Events that were parsed are stored in the cache before, without the statistics of the file.
+
+            @param pending: queue of tuples of file, events or result of a worker-process, flag if the file was parsed,
+                            the file the file is a copy of or None and the state of the file for the cache or None.
+            @param settings: string describing the settings the events were recorded with.
+            @param wait: flag indicating if the method should wait for the results of the worker-processes.
+        """
+        while pending:
+            infile, events, parsed, original, state = pending[0]
+            if isinstance(events, multiprocessing.pool.AsyncResult):
+                if not wait and not events.ready():
+                    return
+                events = events.get()
+            pending.popleft()
+            if original is not None:
+                events = self.renamed_events(events, original, infile)
+                self.statistics.count('copied_files')
+            elif parsed:
+                self.statistics.count('parsed_files')
+            else:
+                self.statistics.count('cached_files')
+            if parsed and self.cache:
+                self.cache.put(infile, settings, [event for event in events if event[0] != 'stats'], state)
+            with self.statistics.stage('checks'):
+                self.add_events(events)
+
+    @staticmethod
+    def renamed_events(events, original, copy_file):
+        """ Return the events recorded for a mockup-file as if they were recorded for a copy of it.
+            The name of the file is replaced in the filenames of elements and diagnostics and in the log-messages.
+            Statistics of the file are left out, as the copy was not parsed.
+
+            @param events: list of events recorded while parsing the mockup-file.
+            @param original: path of the mockup-file.
+            @param copy_file: path of the copy.
+        """
+        def rename(filename):
+            if filename and (filename == original or filename.startswith(original + '!')):
+                return copy_file + filename[len(original):]
+            return filename
+        renamed = {}
+        result = []
+        for event in events:
+            if event[0] in ('text', 'combined', 'ignored'):
+                element = renamed.get(id(event[1]))
+                if element is None:
+                    old = event[1]
+                    element = TextElement(old.identifier, old.text, rename(old.filename), old.meta, old.index)
+                    renamed[id(old)] = element
+                event = (event[0], element)
+            elif event[0] == 'diagnostic':
+                event = ('diagnostic', event[1]._replace(filename=rename(event[1].filename),
+                                                         message=event[1].message.replace(original, copy_file)))
+            elif event[0] == 'log':
+                event = ('log', logging.makeLogRecord(dict(event[1].__dict__, msg=event[1].getMessage().replace(original, copy_file), args=None)))
+            elif event[0] == 'stats':
+                continue
+            result.append(event)
+        return result
+
+    def cache_settings(self):
+        """Return a string describing all settings that change the events recorded for a mockup-file."""
+        return repr((__version__, self.EVENT_FORMAT, self.force, logging.getLogger().getEffectiveLevel(), sorted(self.controlHandlers.items())))
+
+    def add_events(self, events):
+        """ Add the elements found by a MockupFileExtraction to the extracted texts.
+            Log-messages are emitted and the elements are checked as if the file was parsed by this extractor.
+
+            @param events: list of events recorded while parsing a mockup-file.
+        """
+        for event in events:
+            if event[0] == 'text':
+                self.add_text_element(event[1])
+            elif event[0] == 'combined':
+                self.add_combined_text_element(event[1])
+            elif event[0] == 'ignored':
+                self.add_ignored_element(event[1])
+            elif event[0] == 'diagnostic':
+                self.add_diagnostic(event[1])
+            elif event[0] == 'log':
+                logging.getLogger(event[1].name).handle(event[1])
+            elif event[0] == 'stats':
+                self.statistics.add_file(event[1], event[2])
+            elif event[0] == 'abort':
+                self.abort()
+
+    def add_text_element(self, new_text_element):
+        """ Add a text-element to the extracted texts if there is no equal element extracted yet.
+            Before, the element is checked for other elements with same ID but different text.
+
+            @param new_text_element: text-element that should be added.
+        """
+        self.checkElementIdUnique(new_text_element)
+        if new_text_element not in self.texts:
+            self.texts.append(new_text_element)
+            self.statistics.count('texts')
+        else:
+            self.statistics.count('deduplicated_texts')
+
+    def add_combined_text_element(self, new_text_element):
+        """ Add a text-element of an element holding more than one text to the extracted texts.
+
+            @param new_text_element: text-element that should be added.
+        """
+        self.texts.append(new_text_element)
+        self.statistics.count('combined_texts')
+
+    def add_ignored_element(self, new_text_element):
+        """ Add a text-element that is set to be ignored to the ignored texts.
+
+            @param new_text_element: text-element that should be added.
+        """
+        self.ignored.append(new_text_element)
+        self.statistics.count('ignored_texts')
+
+    def add_diagnostic(self, diagnostic):
+        """ Add a problem found in the mockups to the diagnostics.
+
+            @param diagnostic: Diagnostic that should be added.
+        """
+        self.diagnostics.append(diagnostic)
+
+    def report(self, level, code, filename, identifier, message, *args):
+        """ Add a problem found in the mockups to the diagnostics and log it.
+
+            @param level: logging-level the problem is reported with.
+            @param code: name of the kind of problem.
+            @param filename: name of the file containing the problem.
+            @param identifier: identifier of the element with the problem or None.
+            @param message: log-message, formatted with args.
+        """
+        self.add_diagnostic(Diagnostic(level, code, message % args if args else message, filename, identifier))
+        logging.log(level, message, *args)
+
+    def abort(self):
+        """Abort the extraction because of an error in the mockups by raising an ExtractionError."""
+        raise ExtractionError(self.result())
 
     def get_control_property(self, control_properties, tag):
         """ Return the text contained in an element-property with tag-element tag.
@@ -123,6 +527,46 @@ class AdvancedMockupStringExtractor():
                 return control_prop.text
         return None #control-property not contained in properties of control
 
+    def get_control_properties(self, control_properties):
+        """ Return the texts of the properties customID, text and customData of an element, read in one scan of its properties.
+            Like get_control_property, the first property with a tag is returned, missing properties are not contained.
+
+            Keyword arguments:
+            @param control_properties: properties of an element.
+            @return: dictionary of the texts of the properties by their tags.
+        """
+        result = {}
+        for control_prop in control_properties:
+            tag = control_prop.tag
+            if tag in self.controlPropertyTags and tag not in result:
+                result[tag] = control_prop.text
+        return result
+
+    def register_control_type(self, control_type, handler='extract_text_from_control'):
+        """ Register a type of mockup-elements containing text, like com.balsamiq.mockups::Title, for this extractor.
+            The handler is the name of the method extracting the texts of the elements: extract_text_from_control for
+            elements with one text, extract_text_from_buttonbar_tabbar for comma-separated items and
+            extract_text_from_combobox for items in lines. The control-types of the class are not changed, the extractor
+            gets own copies of them, so other extractors and extractions that are running are not affected.
+
+            @param control_type: name of the type of mockup-elements including the prefix com.balsamiq.mockups::.
+            @param handler: name of the method extracting the texts (default extract_text_from_control)
+        """
+        if not callable(getattr(self, handler, None)):
+            raise ValueError("Unknown handler %s for control-type %s" % (handler, control_type))
+        self.controlHandlers = dict(self.controlHandlers)
+        self.controlHandlers[control_type] = handler
+        if control_type not in self.controlElementsWithText:
+            self.controlElementsWithText = self.controlElementsWithText + [control_type]
+
+    def file_arguments(self, input_file):
+        """ Return the arguments of extract_file_events for a mockup-file. The control-types are only passed if
+            control-types were registered for the extractor, otherwise the worker uses the control-types of the class.
+
+            @param input_file: mockup-file that should be parsed.
+        """
+        return (input_file, self.force, self.statistics.enabled, vars(self).get('controlHandlers'))
+
     def get_control_id(self, control_properties, input_file):
         """ Return the control-id of an element.
 
@@ -143,8 +587,15 @@ class AdvancedMockupStringExtractor():
             Keyword arguments:
             @param control_properties: properties of an element.
         """
-        result = self.substitute_formatingchars(self.get_control_property(control_properties, 'text'))
-        return TextFormatFixer.fix_text(result)
+        return self.normalize_text(self.get_control_property(control_properties, 'text'))
+
+    def normalize_text(self, text):
+        """ Return the text of an element in the format used in exported texts.
+
+            Keyword arguments:
+            @param text: text-property of an element.
+        """
+        return TextNormalizer.normalize_text(text)
 
     def get_metainformation(self, control_properties):
         """ Return the metainformation contained in an element.
@@ -154,6 +605,16 @@ class AdvancedMockupStringExtractor():
         """
         return self.substitute_formatingchars(self.get_control_property(control_properties, 'customData'))
 
+    def add_missing_id(self, element, input_file, text):
+        """ Add an element with text but without identifier to the diagnostics without logging it.
+            Elements without identifier are skipped by the extraction, they are reported by check_texts.
+
+            @param element: xml-element from mockup-file.
+            @param input_file: name of input-file.
+            @param text: normalized text of the element.
+        """
+        self.add_diagnostic(Diagnostic(logging.WARNING, 'missing_id', "Element without ID\n\tcontrolType: %s\n\ttext: %s\n\tfile: %s\n" % (element.get("controlTypeID"), text, input_file), input_file, None))
+
     def element_should_be_ignored(self, control_id):
         """ Return if an element and its text should be irgnored.
 
@@ -170,17 +631,30 @@ class AdvancedMockupStringExtractor():
             For example this can happen if the user gives the id to a group of elements containing the
             element with text instead of giving the id to the element with text.
 
-            If there is an element that has an id but should have no text, the program is aborted with a warning
+            If there is an element that has an id but should have no text, the extraction is aborted with a warning
             if the force-flag is not set to true.
         """
         for prop in element:
             id = self.get_control_id(prop, input_file)
             if id and not self.element_should_be_ignored(id):
-                logging.warning("Element with ID should have no text\n\tID: %s\n\tcontrolType: %s\n\tfile: %s\n", id, element.attrib["controlTypeID"], input_file)
+                self.report(logging.WARNING, 'id_without_text', input_file, id, "Element with ID should have no text\n\tID: %s\n\tcontrolType: %s\n\tfile: %s\n", id, element.attrib["controlTypeID"], input_file)
                 if not self.force:
-                    sys.exit(-1)
+                    self.abort()
 
     def extract_element_info(self, element, input_file):
+        """ Extract text from a mockup-element by calling the method registered for its control-type in controlHandlers.
+            Elements of control-types without text are checked not to have an identifier instead.
+
+            @param element: xml-element from mockup-file.
+            @param input_file: name of input-file.
+        """
+        handler = self.controlHandlers.get(element.attrib["controlTypeID"])
+        if handler is None:
+            self.checkElementWithoutText(element, input_file)
+            return
+        getattr(self, handler)(element, input_file)
+
+    def extract_text_from_control(self, element, input_file):
         """ Extract text from default mockup-elements (text, button etc.)
             Give error-message if there is already an element with same ID but different text.
             Appends all text-information as instance of class TextElement to list.
@@ -188,45 +662,35 @@ class AdvancedMockupStringExtractor():
             @param element: xml-element from mockup-file.
             @param input_file: name of input-file.
         """
-        if element.attrib["controlTypeID"] not in self.controlElementsWithText:
-            self.checkElementWithoutText(element, input_file)
-            return
-        if element.attrib["controlTypeID"] == "com.balsamiq.mockups::ButtonBar" or element.attrib["controlTypeID"] == "com.balsamiq.mockups::TabBar":
-            return self.extract_text_from_buttonbar_tabbar(element, input_file)
-        elif element.attrib["controlTypeID"] == "com.balsamiq.mockups::ComboBox":
-            return self.extract_text_from_combobox(element, input_file)
         for control_properties in element:
-            control_id = self.get_control_id(control_properties, input_file)
-            text = self.get_text(control_properties)
-            if self.get_control_property(control_properties, 'customData'):
-                metainfo = self.substitute_formatingchars(self.get_control_property(control_properties, 'customData'))
+            properties = self.get_control_properties(control_properties)
+            control_id = properties.get('customID') or False
+            text = self.normalize_text(properties.get('text'))
+            if not control_id:
+                if text:
+                    self.add_missing_id(element, input_file, text)
+                continue
+            if properties.get('customData'):
+                metainfo = self.substitute_formatingchars(properties['customData'])
             else:
                 metainfo = None
             try:
-                if self.faketranslation:
-                    new_text_element = TextElement(control_id, '#'+ self.faketranslation + '# ' + text + ' #' + self.faketranslation + '#', input_file, metainfo)
-                else:
-                    new_text_element = TextElement(control_id, text, input_file, metainfo)
+                new_text_element = TextElement(control_id, text, input_file, metainfo)
                 if not self.element_should_be_ignored(control_id):
-                    self.checkElementIdUnique(new_text_element)
-                    if new_text_element in self.texts:
-                        pass
-                    else:
-                        self.texts.append(new_text_element)
+                    self.add_text_element(new_text_element)
                 else:
-                    self.ignored.append(new_text_element)
+                    self.add_ignored_element(new_text_element)
             except AttributeError:
                 pass
 
     def checkElementIdUnique(self, newElement):
         """ Check if an element with same ID was already extracted. If so, check if texts of both elements are the same.
-            If the texts are not the same, exit program with an error-message.
+            If the texts are not the same, abort the extraction with an error-message.
         """
-        for oldElement in self.texts:
-            if oldElement.identifier == newElement.identifier and oldElement.text != newElement.text:
-                logging.error("Element has got same ID but different text like other element: \n\tID: %s\n\ttext: %s\n\tfilename: %s\n\n\tID: %s\n\ttext: %s\n\tfilename: %s", newElement.identifier, newElement.text, newElement.filename, oldElement.identifier, oldElement.text, oldElement.filename)
-                if not self.force:
-                    sys.exit(-1)
+        for oldElement in self.texts.conflicts(newElement):
+            self.report(logging.ERROR, 'conflicting_id', newElement.filename, newElement.identifier, "Element has got same ID but different text like other element: \n\tID: %s\n\ttext: %s\n\tfilename: %s\n\n\tID: %s\n\ttext: %s\n\tfilename: %s", newElement.identifier, newElement.text, newElement.filename, oldElement.identifier, oldElement.text, oldElement.filename)
+            if not self.force:
+                self.abort()
 
     def get_text_from_combined_element(self, element, input_file, seperator):
         """ Extracts texts from element holding more than one text. TextElements will return an index to make sure that
@@ -238,17 +702,23 @@ class AdvancedMockupStringExtractor():
             @parameter seperator: seperator that is used to divide different texts in the text-property.
         """
         for control_properties in element:
-            control_id = self.get_control_id(control_properties, input_file)
-            texts = self.get_text(control_properties).split(seperator)
-            if self.get_control_property(control_properties, 'customData'):
-                metainfo = self.substitute_formatingchars(self.get_control_property(control_properties, 'customData'))
+            properties = self.get_control_properties(control_properties)
+            control_id = properties.get('customID') or False
+            text = self.normalize_text(properties.get('text'))
+            if not control_id:
+                if text:
+                    self.add_missing_id(element, input_file, text)
+                continue
+            texts = text.split(seperator)
+            if properties.get('customData'):
+                metainfo = self.substitute_formatingchars(properties['customData'])
             else:
                 metainfo = None
             index = 0
             for text in texts:
                 try:
                     if not self.element_should_be_ignored(control_id):
-                        self.texts.append(TextElement(control_id + "_" + text.replace(' ', ''), text, input_file, metainfo, index))
+                        self.add_combined_text_element(TextElement(control_id + "_" + text.replace(' ', ''), text, input_file, metainfo, index))
                         index = index + 1
                 except AttributeError:
                     pass
@@ -277,7 +747,7 @@ class AdvancedMockupStringExtractor():
         if not self.containes_unordered_list(text):
             return text
         else:
-            items = re.split('\*%20', text)
+            items = self.listItemSeparatorPattern.split(text)
             result = '<ul>'
             for item in items:
                 if item:#item not empty
@@ -291,54 +761,387 @@ class AdvancedMockupStringExtractor():
             @param text: Text element from mockup containing format-information.
             @return: Tuple containing text and format-information.
         """
-        result = ""
-        try:
-            result = text.replace("%0A", "<br />") #prevend newlines from beeing unquoted
-            result = self.remove_multiple_whitespaces(result)
-            result = result.replace("breakNewLine", ' <br />')
-            result = result.replace("<br /> ", "<br />")
-            result = result.replace(" <br />", "<br />")
-            result = result.replace(" <li>", "<li>") 
-            result = result.replace("<li> ", "<li>") 
-            result = self.substitute_bold(result)
-        except AttributeError:
-            logging.debug("Trying to substitute formating and html-chars in empty string.")
-        return result
+        return TextNormalizer.normalize_markup(text)
 
     def substitute_bold(self, text):
         """Return text where markdown-markup for bold text (with two asterixes) is replaced with html-markup for bold text."""
-        return re.sub(r'\*(.*?)\*', r'<b>\1</b>', text)
+        return self.boldPattern.sub(r'<b>\1</b>', text)
 
     def substitute_italic(self, text):
         """Return text where markdown-markup for italic text (with two underscores) is replaced with html-markup for italic text."""
-        return re.sub(r'_(.*?)_', r'<i>\1</i>', text)
+        return self.italicPattern.sub(r'<i>\1</i>', text)
 
     def remove_multiple_whitespaces(self, text):
         """Return text where multiple whitespaces are replaced with only one whitespace."""
-        return re.sub( '\s+', ' ', text).strip()
+        return self.whitespacePattern.sub(' ', text).strip()
+
+    def check_texts(self):
+        """ Report the elements without identifier found by the extraction and check the ignored texts.
+            Elements with same identifier but different text were already reported while they were extracted.
+        """
+        for diagnostic in list(self.diagnostics):
+            if diagnostic.code == 'missing_id':
+                logging.log(diagnostic.level, diagnostic.message)
+        self.check_ignored_texts()
 
     def check_ignored_texts(self):
-        """Check that the text of every text-element that is set to be ignored is included in another not ignored text-element."""
-        for ignored in self.ignored:
-            contained = False
-            for text in self.texts:
-                if text.text == ignored.text:
-                    contained = True
-            if contained:
-                continue
+        """ Check that the text of every text-element that is set to be ignored is included in another not ignored text-element.
+            The texts are looked up in the index of the registry, so every ignored text is checked in constant time.
+        """
+        with self.statistics.stage('ignored_check'):
+            for ignored in self.ignored:
+                if not self.texts.contains_text(ignored.text) and ExportReader.exported_text(ignored.text) not in self.baseline_texts:
+                    self.report(logging.ERROR, 'ignored_text_missing', ignored.filename, ignored.identifier, "Ignored text not in self.texts: %s %s ", ignored.filename,  ignored.text)
+
+
+class ContentIndex(object):
+    """ Index of the contents of mockup-files, used to find files that are copies of files read before.
+        Files are hashed only if another file of the same size was read, so files of unique size are not read twice.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self.unhashed = {}
+        self.digests = {}
+
+    def add_digest(self, input_file):
+        """ Add the SHA-1 digest of the content of a file to the index and return the first file with this digest.
+
+            @param input_file: path of the file.
+        """
+        return self.digests.setdefault(ExtractionCache.file_digest(input_file), input_file)
+
+    def find_copy(self, input_file):
+        """ Add a file to the index and return the first file added before with the same content or None.
+
+            @param input_file: path of the file.
+        """
+        try:
+            size = os.path.getsize(input_file)
+            if size not in self.unhashed:
+                self.unhashed[size] = [input_file]
+                return None
+            for other in self.unhashed[size]:
+                self.add_digest(other)
+            self.unhashed[size] = []
+            original = self.add_digest(input_file)
+        except (IOError, OSError):
+            return None
+        if original == input_file:
+            return None
+        return original
+
+
+class ExtractionAborted(Exception):
+    """Exception raised by a MockupFileExtraction when the extraction of a mockup-file is aborted."""
+    pass
+
+
+class RecordingFilter(logging.Filter):
+    """ Logging-filter that records the log-messages of the root-logger as events of the MockupFileExtraction
+        running in the current thread instead of emitting them. Messages of other threads are not changed.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        logging.Filter.__init__(self)
+        self.local = threading.local()
+
+    def record(self, extraction):
+        """ Record the log-messages of the current thread as events of an extraction.
+
+            @param extraction: MockupFileExtraction the log-messages should be recorded by or None to emit them again.
+        """
+        self.local.extraction = extraction
+
+    def filter(self, record):
+        """Append the log-record with its already formatted message to the events of the current extraction."""
+        extraction = getattr(self.local, 'extraction', None)
+        if extraction is None:
+            return True
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        extraction.events.append(('log', record))
+        return False
+
+
+RECORDING_FILTER = RecordingFilter()
+"""Filter of the root-logger recording the log-messages of MockupFileExtractions."""
+logging.getLogger().addFilter(RECORDING_FILTER)
+
+
+class MockupFileExtraction(AdvancedMockupStringExtractor):
+    """ Extractor used by worker-processes. It records the elements found in a mockup-file instead of checking and
+        storing them. The recorded events are added to an AdvancedMockupStringExtractor by its method add_events.
+    """
+
+    def __init__(self, force=False, statistics=False, control_handlers=None):
+        """ Constructor.
+
+            @param force: flag indicating if the extraction should go on after errors (default False)
+            @param statistics: flag indicating if timings and the number of controls per type are recorded (default False)
+            @param control_handlers: handlers of the control-types registered for an extractor (default controlHandlers)
+        """
+        if control_handlers is not None:
+            self.controlHandlers = control_handlers
+        self.force = force
+        self.jobs = 1
+        self.cache = None
+        self.finder = None
+        self.statistics = NullStatistics()
+        self.spill_directory = None
+        self.texts = None
+        self.ignored = None
+        self.diagnostics = None
+        self.events = []
+        self.recorded_elements = {}
+        self.file_statistics = None
+        if statistics:
+            self.file_statistics = {'parsing': 0.0, 'normalization': 0.0, 'controls': collections.defaultdict(int)}
+
+    def extract_text(self, input_file):
+        """ Parse a mockup-file and record the elements of its controls.
+            The file is parsed as a stream. Every control is handled when its end-tag is read and is cleared afterwards,
+            together with the controls before it, so only the path to the current control is kept in memory. The
+            events of a control are placed before the events of the controls contained in it, so they are recorded
+            in the order of the document.
+
+            Project-files of Balsamiq 3 are read by extract_text_from_project.
+
+            Keyword arguments:
+            @param input_file: mockup-file that should be parsed for texts.
+        """
+        if input_file.lower().endswith('.bmpr'):
+            return self.extract_text_from_project(input_file)
+        if input_file.lower().endswith(self.archiveExtensions):
+            return self.extract_text_from_archive(input_file)
+        logging.info("Extracting text from file " + input_file)
+        self.extract_text_from_stream(input_file, input_file)
+
+    def extract_text_from_stream(self, source, input_file):
+        """ Parse a mockup-file as a stream and record the elements of its controls, like described at extract_text.
+
+            @param source: path of the mockup-file or file-like object it is read from.
+            @param input_file: name of the mockup-file the elements are recorded with.
+        """
+        file_events = self.events
+        first_event = len(file_events)
+        positions = []
+        try:
+            for action, element in etree.iterparse(source, events=('start', 'end'), tag='control'):
+                if action == 'start':
+                    positions.append(len(file_events))
+                    continue
+                position = positions.pop()
+                if self.file_statistics is not None:
+                    self.file_statistics['controls'][element.get('controlTypeID')] += 1
+                self.events = []
+                try:
+                    self.extract_element_info(element, input_file)
+                except KeyError:
+                    pass
+                finally:
+                    file_events[position:position] = self.events
+                    self.events = file_events
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+        except etree.XMLSyntaxError:
+            del file_events[first_event:]
+            self.report(logging.ERROR, 'syntax_error', input_file, None, "XML syntaxerror in file " + input_file)
+            if not self.force:
+                self.abort()
+
+    def extract_text_from_project(self, input_file):
+        """ Read the mockups of a project-file one after another and record the elements of their controls.
+            Only controls with text are read, they are handled like the controls of mockup-files. The elements
+            get the name of the project-file and the mockup separated by an exclamation mark as filename.
+
+            Keyword arguments:
+            @param input_file: project-file that should be parsed for texts.
+        """
+        logging.info("Extracting text from project-file " + input_file)
+        first_event = len(self.events)
+        reader = None
+        try:
+            reader = BmprReader(input_file)
+            for name, mockup in reader.mockups():
+                mockup_file = input_file + '!' + name
+                for element in reader.controls(mockup, self.controlHandlers):
+                    if self.file_statistics is not None:
+                        self.file_statistics['controls'][element.get('controlTypeID')] += 1
+                    try:
+                        self.extract_element_info(element, mockup_file)
+                    except KeyError:
+                        pass
+        except (IOError, ValueError, sqlite3.DatabaseError):
+            del self.events[first_event:]
+            self.report(logging.ERROR, 'project_error', input_file, None, "Error reading project-file " + input_file)
+            if not self.force:
+                self.abort()
+        finally:
+            if reader:
+                reader.close()
+
+    def extract_text_from_archive(self, input_file):
+        """ Read the mockup-files of a zip- or tar-archive one after another, in the order they are stored in, and
+            record the elements of their controls. Every mockup-file is streamed from the archive into the parser,
+            so the archive is read once and nothing is unpacked to disk. The elements get the name of the archive
+            and the mockup-file separated by an exclamation mark as filename. Other members are skipped. Members of
+            zip-archives that can not be decompressed are reported by their name, the other members are read anyway.
+
+            Keyword arguments:
+            @param input_file: archive that should be parsed for texts.
+        """
+        logging.info("Extracting text from archive " + input_file)
+        first_event = len(self.events)
+        try:
+            if input_file.lower().endswith('.zip'):
+                with zipfile.ZipFile(input_file) as archive:
+                    for info in sorted(archive.infolist(), key=lambda info: info.header_offset):
+                        if info.filename.lower().endswith('.bmml'):
+                            self.extract_zip_member(input_file, archive, info)
             else:
-                logging.error("Ignored text not in self.texts: %s %s ", ignored.filename,  ignored.text)
+                with tarfile.open(input_file, 'r|*') as archive:
+                    for member in archive:
+                        if member.isfile() and member.name.lower().endswith('.bmml'):
+                            self.extract_archive_member(input_file, member.name, archive.extractfile(member))
+        except (IOError, EOFError, zipfile.BadZipfile, zipfile.LargeZipFile, tarfile.TarError, zlib.error):
+            del self.events[first_event:]
+            self.report(logging.ERROR, 'archive_error', input_file, None, "Error reading archive " + input_file)
+            if not self.force:
+                self.abort()
+
+    def extract_zip_member(self, input_file, archive, info):
+        """ Parse a mockup-file of a zip-archive and record the elements of its controls. If the member can not be
+            decompressed or its checksum is wrong, its elements are dropped and the member is reported.
+
+            @param input_file: path of the archive.
+            @param archive: opened ZipFile.
+            @param info: ZipInfo of the mockup-file.
+        """
+        first_event = len(self.events)
+        try:
+            with archive.open(info) as mockup:
+                self.extract_archive_member(input_file, info.filename, mockup)
+        except (zipfile.BadZipfile, zlib.error):
+            del self.events[first_event:]
+            mockup_file = self.archive_member_file(input_file, info.filename)
+            self.report(logging.ERROR, 'archive_error', mockup_file, None, "Error reading file %s from archive", mockup_file)
+            if not self.force:
+                self.abort()
+
+    @staticmethod
+    def archive_member_file(input_file, name):
+        """ Return the filename of the elements of a mockup-file read from an archive.
+
+            @param input_file: path of the archive.
+            @param name: name of the mockup-file in the archive, leading ./ are removed from it.
+        """
+        if isinstance(name, unicode):
+            name = name.encode('utf8')
+        return input_file + '!' + posixpath.normpath(name)
+
+    def extract_archive_member(self, input_file, name, mockup):
+        """ Parse a mockup-file read from an archive and record the elements of its controls.
+
+            @param input_file: path of the archive.
+            @param name: name of the mockup-file in the archive, leading ./ are removed from it.
+            @param mockup: file-like object the mockup-file is read from.
+        """
+        mockup_file = self.archive_member_file(input_file, name)
+        logging.info("Extracting text from file " + mockup_file)
+        self.extract_text_from_stream(mockup, mockup_file)
+
+    def normalize_text(self, text):
+        if self.file_statistics is None:
+            return TextNormalizer.normalize_text(text)
+        start = time.time()
+        try:
+            return TextNormalizer.normalize_text(text)
+        finally:
+            self.file_statistics['normalization'] += time.time() - start
+
+    def substitute_formatingchars(self, text):
+        if self.file_statistics is None:
+            return TextNormalizer.normalize_markup(text)
+        start = time.time()
+        try:
+            return TextNormalizer.normalize_markup(text)
+        finally:
+            self.file_statistics['normalization'] += time.time() - start
+
+    def add_text_element(self, new_text_element):
+        self.events.append(('text', self.recorded_elements.setdefault(new_text_element, new_text_element)))
+
+    def add_combined_text_element(self, new_text_element):
+        self.events.append(('combined', new_text_element))
+
+    def add_ignored_element(self, new_text_element):
+        self.events.append(('ignored', new_text_element))
+
+    def add_diagnostic(self, diagnostic):
+        self.events.append(('diagnostic', diagnostic))
+
+    def abort(self):
+        self.events.append(('abort',))
+        raise ExtractionAborted()
+
+
+def extract_file_events(arguments):
+    """ Parse a mockup-file and return the recorded events. Used as function of the worker-processes.
+        If statistics are requested, the last event holds the time of parsing and normalization and the number of
+        controls per control-type.
+
+        @param arguments: tuple of the mockup-file, the force-flag, the statistics-flag and the registered control-types or None.
+    """
+    input_file, force, statistics, control_handlers = arguments
+    extraction = MockupFileExtraction(force, statistics, control_handlers)
+    RECORDING_FILTER.record(extraction)
+    start = time.time()
+    try:
+        extraction.extract_text(input_file)
+    except ExtractionAborted:
+        pass
+    finally:
+        RECORDING_FILTER.record(None)
+    if extraction.file_statistics is not None:
+        extraction.file_statistics['parsing'] = time.time() - start
+        extraction.file_statistics['controls'] = dict(extraction.file_statistics['controls'])
+        extraction.events.append(('stats', input_file, extraction.file_statistics))
+    return extraction.events
+
 
 if __name__ == "__main__":
 
     PARSER = argparse.ArgumentParser()
+    PARSER.add_argument('--cache', help='file the elements of unchanged mockup-files are cached in between runs, by default no cache is used.', metavar='FILE')
+    PARSER.add_argument('--rebuild-cache', help='remove all entries from the cache given by --cache before parsing the mockup-files.', action='store_true')
     PARSER.add_argument('-c', '--check', help='do not generate output, just check if all ids of textelements are given.', action='store_true')
-    PARSER.add_argument('--faketranslation', help='generate fake translation-output. Will add given parameter as prefix and postfix to every text in output-file')
+    PARSER.add_argument('--faketranslation', help='generate fake translation-output. Will add given parameter as prefix and postfix to every text in output-file. When more than one locale is given, one output-file is written per locale, named like the output-file with the locale appended or replacing {locale}.', nargs='+', metavar='LOCALE')
+    PARSER.add_argument('--pseudo-expansion', help='expand the texts of fake translations by this rate, like 0.3 for 30 percent.', type=float, default=0.0)
+    PARSER.add_argument('--pseudo-accents', help='replace the letters of fake translations with accented letters.', action='store_true')
     PARSER.add_argument('-f', '--force', help='force generating outpu-file even if errors occure.', action='store_true')
+    PARSER.add_argument('-r', '--recursive', help='search for mockup-files in all subdirectories of the input-directory.', action='store_true')
+    PARSER.add_argument('--include', help='glob-pattern of mockup-files that are searched recursively, can be given more than once (default *.bmml and *.bmpr).', action='append')
+    PARSER.add_argument('--exclude', help='glob-pattern of files and directories that are skipped when searching recursively, can be given more than once.', action='append')
+    PARSER.add_argument('--follow-symlinks', help='follow symbolic links to directories when searching recursively.', action='store_true')
+    PARSER.add_argument('-j', '--jobs', help='number of processes parsing mockup-files in parallel, 0 uses one process per cpu.', type=int, default=1)
+    PARSER.add_argument('--spill', help='store the extracted texts in a temporary SQLite-database in this directory instead of memory, for corpora larger than the memory.', metavar='DIRECTORY')
     PARSER.add_argument('-i', '--input', help='input-file or directory that will be read. When directory is given, all mockup-files in directory will be read.')
     PARSER.add_argument('--json', help='write output in json-format instead of xml-format.', action='store_true')
+    PARSER.add_argument('--format', help='format of the output: xml, json, gettext po- or mo-file or a compact catalog that can be memory-mapped (default xml).', choices=OutputExporter.FORMATS)
+    PARSER.add_argument('--shard', help='write a JSON-export split into shards by mockup-file or by the prefix of the ids, with a manifest of the shards, into the output-directory.', choices=OutputExporter.SHARD_KEYS)
     PARSER.add_argument('-min', '--minified', help='remove whitespaces from generated output.', action='store_true')
     PARSER.add_argument('-o', '--output', help='name of file that will contain the generated output.')
+    PARSER.add_argument('--delta', help='previous export in XML- or JSON-format, only the texts added, changed or deleted since it are written to the output-file.', metavar='BASELINE')
+    PARSER.add_argument('--since', help='parse only the mockup-files added, modified or deleted since this git-revision and merge their texts into the previous XML-export given by --baseline.', metavar='REVISION')
+    PARSER.add_argument('--baseline', help='previous XML-export of all mockup-files the texts are merged into with --since (default the output-file).')
+    PARSER.add_argument('--watch', help='keep running and rewrite the output-file whenever mockup-files are added, modified or deleted.', action='store_true')
+    PARSER.add_argument('--watch-interval', help='seconds between two checks for changed mockup-files in watch-mode (default 0.05).', type=float, default=0.05)
+    PARSER.add_argument('--stats', help='write timings of the stages and files, counters of the texts and the peak memory in json-format to this file.')
+    PARSER.add_argument('--profile', help='profile the main process with cProfile and write the profile to this file.')
     PARSER.add_argument('-v', '--version', help='show version number.', action='store_true')
     PARSER.add_argument('--verbose', help='increase output verbosity.', action='store_true')
 
@@ -353,17 +1156,110 @@ if __name__ == "__main__":
         logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.INFO)
     if ARGUMENTS.force:
         force = True
-    if ARGUMENTS.input:
-        EXTRACTOR = AdvancedMockupStringExtractor(ARGUMENTS.input, fake=ARGUMENTS.faketranslation, force=ARGUMENTS.force)
-    else:
-        EXTRACTOR = AdvancedMockupStringExtractor(fake=ARGUMENTS.faketranslation, force=ARGUMENTS.force)
-    if ARGUMENTS.faketranslation:
-        EXTRACTOR.faketranslation = ARGUMENTS.faketranslation
+    if ARGUMENTS.delta and ARGUMENTS.faketranslation:
+        logging.error('A delta can not be written for fake-translations.')
+        sys.exit(-1)
+    if ARGUMENTS.format == 'json':
+        ARGUMENTS.json = True
+    elif ARGUMENTS.format not in (None, 'xml') and (ARGUMENTS.json or ARGUMENTS.delta or ARGUMENTS.watch):
+        logging.error('Output-files in format %s can not be combined with --json, --delta or --watch.', ARGUMENTS.format)
+        sys.exit(-1)
+    if ARGUMENTS.shard and (ARGUMENTS.format not in (None, 'json') or ARGUMENTS.delta or ARGUMENTS.watch):
+        logging.error('Sharded exports are written in JSON-format and can not be combined with --delta or --watch.')
+        sys.exit(-1)
+    if ARGUMENTS.since and (ARGUMENTS.json or ARGUMENTS.format not in (None, 'xml') or ARGUMENTS.shard or ARGUMENTS.delta or ARGUMENTS.watch or ARGUMENTS.faketranslation):
+        logging.error('Texts of changed mockup-files are merged into an XML-export, --since can not be combined with --json, --format, --shard, --delta, --watch or --faketranslation.')
+        sys.exit(-1)
+    BASELINE_FILE = ARGUMENTS.baseline or ARGUMENTS.output
+    if ARGUMENTS.since and (not BASELINE_FILE or BASELINE_FILE.lower().endswith('.json')):
+        logging.error('You have to give the previous XML-export of all mockup-files with --baseline to check or merge the changed mockup-files.')
+        sys.exit(-1)
+    STATISTICS = None
+    if ARGUMENTS.stats:
+        STATISTICS = ExtractionStatistics()
+    PROFILE = None
+    if ARGUMENTS.profile:
+        PROFILE = cProfile.Profile()
+        PROFILE.enable()
+    FINDER = None
+    if ARGUMENTS.recursive:
+        FINDER = MockupFileFinder(ARGUMENTS.include or ['*.bmml', '*.bmpr'], ARGUMENTS.exclude, ARGUMENTS.follow_symlinks)
+    if ARGUMENTS.watch:
+        from MockupWatcher import MockupWatcher
+        if ARGUMENTS.check or (ARGUMENTS.faketranslation and len(ARGUMENTS.faketranslation) > 1):
+            logging.error('Watch-mode writes one output-file, it can not be combined with --check or more than one locale.')
+            sys.exit(-1)
+        LOCALIZER = None
+        if ARGUMENTS.faketranslation:
+            LOCALIZER = PseudoLocalizer(ARGUMENTS.faketranslation[0], ARGUMENTS.pseudo_expansion, ARGUMENTS.pseudo_accents)
+        WATCHER = MockupWatcher(ARGUMENTS.input or ".", ARGUMENTS.output, ARGUMENTS.json, ARGUMENTS.minified, ARGUMENTS.force,
+                                FINDER, LOCALIZER, ARGUMENTS.jobs, ARGUMENTS.watch_interval)
+        try:
+            WATCHER.run()
+        except KeyboardInterrupt:
+            sys.exit(0)
+    CACHE = None
+    if ARGUMENTS.cache:
+        CACHE = ExtractionCache(ARGUMENTS.cache, rebuild=ARGUMENTS.rebuild_cache)
+    EXTRACTOR = AdvancedMockupStringExtractor(force=ARGUMENTS.force, jobs=ARGUMENTS.jobs, cache=CACHE, finder=FINDER, statistics=STATISTICS,
+                                              spill_directory=ARGUMENTS.spill)
+    if ARGUMENTS.since:
+        INPUT = ARGUMENTS.input or "."
+        try:
+            CHANGED, DELETED = GitChanges(INPUT if os.path.isdir(INPUT) else os.path.dirname(INPUT), ARGUMENTS.since).changed_files()
+        except (OSError, subprocess.CalledProcessError) as error:
+            logging.error("Error listing the files changed since revision %s: %s", ARGUMENTS.since, error)
+            sys.exit(-1)
+        REPLACED = set(OutputExporter.mockup_file(CHANGED_FILE) for CHANGED_FILE in CHANGED + DELETED)
+        try:
+            BASELINE, REPLACED_TEXTS = [], []
+            for TEXT, FRAGMENT in ExportReader.read_fragments(BASELINE_FILE):
+                if OutputExporter.mockup_file(TEXT.filename or u'') in REPLACED:
+                    REPLACED_TEXTS.append(TEXT)
+                else:
+                    BASELINE.append((TEXT, FRAGMENT))
+        except (IOError, ValueError) as error:
+            logging.error("Error reading previous export %s: %s", BASELINE_FILE, error)
+            sys.exit(-1)
+        logging.info("Parsing %d files changed and leaving out %d files deleted since revision %s", len(CHANGED), len(DELETED), ARGUMENTS.since)
+    try:
+        if ARGUMENTS.since:
+            RESULT = EXTRACTOR.extract_changed(INPUT, CHANGED, [TEXT for TEXT, _ in BASELINE], check=ARGUMENTS.check, replaced=REPLACED_TEXTS)
+        else:
+            RESULT = EXTRACTOR.extract(ARGUMENTS.input or ".", check=ARGUMENTS.check)
+    except ExtractionError:
+        sys.exit(-1)
+    finally:
+        if CACHE:
+            CACHE.close()
+    EXIT_CODE = 0
     if ARGUMENTS.check:
-        EXTRACTOR.check_ignored_texts()
-        sys.exit(0)
-    EXPORTER = OutputExporter(EXTRACTOR.texts)
-    if ARGUMENTS.json:
-        EXPORTER.json_export(ARGUMENTS.output, ARGUMENTS.minified)
+        if RESULT.diagnostics:
+            logging.error("Found %d problems in the mockups.", len(RESULT.diagnostics))
+            EXIT_CODE = -1
+    elif ARGUMENTS.since:
+        try:
+            OutputExporter(RESULT.texts, statistics=STATISTICS).export_merged(ARGUMENTS.output, BASELINE, ARGUMENTS.minified)
+        except (IOError, ValueError) as error:
+            logging.error("Error merging previous export %s: %s", BASELINE_FILE, error)
+            sys.exit(-1)
+    elif ARGUMENTS.delta:
+        try:
+            OutputExporter(RESULT.texts, statistics=STATISTICS).export_delta(ARGUMENTS.output, ARGUMENTS.delta, ARGUMENTS.json, ARGUMENTS.minified)
+        except (IOError, ValueError) as error:
+            logging.error("Error reading previous export %s: %s", ARGUMENTS.delta, error)
+            sys.exit(-1)
+    elif not ARGUMENTS.faketranslation:
+        OutputExporter(RESULT.texts, statistics=STATISTICS).export(ARGUMENTS.output, ARGUMENTS.json, ARGUMENTS.minified, ARGUMENTS.format, ARGUMENTS.shard)
     else:
-        EXPORTER.xml_export(ARGUMENTS.output, ARGUMENTS.minified)
\ No newline at end of file
+        LOCALIZERS = [PseudoLocalizer(LOCALE, ARGUMENTS.pseudo_expansion, ARGUMENTS.pseudo_accents) for LOCALE in ARGUMENTS.faketranslation]
+        if len(LOCALIZERS) == 1 and '{locale}' not in ARGUMENTS.output:
+            OutputExporter(RESULT.texts, statistics=STATISTICS, localizer=LOCALIZERS[0]).export(ARGUMENTS.output, ARGUMENTS.json, ARGUMENTS.minified, ARGUMENTS.format, ARGUMENTS.shard)
+        else:
+            OutputExporter(RESULT.texts, statistics=STATISTICS).export_localized(ARGUMENTS.output, LOCALIZERS, ARGUMENTS.json, ARGUMENTS.minified, ARGUMENTS.jobs, ARGUMENTS.format, ARGUMENTS.shard)
+    if PROFILE:
+        PROFILE.disable()
+        PROFILE.dump_stats(ARGUMENTS.profile)
+    if STATISTICS:
+        STATISTICS.write(ARGUMENTS.stats)
+    sys.exit(EXIT_CODE)
\ No newline at end of file
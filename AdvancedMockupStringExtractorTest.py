@@ -26,10 +26,23 @@ THE SOFTWARE.
 
 """These are unittests for module AdvancedMockupStringExtractor."""
 
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
 import unittest
 import logging
+import zipfile
+
+from lxml import etree
 
 import AdvancedMockupStringExtractor
+from ExtractionResult import ExtractionError
+from ExportReader import ExportReader
+from ExtractionStatistics import ExtractionStatistics
+from OutputExporter import OutputExporter
+from TextElement import TextElement
 
 logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.DEBUG)
 
@@ -91,6 +104,332 @@ class AdvancedMockupStringExtractorTest(unittest.TestCase):
         self.assertEqual(extractedText, 'Text in RadioButton')
 
 
+    def testParallelExtractionEqualsSerialExtraction(self):
+        """Test if parsing mockup-files with a pool of processes gives the same texts in the same order."""
+        directory = tempfile.mkdtemp()
+        try:
+            for number in range(4):
+                shutil.copy('./test_input/RadioButton01.bmml', os.path.join(directory, 'RadioButton%02d.bmml' % number))
+            results = []
+            for jobs in [1, 3]:
+                self.extractor.reset()
+                self.extractor.jobs = jobs
+                self.extractor.extract_text_from_directory(directory)
+                results.append([(text.identifier, text.text, text.filename) for text in self.extractor.texts])
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(len(results[0]), 1)
+        self.assertEqual(results[0], results[1])
+
+    def testExtractTextFromGroupInDocumentOrder(self):
+        """Test if texts of controls in groups are extracted in the order of the mockup-file."""
+        self.extractor.extract_text('./test_input/Group01.bmml')
+        result = [(text.identifier, text.text, text.index) for text in self.extractor.texts]
+        wantedResult = [('groupLabel', 'Label in group', ''), ('groupBar_First', 'First', 0), ('groupBar_Second', 'Second', 1), ('button', 'Button', '')]
+        self.assertEqual(result, wantedResult)
+
+    def testGetControlPropertiesInOneScan(self):
+        """Test if the properties of an element are read like by get_control_property."""
+        properties = etree.fromstring('<controlProperties><text>Text</text><customID>id</customID><text>Second</text><align>left</align></controlProperties>')
+        self.assertEqual(self.extractor.get_control_properties(properties), {'customID': 'id', 'text': 'Text'})
+        self.assertEqual(self.extractor.get_control_properties(properties)['text'], self.extractor.get_control_property(properties, 'text'))
+
+    def testRegisterControlType(self):
+        """Test if the texts of registered control-types are extracted by their handler."""
+        directory = tempfile.mkdtemp()
+        control_types = ['com.balsamiq.mockups::Title', 'com.balsamiq.mockups::BreadCrumbs']
+        try:
+            with open('./test_input/RadioButton01.bmml') as inputfile:
+                content = inputfile.read()
+            for number, (control_type, text) in enumerate(zip(control_types, ['Title', 'Home%2CProducts'])):
+                with open(os.path.join(directory, 'Control%02d.bmml' % number), 'w') as outputfile:
+                    outputfile.write(content.replace('com.balsamiq.mockups::RadioButton', control_type).replace('Text%20in%20RadioButton', text)
+                                            .replace('firstElement', 'element%02d' % number))
+            self.assertRaises(ExtractionError, self.extractor.extract, directory)
+            self.extractor.register_control_type(control_types[0])
+            self.extractor.register_control_type(control_types[1], 'extract_text_from_buttonbar_tabbar')
+            self.assertRaises(ValueError, self.extractor.register_control_type, 'com.balsamiq.mockups::DataGrid', 'extract_grid')
+            result = self.extractor.extract(directory)
+            self.extractor.jobs = 2
+            self.assertEqual(self.extractor.extract(directory).texts, result.texts)
+            self.assertRaises(ExtractionError, AdvancedMockupStringExtractor.AdvancedMockupStringExtractor().extract, directory)
+        finally:
+            shutil.rmtree(directory)
+        for control_type in control_types:
+            self.assertNotIn(control_type, AdvancedMockupStringExtractor.AdvancedMockupStringExtractor.controlHandlers)
+            self.assertNotIn(control_type, AdvancedMockupStringExtractor.AdvancedMockupStringExtractor.controlElementsWithText)
+        self.assertEqual([(text.identifier, text.text, text.index) for text in result.texts],
+                         [('element00', 'Title', ''), ('element01_Home', 'Home', 0), ('element01_Products', 'Products', 1)])
+
+    def writeConflictingMockups(self, directory):
+        """Write two mockup-files with elements having same ID but different text into a directory."""
+        for number, text in enumerate(['Text%20in%20RadioButton', 'Other%20text']):
+            with open('./test_input/RadioButton01.bmml') as inputfile:
+                content = inputfile.read().replace('Text%20in%20RadioButton', text)
+            with open(os.path.join(directory, 'RadioButton%02d.bmml' % number), 'w') as outputfile:
+                outputfile.write(content)
+
+    def testExtractReturnsResultWithoutChangingExtractor(self):
+        """Test if extract returns the texts of every call without keeping them in the extractor."""
+        first = self.extractor.extract('./test_input/Group01.bmml')
+        second = self.extractor.extract('./test_input/RadioButton01.bmml')
+        self.assertEqual([text.identifier for text in first.texts], ['groupLabel', 'groupBar_First', 'groupBar_Second', 'button'])
+        self.assertEqual([text.identifier for text in second.texts], ['firstElement'])
+        self.assertEqual((second.ignored, second.diagnostics), ((), ()))
+        self.assertEqual(len(self.extractor.texts), 0)
+
+    def testExtractRaisesErrorWithDiagnostics(self):
+        """Test if elements with same ID but different text abort the extraction with an ExtractionError."""
+        directory = tempfile.mkdtemp()
+        try:
+            self.writeConflictingMockups(directory)
+            with self.assertRaises(ExtractionError) as context:
+                self.extractor.extract(directory)
+            self.extractor.force = True
+            result = self.extractor.extract(directory)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual([(diagnostic.code, diagnostic.identifier) for diagnostic in context.exception.result.errors], [('conflicting_id', 'firstElement')])
+        self.assertEqual(len(context.exception.result.texts), 1)
+        self.assertEqual([diagnostic.code for diagnostic in result.diagnostics], ['conflicting_id'])
+        self.assertEqual(len(result.texts), 2)
+
+    def testCheckReportsAllProblemsInOnePass(self):
+        """Test if checking the mockups reports conflicts, elements without ID and ignored texts without aborting."""
+        directory = tempfile.mkdtemp()
+        try:
+            self.writeConflictingMockups(directory)
+            with open('./test_input/RadioButton01.bmml') as inputfile:
+                content = inputfile.read()
+            with open(os.path.join(directory, 'Ignored.bmml'), 'w') as outputfile:
+                outputfile.write(content.replace('firstElement', 'ignore').replace('Text%20in', 'Ignored%20text%20in'))
+            with open(os.path.join(directory, 'WithoutID.bmml'), 'w') as outputfile:
+                outputfile.write(content.replace('<customID>firstElement</customID>', ''))
+            result = self.extractor.extract(directory, check=True)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(sorted((diagnostic.code, os.path.basename(diagnostic.filename)) for diagnostic in result.diagnostics),
+                         [('conflicting_id', 'RadioButton01.bmml'), ('ignored_text_missing', 'Ignored.bmml'), ('missing_id', 'WithoutID.bmml')])
+        self.assertFalse(self.extractor.force)
+
+    def testExtractRecordsDiagnosticsOfWorkerProcesses(self):
+        """Test if problems found by worker-processes are collected as diagnostics."""
+        directory = tempfile.mkdtemp()
+        try:
+            shutil.copy('./test_input/RadioButton01.bmml', directory)
+            with open(os.path.join(directory, 'Broken.bmml'), 'w') as outputfile:
+                outputfile.write('<mockup><controls>')
+            self.extractor.force = True
+            self.extractor.jobs = 2
+            result = self.extractor.extract(directory)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual([(diagnostic.code, os.path.basename(diagnostic.filename)) for diagnostic in result.diagnostics], [('syntax_error', 'Broken.bmml')])
+        self.assertEqual([text.identifier for text in result.texts], ['firstElement'])
+
+    def testExtractTextFromArchives(self):
+        """Test if the mockup-files of zip- and tar-archives are read like files named by archive and member."""
+        directory = tempfile.mkdtemp()
+        try:
+            zip_file = os.path.join(directory, 'mockups.zip')
+            with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED) as archive:
+                archive.write('./test_input/Group01.bmml', 'screens/Group01.bmml')
+                archive.writestr('readme.txt', 'no mockup')
+                archive.write('./test_input/RadioButton01.bmml', 'RadioButton01.bmml')
+            tar_file = os.path.join(directory, 'mockups.tar.gz')
+            with tarfile.open(tar_file, 'w:gz') as archive:
+                archive.add('./test_input/Group01.bmml', 'screens/Group01.bmml')
+                archive.add('./test_input/RadioButton01.bmml', 'RadioButton01.bmml')
+            results = [[(text.identifier, text.filename) for text in self.extractor.extract(archive_file).texts]
+                       for archive_file in (zip_file, tar_file)]
+        finally:
+            shutil.rmtree(directory)
+        for archive_file, result in zip((zip_file, tar_file), results):
+            self.assertEqual(result, [('groupLabel', archive_file + '!screens/Group01.bmml'), ('groupBar_First', archive_file + '!screens/Group01.bmml'),
+                                      ('groupBar_Second', archive_file + '!screens/Group01.bmml'), ('button', archive_file + '!screens/Group01.bmml'),
+                                      ('firstElement', archive_file + '!RadioButton01.bmml')])
+
+    def testExtractReportsBrokenArchives(self):
+        """Test if archives that can not be read and broken mockup-files in archives are reported."""
+        directory = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(directory, 'Broken.zip'), 'w') as outputfile:
+                outputfile.write('no archive')
+            with zipfile.ZipFile(os.path.join(directory, 'Mockups.zip'), 'w') as archive:
+                archive.writestr('Broken.bmml', '<mockup><controls>')
+                archive.write('./test_input/RadioButton01.bmml', 'RadioButton01.bmml')
+            self.extractor.force = True
+            results = [self.extractor.extract(os.path.join(directory, name)) for name in ('Broken.zip', 'Mockups.zip')]
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual([(diagnostic.code, os.path.basename(diagnostic.filename)) for result in results for diagnostic in result.diagnostics],
+                         [('archive_error', 'Broken.zip'), ('syntax_error', 'Mockups.zip!Broken.bmml')])
+        self.assertEqual([text.identifier for text in results[1].texts], ['firstElement'])
+
+    def testExtractReportsCorruptArchives(self):
+        """Test if corrupt members of zip-archives and corrupt compressed tar-archives are reported."""
+        directory = tempfile.mkdtemp()
+        try:
+            zip_file = os.path.join(directory, 'Mockups.zip')
+            with zipfile.ZipFile(zip_file, 'w') as archive:
+                archive.writestr(zipfile.ZipInfo('Deflated.bmml'), '<mockup/>' * 100, zipfile.ZIP_DEFLATED)
+                archive.writestr('Checksum.bmml', '<mockup/>')
+                archive.write('./test_input/RadioButton01.bmml', 'RadioButton01.bmml')
+            with zipfile.ZipFile(zip_file) as archive:
+                deflated, checksum = [info.header_offset + 30 + len(info.filename) + len(info.extra) for info in archive.infolist()[:2]]
+            with open(zip_file, 'r+b') as outputfile:
+                outputfile.seek(deflated)
+                outputfile.write('\xff' * 8)
+                outputfile.seek(checksum + 1)
+                outputfile.write('M')
+            tar_file = os.path.join(directory, 'Mockups.tar.gz')
+            with tarfile.open(tar_file, 'w:gz') as archive:
+                archive.add('./test_input/RadioButton01.bmml', 'RadioButton01.bmml')
+            with open(tar_file, 'r+b') as outputfile:
+                outputfile.seek(20)
+                outputfile.write('\xff' * 8)
+            self.extractor.force = True
+            results = [self.extractor.extract(archive_file) for archive_file in (zip_file, tar_file)]
+            self.extractor.force = False
+            self.assertRaises(ExtractionError, self.extractor.extract, zip_file)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual([(diagnostic.code, os.path.basename(diagnostic.filename)) for result in results for diagnostic in result.diagnostics],
+                         [('archive_error', 'Mockups.zip!Deflated.bmml'), ('archive_error', 'Mockups.zip!Checksum.bmml'),
+                          ('archive_error', 'Mockups.tar.gz')])
+        self.assertEqual([text.identifier for text in results[0].texts], ['firstElement'])
+
+    def testCopiesOfMockupFilesAreParsedOnce(self):
+        """Test if copies of mockup-files are parsed once and their elements and problems keep the name of the copy."""
+        directory = tempfile.mkdtemp()
+        try:
+            os.mkdir(os.path.join(directory, 'assets'))
+            for name in ('Group00.bmml', 'Group01.bmml', 'assets/Group02.bmml'):
+                shutil.copy('./test_input/Group01.bmml', os.path.join(directory, name))
+            for name in ('Broken00.bmml', 'assets/Broken01.bmml'):
+                with open(os.path.join(directory, name), 'w') as outputfile:
+                    outputfile.write('<mockup><controls>')
+            for jobs in [1, 3]:
+                statistics = ExtractionStatistics()
+                self.extractor = AdvancedMockupStringExtractor.AdvancedMockupStringExtractor(force=True, jobs=jobs, statistics=statistics)
+                result = self.extractor.extract(directory)
+                self.assertEqual(sorted(set(os.path.relpath(text.filename, directory) for text in result.texts)),
+                                 ['Group00.bmml', 'Group01.bmml', os.path.join('assets', 'Group02.bmml')])
+                self.assertEqual(sorted(os.path.relpath(diagnostic.filename, directory) for diagnostic in result.diagnostics),
+                                 ['Broken00.bmml', os.path.join('assets', 'Broken01.bmml')])
+                self.assertTrue(all(diagnostic.filename in diagnostic.message for diagnostic in result.diagnostics))
+                self.assertEqual((statistics.counters['parsed_files'], statistics.counters['copied_files']), (2, 3))
+            statistics = ExtractionStatistics()
+            self.extractor = AdvancedMockupStringExtractor.AdvancedMockupStringExtractor(force=True, statistics=statistics)
+            self.extractor.copySources = 1
+            self.assertEqual(self.extractor.extract(directory), result)
+            self.assertEqual(statistics.counters['parsed_files'] + statistics.counters['copied_files'], 5)
+        finally:
+            shutil.rmtree(directory)
+
+    def testExtractTextsSpilledToDisk(self):
+        """Test if texts spilled to disk are extracted and checked like texts held in memory."""
+        directory = tempfile.mkdtemp()
+        try:
+            self.writeConflictingMockups(directory)
+            expected = self.extractor.extract(directory, check=True)
+            self.extractor.spill_directory = directory
+            result = self.extractor.extract(directory, check=True)
+            self.assertTrue(result.texts.spilled)
+            self.assertEqual([(text.identifier, text.text, text.filename) for text in result.texts],
+                             [(text.identifier, text.text, text.filename) for text in expected.texts])
+            self.assertEqual(result.diagnostics, expected.diagnostics)
+            result.texts.close()
+        finally:
+            shutil.rmtree(directory)
+
+    def testExtractChangedFilesChecksBaseline(self):
+        """Test if only changed files are extracted and their texts are checked against a previous export."""
+        directory = tempfile.mkdtemp()
+        try:
+            self.writeConflictingMockups(directory)
+            shutil.copy('./test_input/Group01.bmml', directory)
+            baseline = os.path.join(directory, 'baseline.xml')
+            kept = self.extractor.extract(os.path.join(directory, 'RadioButton00.bmml')).texts + (TextElement('button', 'Button', 'Other.bmml', None),)
+            OutputExporter(kept).export(baseline)
+            baseline = ExportReader.read(baseline)
+            changed = [os.path.join(directory, 'RadioButton01.bmml'), os.path.join(directory, 'Group01.bmml')]
+            with self.assertRaises(ExtractionError) as context:
+                self.extractor.extract_changed(directory, changed, baseline)
+            result = self.extractor.extract_changed(directory, changed, baseline, check=True)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual([(diagnostic.code, diagnostic.identifier) for diagnostic in context.exception.result.errors], [('conflicting_id', 'firstElement')])
+        self.assertEqual(sorted(text.identifier for text in result.texts), ['firstElement', 'groupBar_First', 'groupBar_Second', 'groupLabel'])
+        self.assertEqual([diagnostic.code for diagnostic in result.diagnostics], ['conflicting_id'])
+
+    def testExtractChangedFilesWarnsOfTextsSharedWithUnchangedFiles(self):
+        """Test if a warning lists the IDs of changed files whose texts were exported in place of unchanged files."""
+        class RecordingHandler(logging.Handler):
+            def emit(self, record):
+                warnings.append(record.getMessage())
+        warnings = []
+        handler = RecordingHandler(logging.WARNING)
+        directory = tempfile.mkdtemp()
+        logging.getLogger().addHandler(handler)
+        try:
+            for name in ('Group00.bmml', 'Group01.bmml'):
+                shutil.copy('./test_input/Group01.bmml', os.path.join(directory, name))
+            shutil.copy('./test_input/RadioButton01.bmml', directory)
+            export = os.path.join(directory, 'baseline.xml')
+            OutputExporter(self.extractor.extract(directory).texts).export(export)
+            previous = ExportReader.read(export)
+            exported = [text.filename for text in previous if text.identifier == 'button'][0]
+            for changed in (os.path.join(directory, 'RadioButton01.bmml'), exported):
+                with open(changed) as inputfile:
+                    content = inputfile.read().replace('<customID>button</customID>', '<customID>otherButton</customID>')
+                with open(changed, 'w') as outputfile:
+                    outputfile.write(content)
+                baseline = [text for text in previous if text.filename != changed]
+                replaced = [text for text in previous if text.filename == changed]
+                self.extractor.extract_changed(directory, [changed], baseline, replaced=replaced)
+                self.assertEqual(len(warnings), 0 if changed != exported else 1)
+        finally:
+            logging.getLogger().removeHandler(handler)
+            shutil.rmtree(directory)
+        self.assertTrue(warnings[0].endswith(': button'))
+
+    def testDeltaOfUnchangedTextsWithRepeatedIdsIsEmpty(self):
+        """Test if the delta of texts with repeated IDs against their own export containes no texts."""
+        directory = tempfile.mkdtemp()
+        try:
+            self.writeConflictingMockups(directory)
+            shutil.copy('./test_input/Group01.bmml', os.path.join(directory, 'Group00.bmml'))
+            with open('./test_input/Group01.bmml') as inputfile:
+                content = inputfile.read().replace('<customID>button</customID>', '<customID>button</customID><customData>Other%20meta</customData>')
+            with open(os.path.join(directory, 'Group01.bmml'), 'w') as outputfile:
+                outputfile.write(content)
+            texts = AdvancedMockupStringExtractor.AdvancedMockupStringExtractor(force=True).extract(directory).texts
+            self.assertEqual(sorted(text.identifier for text in texts).count('button'), 2)
+            self.assertEqual(sorted(text.identifier for text in texts).count('firstElement'), 2)
+            for json_format in (False, True):
+                for minified in (False, True):
+                    baseline = os.path.join(directory, 'baseline.json' if json_format else 'baseline.xml')
+                    OutputExporter(texts).export(baseline, json_format, minified)
+                    delta = os.path.join(directory, 'delta')
+                    self.assertEqual(OutputExporter(texts).export_delta(delta, baseline, json_format, minified), (0, 0, 0))
+        finally:
+            shutil.rmtree(directory)
+
+    def testExtractFromSeveralThreads(self):
+        """Test if one extractor can be used by several threads at once without mixing their texts."""
+        results = {}
+        def extract(input_file):
+            results[input_file] = [text.identifier for text in self.extractor.extract(input_file).texts]
+        input_files = ['./test_input/Group01.bmml', './test_input/RadioButton01.bmml'] * 4
+        threads = [threading.Thread(target=extract, args=(input_file,)) for input_file in input_files]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {'./test_input/Group01.bmml': ['groupLabel', 'groupBar_First', 'groupBar_Second', 'button'],
+                                   './test_input/RadioButton01.bmml': ['firstElement']})
+
 if __name__ == '__main__':
     #TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(AdvancedMockupStringExtractorTest)
     #unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
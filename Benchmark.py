@@ -0,0 +1,174 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that measures the time of every stage of the extraction of texts from
+balsamiq-mockup-files on a synthetic corpus.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+
+from lxml import etree
+
+from AdvancedMockupStringExtractor import AdvancedMockupStringExtractor, extract_file_events, __version__
+from MockupCorpusGenerator import MockupCorpusGenerator
+from MockupFileFinder import MockupFileFinder
+from OutputExporter import OutputExporter
+from TextNormalizer import TextNormalizer
+
+class Benchmark:
+    """ Class that times the stages discovery, parsing, normalization, checks and every export-format separately.
+
+        Every stage is repeated and the best and the mean time are reported, so results of different versions
+        can be compared.
+    """
+
+    STAGES = ['discovery', 'parsing', 'normalization', 'checks', 'xml_export', 'xml_export_minified', 'json_export',
+              'json_export_minified']
+    """Names of the stages in the order they are run."""
+
+    def __init__(self, input_dir, repetitions=3):
+        """ Constructor.
+
+            @param input_dir: directory containing the mockup-files.
+            @param repetitions: number of runs of every stage (default 3)
+        """
+        self.input_dir = input_dir
+        self.repetitions = repetitions
+        self.work_dir = None
+        self.files = []
+        self.events = []
+        self.raw_texts = []
+        self.extractor = None
+
+    def discovery(self):
+        """Search the input-directory for mockup-files."""
+        self.files = list(MockupFileFinder().find(self.input_dir))
+
+    def parsing(self):
+        """Parse all mockup-files and record their events."""
+        self.events = [extract_file_events((infile, True, False, None)) for infile in self.files]
+
+    def normalization(self):
+        """Normalize the texts of all controls."""
+        for text in self.raw_texts:
+            TextNormalizer.normalize_text(text)
+
+    def checks(self):
+        """Add the parsed elements to an extractor, checking their IDs, and check the ignored texts."""
+        self.extractor.reset()
+        for events in self.events:
+            self.extractor.add_events(events)
+        self.extractor.check_ignored_texts()
+
+    def export(self, json_format, minified):
+        """ Export the extracted texts into the working-directory.
+
+            @param json_format: flag indicating if the texts are exported in JSON- instead of XML-format.
+            @param minified: flag indicating if whitespaces are removed from the output.
+        """
+        exporter = OutputExporter(list(self.extractor.texts))
+        if json_format:
+            exporter.json_export(os.path.join(self.work_dir, 'output.json'), minified)
+        else:
+            exporter.xml_export(os.path.join(self.work_dir, 'output.xml'), minified)
+
+    def time_stage(self, stage):
+        """ Return the best and the mean time of the runs of a stage in seconds.
+
+            @param stage: function running the stage.
+        """
+        times = []
+        for _ in range(self.repetitions):
+            start = time.time()
+            stage()
+            times.append(time.time() - start)
+        return {'best': min(times), 'mean': sum(times) / len(times)}
+
+    def run(self):
+        """Run all stages and return the results."""
+        self.work_dir = tempfile.mkdtemp()
+        try:
+            self.extractor = AdvancedMockupStringExtractor()
+            stages = {'discovery': self.discovery, 'parsing': self.parsing, 'normalization': self.normalization,
+                      'checks': self.checks,
+                      'xml_export': lambda: self.export(False, False), 'xml_export_minified': lambda: self.export(False, True),
+                      'json_export': lambda: self.export(True, False), 'json_export_minified': lambda: self.export(True, True)}
+            results = {}
+            for stage in self.STAGES:
+                if stage == 'normalization':
+                    self.raw_texts = [element.text for infile in self.files for _, element in etree.iterparse(infile, tag='text')]
+                results[stage] = self.time_stage(stages[stage])
+            return {'version': __version__,
+                    'python': platform.python_version(),
+                    'lxml': etree.__version__,
+                    'platform': platform.platform(),
+                    'repetitions': self.repetitions,
+                    'corpus': {'files': len(self.files), 'texts': len(self.extractor.texts),
+                               'bytes': sum(os.path.getsize(infile) for infile in self.files)},
+                    'stages': results}
+        finally:
+            shutil.rmtree(self.work_dir)
+
+
+if __name__ == "__main__":
+
+    PARSER = argparse.ArgumentParser(description='Time the stages of the extraction on a synthetic corpus of mockup-files.')
+    PARSER.add_argument('--files', help='number of generated mockup-files (default 100).', type=int, default=100)
+    PARSER.add_argument('--controls', help='number of controls per mockup-file (default 50).', type=int, default=50)
+    PARSER.add_argument('--mix', help='weights of the control-types, like Label=3,Button=1 (default all types equally weighted).')
+    PARSER.add_argument('--fanout', help='number of texts of ButtonBars, TabBars and ComboBoxes (default 3).', type=int, default=3)
+    PARSER.add_argument('--duplicates', help='rate of controls repeating ID and text of another control (default 0.05).', type=float, default=0.05)
+    PARSER.add_argument('--text-length', help='number of words per text (default 5).', type=int, default=5)
+    PARSER.add_argument('--seed', help='seed of the random-generator (default 0).', type=int, default=0)
+    PARSER.add_argument('--repetitions', help='number of runs of every stage (default 3).', type=int, default=3)
+    PARSER.add_argument('--corpus', help='directory the mockup-files are generated in, it is kept after the benchmark.')
+    PARSER.add_argument('-o', '--output', help='name of the file the results are written to in json-format.')
+    ARGUMENTS = PARSER.parse_args()
+
+    MIX = None
+    if ARGUMENTS.mix:
+        MIX = MockupCorpusGenerator.parse_mix(ARGUMENTS.mix)
+    GENERATOR = MockupCorpusGenerator(ARGUMENTS.files, ARGUMENTS.controls, MIX, ARGUMENTS.fanout, ARGUMENTS.duplicates,
+                                      ARGUMENTS.text_length, ARGUMENTS.seed)
+    CORPUS = ARGUMENTS.corpus or tempfile.mkdtemp()
+    try:
+        GENERATOR.generate(CORPUS)
+        RESULTS = Benchmark(CORPUS, ARGUMENTS.repetitions).run()
+    finally:
+        if not ARGUMENTS.corpus:
+            shutil.rmtree(CORPUS)
+    RESULTS['parameters'] = GENERATOR.parameters()
+    for STAGE in Benchmark.STAGES:
+        print '%-22s %8.3f s (mean %8.3f s)' % (STAGE, RESULTS['stages'][STAGE]['best'], RESULTS['stages'][STAGE]['mean'])
+    if ARGUMENTS.output:
+        with open(ARGUMENTS.output, 'w') as OUTPUTFILE:
+            json.dump(RESULTS, OUTPUTFILE, indent=2, sort_keys=True)
@@ -0,0 +1,121 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that is used to read the mockups of balsamiq-projects (bmpr-files).
+"""
+
+import json
+import os
+import sqlite3
+import urllib
+
+from lxml import etree
+
+class BmprReader:
+    """ Class that reads the mockups stored in a bmpr-file.
+
+        A bmpr-file is a SQLite-database holding every mockup as resource in JSON-format. The mockups are read one at
+        a time, so only one mockup is held in memory. Controls are converted into xml-elements in the format of
+        mockup-files, so they can be handled like controls read from bmml-files.
+    """
+
+    BRANCH = 'Master'
+    """Branch of the project whose mockups are read."""
+
+    TYPE_PREFIX = 'com.balsamiq.mockups::'
+    """Prefix of the control-types in mockup-files."""
+
+    SAFE_CHARACTERS = "!'()*-._~"
+    """Characters that are not percent-encoded in texts of mockup-files."""
+
+    def __init__(self, project_file):
+        """ Constructor.
+
+            @param project_file: path of the bmpr-file.
+        """
+        if not os.path.isfile(project_file):
+            raise IOError("No such project-file: " + project_file)
+        self.connection = sqlite3.connect(project_file)
+
+    def close(self):
+        """Close the project-file."""
+        self.connection.close()
+
+    def mockups(self):
+        """ Yield name and content of all mockups of the project that are not in the trash, ordered like in the project.
+            The content of a mockup is read when it is yielded, its name is encoded in utf-8.
+        """
+        resources = []
+        for identifier, attributes in self.connection.execute("SELECT ID, ATTRIBUTES FROM RESOURCES WHERE BRANCHID = ?", (self.BRANCH,)):
+            attributes = json.loads(attributes or '{}')
+            if attributes.get('kind') == 'mockup' and not attributes.get('trashed'):
+                resources.append((attributes.get('order', 0), attributes.get('name', identifier), identifier))
+        resources.sort()
+        for _, name, identifier in resources:
+            row = self.connection.execute("SELECT DATA FROM RESOURCES WHERE ID = ? AND BRANCHID = ?", (identifier, self.BRANCH)).fetchone()
+            yield name.encode('utf8'), json.loads(row[0])
+
+    @staticmethod
+    def quote(text):
+        """ Return a text percent-encoded like in mockup-files.
+
+            @param text: unicode-text of a control.
+        """
+        return urllib.quote(text.encode('utf8'), BmprReader.SAFE_CHARACTERS)
+
+    @staticmethod
+    def to_element(control):
+        """ Return a control as xml-element in the format of mockup-files.
+
+            @param control: control of a mockup in JSON-format.
+        """
+        element = etree.Element('control', controlTypeID=BmprReader.TYPE_PREFIX + control['typeID'])
+        properties = etree.SubElement(element, 'controlProperties')
+        for tag in ('customID', 'text', 'customData'):
+            value = control.get('properties', {}).get(tag)
+            if value is not None:
+                etree.SubElement(properties, tag).text = BmprReader.quote(value) if tag != 'customID' else value
+        return element
+
+    @staticmethod
+    def controls(mockup, control_types):
+        """ Yield the controls of a mockup whose type is in control_types as xml-elements in the order of the
+            document. Controls of groups and symbols are yielded after the group.
+
+            @param mockup: content of a mockup in JSON-format.
+            @param control_types: types of controls that should be yielded, including the prefix com.balsamiq.mockups::.
+        """
+        pending = [mockup.get('mockup', {}).get('controls', {}).get('control', [])]
+        while pending:
+            controls = pending.pop()
+            for position, control in enumerate(controls):
+                if BmprReader.TYPE_PREFIX + control.get('typeID', '') in control_types:
+                    yield BmprReader.to_element(control)
+                children = control.get('children', {}).get('controls', {}).get('control')
+                if children:
+                    pending.append(controls[position + 1:])
+                    pending.append(children)
+                    break
@@ -0,0 +1,95 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from AdvancedMockupStringExtractor import AdvancedMockupStringExtractor
+from BmprReader import BmprReader
+
+def control(identifier, type_id, properties=None, children=None):
+    """Return a control in the JSON-format of project-files."""
+    result = {'ID': identifier, 'typeID': type_id, 'properties': properties or {}}
+    if children:
+        result['children'] = {'controls': {'control': children}}
+    return result
+
+class BmprReaderTest(unittest.TestCase):
+    """Unittests for class BmprReader."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.project = os.path.join(self.directory, 'project.bmpr')
+        connection = sqlite3.connect(self.project)
+        connection.execute("CREATE TABLE RESOURCES (ID VARCHAR(255), BRANCHID VARCHAR(255), ATTRIBUTES TEXT, DATA LONGTEXT, PRIMARY KEY (ID, BRANCHID))")
+        login = {'mockup': {'controls': {'control': [
+            control('0', '__group__', children=[control('1', 'Label', {'customID': 'title', 'text': u'Anmeldung f\xfcr *alle*'}),
+                                                control('2', 'ButtonBar', {'customID': 'bar', 'text': 'OK,Cancel'})]),
+            control('3', 'Canvas'),
+            control('4', 'TextInput', {'customID': 'name', 'text': 'Name\nand address', 'customData': 'Max. 20 chars'})]}}}
+        resources = [('A', {'kind': 'mockup', 'name': 'Login', 'order': 1}, login),
+                     ('B', {'kind': 'mockup', 'name': 'Trashed', 'trashed': True}, login),
+                     ('C', {'kind': 'asset', 'name': 'logo.png'}, None),
+                     ('D', {'kind': 'mockup', 'name': 'Start', 'order': 0},
+                      {'mockup': {'controls': {'control': [control('0', 'Button', {'customID': 'start', 'text': 'Start'})]}}})]
+        for identifier, attributes, data in resources:
+            connection.execute("INSERT INTO RESOURCES VALUES (?, 'Master', ?, ?)", (identifier, json.dumps(attributes), json.dumps(data)))
+        connection.commit()
+        connection.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_controls_with_text(self):
+        """Test if the controls with text of all mockups are read in the order of the project and the documents."""
+        reader = BmprReader(self.project)
+        result = []
+        for name, mockup in reader.mockups():
+            for element in reader.controls(mockup, AdvancedMockupStringExtractor.controlElementsWithText):
+                result.append((name, element.get('controlTypeID'), element.findtext('controlProperties/text')))
+        reader.close()
+        self.assertEqual(result, [('Start', 'com.balsamiq.mockups::Button', 'Start'),
+                                  ('Login', 'com.balsamiq.mockups::Label', 'Anmeldung%20f%C3%BCr%20*alle*'),
+                                  ('Login', 'com.balsamiq.mockups::ButtonBar', 'OK%2CCancel'),
+                                  ('Login', 'com.balsamiq.mockups::TextInput', 'Name%0Aand%20address')])
+
+    def test_extract_texts_from_project(self):
+        """Test if the texts of a project-file are extracted like texts of mockup-files."""
+        texts = AdvancedMockupStringExtractor().extract(self.directory).texts
+        self.assertEqual([(text.identifier, text.text, text.filename, text.meta, text.index) for text in texts],
+                         [('start', 'Start', self.project + '!Start', None, ''),
+                          ('title', 'Anmeldung f%C3%BCr <b>alle</b>', self.project + '!Login', None, ''),
+                          ('bar_OK', 'OK', self.project + '!Login', None, 0),
+                          ('bar_Cancel', 'Cancel', self.project + '!Login', None, 1),
+                          ('name', 'Name<br />and address', self.project + '!Login', 'Max.%2020%20chars', '')])
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(BmprReaderTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
@@ -0,0 +1,157 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that writes and reads catalogs of texts in a compact binary format.
+"""
+
+import mmap
+import struct
+import zlib
+
+class CompactCatalog:
+    """ Class reading a catalog of texts by their keys without parsing the whole file.
+
+        The catalog-file is memory-mapped and the texts are found by a hash table stored in the file, so opening a
+        catalog takes constant time and every lookup reads only the slots it probes and the entry it finds.
+        All numbers are unsigned 32-bit integers in little-endian byte-order:
+
+            header:  magic MSXC, version, number of entries, number of slots (a power of two)
+            slots:   crc32 of the key and offset of the entry, 0 for empty slots, collisions probe the next slot
+            entries: length of the key, length of the text, key and text encoded in utf-8
+    """
+
+    MAGIC = 'MSXC'
+    """Bytes every catalog-file starts with."""
+
+    VERSION = 1
+    """Version of the format written by this class."""
+
+    HEADER = struct.Struct('<4sIII')
+    """Layout of the header of a catalog-file."""
+
+    SLOT = struct.Struct('<II')
+    """Layout of a slot of the hash table."""
+
+    ENTRY = struct.Struct('<II')
+    """Layout of the lengths in front of the key and the text of an entry."""
+
+    def __init__(self, catalog_file):
+        """ Constructor. Opens and memory-maps a catalog-file.
+
+            @param catalog_file: path and name of the catalog-file.
+            @raise ValueError: if the file is no catalog of a known version.
+        """
+        with open(catalog_file, 'rb') as inputfile:
+            self.data = mmap.mmap(inputfile.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < self.HEADER.size:
+            self.close()
+            raise ValueError("%s is no catalog" % catalog_file)
+        magic, version, self.count, self.slots = self.HEADER.unpack_from(self.data, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.close()
+            raise ValueError("%s is no catalog of version %d" % (catalog_file, self.VERSION))
+
+    @staticmethod
+    def hash_key(key):
+        """ Return the hash of a key used by the hash table.
+
+            @param key: key encoded in utf-8.
+        """
+        return zlib.crc32(key) & 0xffffffff
+
+    @staticmethod
+    def write(outputfile, entries):
+        """ Write a catalog containing the given keys and texts.
+
+            @param outputfile: file opened in binary mode the catalog is written to.
+            @param entries: list of tuples of keys and texts encoded in utf-8, the keys have to be unique.
+        """
+        size = 1
+        while size < 2 * len(entries):
+            size <<= 1
+        table = [(0, 0)] * size
+        offset = CompactCatalog.HEADER.size + size * CompactCatalog.SLOT.size
+        for key, text in entries:
+            hashed = CompactCatalog.hash_key(key)
+            slot = hashed & (size - 1)
+            while table[slot][1]:
+                slot = (slot + 1) & (size - 1)
+            table[slot] = (hashed, offset)
+            offset += CompactCatalog.ENTRY.size + len(key) + len(text)
+        outputfile.write(CompactCatalog.HEADER.pack(CompactCatalog.MAGIC, CompactCatalog.VERSION, len(entries), size))
+        outputfile.write(''.join(CompactCatalog.SLOT.pack(*slot) for slot in table))
+        for key, text in entries:
+            outputfile.write(CompactCatalog.ENTRY.pack(len(key), len(text)))
+            outputfile.write(key)
+            outputfile.write(text)
+
+    def get(self, key, default=None):
+        """ Return the text of a key encoded in utf-8 or default if the key is not contained in the catalog.
+
+            @param key: key as unicode or encoded in utf-8.
+            @param default: value returned for missing keys (default None)
+        """
+        if isinstance(key, unicode):
+            key = key.encode('utf8')
+        if not self.slots:
+            return default
+        hashed = self.hash_key(key)
+        slot = hashed & (self.slots - 1)
+        while True:
+            slot_hash, offset = self.SLOT.unpack_from(self.data, self.HEADER.size + slot * self.SLOT.size)
+            if not offset:
+                return default
+            if slot_hash == hashed:
+                key_length, text_length = self.ENTRY.unpack_from(self.data, offset)
+                start = offset + self.ENTRY.size
+                if self.data[start:start + key_length] == key:
+                    return self.data[start + key_length:start + key_length + text_length]
+            slot = (slot + 1) & (self.slots - 1)
+
+    def __getitem__(self, key):
+        """Return the text of a key or raise a KeyError if the key is not contained in the catalog."""
+        text = self.get(key)
+        if text is None:
+            raise KeyError(key)
+        return text
+
+    def __contains__(self, key):
+        """Return if a key is contained in the catalog."""
+        return self.get(key) is not None
+
+    def __len__(self):
+        """Return the number of entries in the catalog."""
+        return self.count
+
+    def close(self):
+        """Close the memory-mapped catalog-file."""
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
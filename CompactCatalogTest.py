@@ -0,0 +1,76 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from CompactCatalog import CompactCatalog
+
+class CompactCatalogTest(unittest.TestCase):
+    """Unittests for class CompactCatalog."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.catalog_file = os.path.join(self.directory, 'texts.catalog')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, entries):
+        """Write a catalog with the given entries."""
+        with open(self.catalog_file, 'wb') as outputfile:
+            CompactCatalog.write(outputfile, entries)
+
+    def test_lookup(self):
+        """Test if every text is found by its key and missing keys are not found."""
+        entries = [('key%d' % number, 'Text %d' % number) for number in range(1000)] + [('empty', ''), ('\xc3\x84', '\xc3\xa4')]
+        self.write(entries)
+        with CompactCatalog(self.catalog_file) as catalog:
+            self.assertEqual(len(catalog), len(entries))
+            for key, text in entries:
+                self.assertEqual(catalog[key], text)
+            self.assertEqual(catalog.get(u'\xc4'), '\xc3\xa4')
+            self.assertFalse('missing' in catalog)
+            self.assertRaises(KeyError, lambda: catalog['key1000'])
+
+    def test_empty_catalog(self):
+        """Test if an empty catalog can be read."""
+        self.write([])
+        with CompactCatalog(self.catalog_file) as catalog:
+            self.assertEqual(len(catalog), 0)
+            self.assertEqual(catalog.get('key', 'default'), 'default')
+
+    def test_no_catalog(self):
+        """Test if other files are not read as catalog."""
+        with open(self.catalog_file, 'wb') as outputfile:
+            outputfile.write('{"key":"text"}')
+        self.assertRaises(ValueError, CompactCatalog, self.catalog_file)
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(CompactCatalogTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
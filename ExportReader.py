@@ -0,0 +1,178 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that is used to read the texts of files exported by AdvancedMockupStringExtractor.
+"""
+
+import htmlentitydefs
+import json
+import re
+import urllib
+
+from TextElement import TextElement
+
+class ExportReader:
+    """ Class that reads exported texts in XML- or JSON-format.
+
+        The XML-export is not parsed by an XML-parser, because the html-markup in its texts is not escaped. Every
+        gui_element is matched by a regular expression instead, escaped characters are unescaped afterwards, so
+        exports that were escaped by a translation memory system can be read as well. Identifiers and texts are
+        returned in the form they are written into the XML-export.
+    """
+
+    GUI_ELEMENT = re.compile(r'<gui_element>(.*?)</gui_element>', re.S)
+    """Pattern of regular expression that matches the gui_elements of an XML-export."""
+
+    GUI_ELEMENT_FRAGMENT = re.compile(r'[ \t]*<gui_element>(.*?)</gui_element>\n?', re.S)
+    """Pattern of regular expression that matches the gui_elements of an XML-export with their indentation and linebreak."""
+
+    FIELD = re.compile(r'<(file|id|index|text|metainformation)>(.*?)</\1>|<(file|id|index|text|metainformation)\s*/>', re.S)
+    """Pattern of regular expression that matches the properties of a gui_element and their content."""
+
+    ENTITY = re.compile(r'&(#[0-9]+|#[xX][0-9a-fA-F]+|[a-zA-Z]+);')
+    """Pattern of regular expression that matches escaped characters."""
+
+    @staticmethod
+    def unescape(text):
+        """ Return text with all escaped characters replaced by the characters themselves.
+
+            @param text: unicode-text containing escaped characters.
+        """
+        def replace(match):
+            entity = match.group(1)
+            if entity[:2] in ('#x', '#X'):
+                return unichr(int(entity[2:], 16))
+            if entity[0] == '#':
+                return unichr(int(entity[1:]))
+            if entity in htmlentitydefs.name2codepoint:
+                return unichr(htmlentitydefs.name2codepoint[entity])
+            return match.group(0)
+        return ExportReader.ENTITY.sub(replace, text)
+
+    @staticmethod
+    def decode(data):
+        """ Return the content of an export as unicode. Exports are written in utf-8 although latin-1 is declared.
+
+            @param data: content of an export-file.
+        """
+        try:
+            return data.decode('utf8')
+        except UnicodeDecodeError:
+            return data.decode('latin-1')
+
+    @staticmethod
+    def exported_text(text):
+        """ Return a text in the form it is written into the XML-export.
+
+            @param text: text extracted from a mockup.
+        """
+        if isinstance(text, unicode):
+            text = text.encode('utf8')
+        return ExportReader.decode(urllib.unquote_plus(urllib.unquote_plus(text)))
+
+    @staticmethod
+    def exported_identifier(identifier):
+        """ Return an identifier in the form it is written into the XML-export.
+
+            @param identifier: identifier extracted from a mockup.
+        """
+        return ExportReader.exported_text(identifier.decode('unicode-escape').replace(' ', '_'))
+
+    @staticmethod
+    def read(input_file):
+        """ Return the texts of an export as list of TextElements. Exports in JSON-format are recognized by the
+            file-extension json, they contain no filenames, indices and metainformation.
+
+            @param input_file: path and name of the export-file.
+        """
+        with open(input_file) as inputfile:
+            data = inputfile.read()
+        if input_file.lower().endswith('.json'):
+            return ExportReader.read_json(data)
+        return ExportReader.read_xml(data)
+
+    @staticmethod
+    def read_fragments(input_file):
+        """ Return the texts of an export in XML-format as list of tuples of TextElement and gui_element, see read_xml_fragments.
+
+            @param input_file: path and name of the export-file.
+        """
+        with open(input_file) as inputfile:
+            return ExportReader.read_xml_fragments(inputfile.read())
+
+    @staticmethod
+    def read_json(data):
+        """ Return the texts of an export in JSON-format as list of TextElements.
+
+            @param data: content of the export-file.
+        """
+        result = []
+        for identifier, text in json.loads(ExportReader.decode(data)).items():
+            identifier = ExportReader.exported_identifier(identifier.encode('utf8'))
+            result.append(TextElement(identifier, ExportReader.exported_text(text), None, None))
+        return result
+
+    @staticmethod
+    def read_xml(data):
+        """ Return the texts of an export in XML-format as list of TextElements.
+
+            @param data: content of the export-file.
+        """
+        return [ExportReader.text_element(element.group(1)) for element in ExportReader.GUI_ELEMENT.finditer(ExportReader.decode(data))]
+
+    @staticmethod
+    def read_xml_fragments(data):
+        """ Return the texts of an export in XML-format as list of tuples of TextElement and the gui_element like it
+            is written in the export, with its indentation and linebreak and in the encoding of the export.
+
+            @param data: content of the export-file.
+        """
+        try:
+            encoding, data = 'utf8', data.decode('utf8')
+        except UnicodeDecodeError:
+            encoding, data = 'latin-1', data.decode('latin-1')
+        return [(ExportReader.text_element(element.group(1)), element.group(0).encode(encoding))
+                for element in ExportReader.GUI_ELEMENT_FRAGMENT.finditer(data)]
+
+    @staticmethod
+    def text_element(content):
+        """ Return a gui_element of an XML-export as TextElement.
+
+            @param content: unicode-content of the gui_element between its tags.
+        """
+        fields = {}
+        for field in ExportReader.FIELD.finditer(content):
+            if field.group(1):
+                fields[field.group(1)] = ExportReader.unescape(field.group(2))
+            else:
+                fields[field.group(3)] = u''
+        index = fields.get('index', u'')
+        if index.isdigit():
+            index = int(index)
+        else:
+            index = ''
+        return TextElement(fields.get('id', u''), fields.get('text', u''), fields.get('file'),
+                           fields.get('metainformation') or None, index)
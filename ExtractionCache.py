@@ -0,0 +1,113 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that caches the elements extracted from mockup-files between runs.
+"""
+
+import cPickle
+import hashlib
+import logging
+import os
+import sqlite3
+
+class ExtractionCache:
+    """ Class that stores the events recorded while parsing mockup-files in a SQLite-database.
+
+        The events of a file are returned as long as the file is unchanged. A file is unchanged if its modification
+        time and size did not change or, if they did, the SHA-1 digest of its content is still the same. The state
+        of a file is taken before it is parsed, so a file changed while it is parsed is parsed again in the next run.
+    """
+
+    def __init__(self, cache_file, rebuild=False):
+        """ Constructor.
+
+            @param cache_file: path of the SQLite-database the cache is stored in.
+            @param rebuild: flag indicating if all cached entries should be removed (default False)
+        """
+        self.connection = sqlite3.connect(cache_file)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS mockups (path TEXT PRIMARY KEY, mtime REAL, size INTEGER, digest TEXT, settings TEXT, events BLOB)")
+        if rebuild:
+            logging.info("Rebuilding extraction cache " + cache_file)
+            self.connection.execute("DELETE FROM mockups")
+        self.connection.commit()
+
+    @staticmethod
+    def file_digest(input_file):
+        """ Return the SHA-1 digest of the content of a file.
+
+            @param input_file: path of the file.
+        """
+        digest = hashlib.sha1()
+        with open(input_file, 'rb') as mockup:
+            for chunk in iter(lambda: mockup.read(65536), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def file_state(input_file):
+        """ Return modification time, size and SHA-1 digest of a file. The file is stat-ed before its content is read.
+
+            @param input_file: path of the file.
+        """
+        stat = os.stat(input_file)
+        return stat.st_mtime, stat.st_size, ExtractionCache.file_digest(input_file)
+
+    def get(self, input_file, settings):
+        """ Return the cached events of a mockup-file or None if the file was changed or is not cached.
+
+            @param input_file: path of the mockup-file.
+            @param settings: string describing the settings the events were recorded with.
+        """
+        path = os.path.abspath(input_file)
+        row = self.connection.execute("SELECT mtime, size, digest, settings, events FROM mockups WHERE path = ?", (path,)).fetchone()
+        if row is None or row[3] != settings:
+            return None
+        stat = os.stat(input_file)
+        if (row[0], row[1]) != (stat.st_mtime, stat.st_size):
+            if stat.st_size != row[1] or self.file_digest(input_file) != row[2]:
+                return None
+            self.connection.execute("UPDATE mockups SET mtime = ? WHERE path = ?", (stat.st_mtime, path))
+        return cPickle.loads(str(row[4]))
+
+    def put(self, input_file, settings, events, state):
+        """ Store the events of a mockup-file.
+
+            @param input_file: path of the mockup-file.
+            @param settings: string describing the settings the events were recorded with.
+            @param events: list of events recorded while parsing the mockup-file.
+            @param state: modification time, size and digest of the mockup-file returned by file_state before it was parsed.
+        """
+        blob = sqlite3.Binary(cPickle.dumps(events, cPickle.HIGHEST_PROTOCOL))
+        self.connection.execute("INSERT OR REPLACE INTO mockups VALUES (?, ?, ?, ?, ?, ?)", (os.path.abspath(input_file),) + tuple(state) + (settings, blob))
+
+    def commit(self):
+        """Write all changes of the cache to the database."""
+        self.connection.commit()
+
+    def close(self):
+        """Write all changes and close the database."""
+        self.connection.commit()
+        self.connection.close()
@@ -0,0 +1,91 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ExtractionCache import ExtractionCache
+from TextElement import TextElement
+
+class ExtractionCacheTest(unittest.TestCase):
+    """Unittests for class ExtractionCache."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.mockup = os.path.join(self.directory, 'mockup.bmml')
+        with open(self.mockup, 'w') as mockup:
+            mockup.write('<mockup/>')
+        self.cache = ExtractionCache(os.path.join(self.directory, 'cache'))
+        self.events = [('text', TextElement('id', 'text', self.mockup, None))]
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+
+    def test_get_unchanged_file(self):
+        """Test if the events of an unchanged file are returned."""
+        self.cache.put(self.mockup, 'settings', self.events, ExtractionCache.file_state(self.mockup))
+        self.assertEqual(self.cache.get(self.mockup, 'settings'), self.events)
+
+    def test_get_file_with_other_settings(self):
+        """Test if no events are returned for a file that was cached with other settings."""
+        self.cache.put(self.mockup, 'settings', self.events, ExtractionCache.file_state(self.mockup))
+        self.assertEqual(self.cache.get(self.mockup, 'other settings'), None)
+
+    def test_get_changed_file(self):
+        """Test if no events are returned for a file with changed content."""
+        self.cache.put(self.mockup, 'settings', self.events, ExtractionCache.file_state(self.mockup))
+        with open(self.mockup, 'w') as mockup:
+            mockup.write('<mockup></mockup>')
+        self.assertEqual(self.cache.get(self.mockup, 'settings'), None)
+
+    def test_get_file_changed_while_parsed(self):
+        """Test if no events are returned for a file that changed after its state was taken for parsing."""
+        state = ExtractionCache.file_state(self.mockup)
+        with open(self.mockup, 'w') as mockup:
+            mockup.write('<mockup></mockup>')
+        os.utime(self.mockup, (state[0] + 1, state[0] + 1))
+        self.cache.put(self.mockup, 'settings', self.events, state)
+        self.assertEqual(self.cache.get(self.mockup, 'settings'), None)
+
+    def test_get_touched_file(self):
+        """Test if the events of a file with new modification time but same content are returned."""
+        self.cache.put(self.mockup, 'settings', self.events, ExtractionCache.file_state(self.mockup))
+        os.utime(self.mockup, (0, 0))
+        self.assertEqual(self.cache.get(self.mockup, 'settings'), self.events)
+
+    def test_rebuild(self):
+        """Test if all entries are removed when the cache is rebuilt."""
+        self.cache.put(self.mockup, 'settings', self.events, ExtractionCache.file_state(self.mockup))
+        self.cache.close()
+        self.cache = ExtractionCache(os.path.join(self.directory, 'cache'), rebuild=True)
+        self.assertEqual(self.cache.get(self.mockup, 'settings'), None)
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(ExtractionCacheTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
@@ -0,0 +1,74 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes the immutable result of an extraction and the diagnostics collected during it.
+"""
+
+import collections
+import logging
+
+
+class Diagnostic(collections.namedtuple('Diagnostic', ['level', 'code', 'message', 'filename', 'identifier'])):
+    """ Problem found in the mockups during an extraction.
+
+        level is the logging-level the problem is reported with, code names the kind of problem:
+        missing_id, id_without_text, conflicting_id, syntax_error, project_error, archive_error or ignored_text_missing.
+    """
+    __slots__ = ()
+
+    def is_error(self):
+        """Return if the problem is reported as an error."""
+        return self.level >= logging.ERROR
+
+
+class ExtractionResult(collections.namedtuple('ExtractionResult', ['texts', 'ignored', 'diagnostics'])):
+    """ Immutable result of an extraction holding tuples of the extracted texts in the order they were found,
+        of the ignored texts and of the diagnostics. Texts spilled to disk are held by a SqliteTextRegistry instead
+        of a tuple, they are read from it one at a time.
+    """
+    __slots__ = ()
+
+    @property
+    def errors(self):
+        """Tuple of the diagnostics that are reported as errors."""
+        return tuple(diagnostic for diagnostic in self.diagnostics if diagnostic.is_error())
+
+
+class ExtractionError(Exception):
+    """ Exception raised when an extraction is aborted because of an error in the mockups.
+        The result holds the texts and diagnostics collected until the extraction was aborted.
+    """
+
+    def __init__(self, result):
+        """ Constructor.
+
+            @param result: ExtractionResult collected until the extraction was aborted.
+        """
+        message = "Extraction aborted"
+        if result.diagnostics:
+            message = result.diagnostics[-1].message
+        Exception.__init__(self, message)
+        self.result = result
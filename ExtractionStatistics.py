@@ -0,0 +1,170 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes classes that record timings and counters of the extraction of texts from
+balsamiq-mockup-files.
+"""
+
+import collections
+import contextlib
+import json
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+class ExtractionStatistics:
+    """ Class that records the wall time of the stages of an extraction, the time of every parsed mockup-file,
+        counters of the texts found and the number of controls per control-type.
+
+        The times of the files are measured in the process parsing the file, so with several jobs their sum can be
+        higher than the time of the whole extraction. The time of a stage entered inside another stage is left out of
+        the outer stage, so no time is counted twice and the stages add up to the time of the run.
+    """
+
+    enabled = True
+    """Flag indicating if the statistics are recorded, used to skip measuring in the worker-processes."""
+
+    def __init__(self):
+        """Constructor."""
+        self.stages = collections.OrderedDict()
+        self.files = collections.OrderedDict()
+        self.counters = collections.defaultdict(int)
+        self.controls = collections.defaultdict(int)
+        self.nested = []
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """ Return a context-manager that adds the wall time spent in it to a stage, without the time spent in
+            stages entered inside it.
+
+            @param name: name of the stage.
+        """
+        self.nested.append(0.0)
+        start = time.time()
+        try:
+            yield
+        finally:
+            elapsed = time.time() - start
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - self.nested.pop()
+            if self.nested:
+                self.nested[-1] += elapsed
+
+    def timed(self, name, iterable):
+        """ Yield the items of an iterable and add the time spent to get them to a stage.
+
+            @param name: name of the stage.
+            @param iterable: iterable whose items are yielded.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name, amount=1):
+        """ Increase a counter.
+
+            @param name: name of the counter.
+            @param amount: amount the counter is increased by (default 1)
+        """
+        self.counters[name] += amount
+
+    def add_file(self, input_file, file_statistics):
+        """ Add the statistics recorded while parsing a mockup-file.
+
+            @param input_file: path of the mockup-file.
+            @param file_statistics: dictionary with the times parsing and normalization and the number of controls per control-type.
+        """
+        controls = file_statistics['controls']
+        self.files[input_file] = {'parsing': file_statistics['parsing'], 'normalization': file_statistics['normalization'],
+                                  'controls': sum(controls.values())}
+        for control_type, number in controls.items():
+            self.controls[control_type] += number
+
+    @staticmethod
+    def peak_memory():
+        """Return the maximum resident set size of this process and of its finished child-processes in kilobytes."""
+        if resource is None:
+            return None
+        return {'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss}
+
+    def report(self):
+        """Return all recorded statistics as dictionary."""
+        return {'stages': self.stages,
+                'files': self.files,
+                'totals': {'parsing': sum(item['parsing'] for item in self.files.values()),
+                           'normalization': sum(item['normalization'] for item in self.files.values())},
+                'counters': dict(self.counters),
+                'controls': dict(self.controls),
+                'peak_memory_kb': self.peak_memory()}
+
+    def write(self, output_file):
+        """ Write all recorded statistics to a file in JSON-format.
+
+            @param output_file: path and name of the output-file.
+        """
+        with open(output_file, 'w') as outputfile:
+            json.dump(self.report(), outputfile, indent=2)
+
+
+class NullStatistics(ExtractionStatistics):
+    """Statistics that record nothing, used when no statistics are requested."""
+
+    enabled = False
+
+    class NullStage:
+        """Context-manager that does nothing."""
+
+        def __enter__(self):
+            pass
+
+        def __exit__(self, exc_type, exc_value, traceback):
+            pass
+
+    NULL_STAGE = NullStage()
+
+    def __init__(self):
+        """Constructor."""
+        ExtractionStatistics.__init__(self)
+
+    def stage(self, name):
+        return self.NULL_STAGE
+
+    def timed(self, name, iterable):
+        return iterable
+
+    def count(self, name, amount=1):
+        pass
+
+    def add_file(self, input_file, file_statistics):
+        pass
@@ -0,0 +1,85 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import time
+import unittest
+
+from AdvancedMockupStringExtractor import AdvancedMockupStringExtractor
+from ExtractionStatistics import ExtractionStatistics, NullStatistics
+
+class ExtractionStatisticsTest(unittest.TestCase):
+    """Unittests for class ExtractionStatistics."""
+
+    def test_stage_adds_times(self):
+        """Test if the times of all runs of a stage are added and items yielded by timed iterables are kept."""
+        statistics = ExtractionStatistics()
+        with statistics.stage('parsing'):
+            pass
+        first = statistics.stages['parsing']
+        with statistics.stage('parsing'):
+            pass
+        self.assertTrue(statistics.stages['parsing'] >= first)
+        self.assertEqual(list(statistics.timed('discovery', ['a.bmml', 'b.bmml'])), ['a.bmml', 'b.bmml'])
+        self.assertEqual(statistics.stages.keys(), ['parsing', 'discovery'])
+
+    def test_nested_stage_is_not_counted_twice(self):
+        """Test if the time of a stage entered inside another stage is left out of the outer stage."""
+        statistics = ExtractionStatistics()
+        start = time.time()
+        with statistics.stage('extraction'):
+            time.sleep(0.01)
+            for _ in statistics.timed('discovery', [1, 2]):
+                with statistics.stage('checks'):
+                    time.sleep(0.02)
+        elapsed = time.time() - start
+        self.assertTrue(statistics.stages['checks'] >= 0.04)
+        self.assertTrue(0.01 <= statistics.stages['extraction'] < 0.05)
+        self.assertTrue(sum(statistics.stages.values()) <= elapsed)
+
+    def test_null_statistics_record_nothing(self):
+        """Test if NullStatistics do not record stages, counters and files."""
+        statistics = NullStatistics()
+        with statistics.stage('parsing'):
+            statistics.count('texts')
+            statistics.add_file('a.bmml', {'parsing': 1.0, 'normalization': 0.5, 'controls': {'Label': 1}})
+        report = statistics.report()
+        self.assertEqual((report['stages'], report['files'], report['counters']), ({}, {}, {}))
+
+    def test_extraction_statistics(self):
+        """Test if the extractor records files, controls and counters."""
+        statistics = ExtractionStatistics()
+        AdvancedMockupStringExtractor(statistics=statistics).extract('test_input/Group01.bmml')
+        report = statistics.report()
+        self.assertEqual(report['files'].keys(), ['test_input/Group01.bmml'])
+        self.assertEqual(report['files']['test_input/Group01.bmml']['controls'], 4)
+        self.assertEqual(report['controls'], {'__group__': 1, 'com.balsamiq.mockups::Label': 1,
+                                              'com.balsamiq.mockups::ButtonBar': 1, 'com.balsamiq.mockups::Button': 1})
+        self.assertEqual(report['counters'], {'parsed_files': 1, 'texts': 2, 'combined_texts': 2})
+        self.assertEqual(sorted(report['stages']), ['checks', 'extraction'])
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(ExtractionStatisticsTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
@@ -0,0 +1,77 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that lists the files of a git-working-tree changed since a revision.
+"""
+
+import os
+import subprocess
+
+class GitChanges(object):
+    """ Files of a directory in a git-working-tree that were added, modified or deleted since a revision.
+
+        The files are listed by the git command-line client, so no library is needed to read the repository.
+        The working-tree is compared with the revision, so changes that were not committed yet are listed as well.
+        Renamed files are listed as deleted and added file, untracked files that are not ignored are listed as added.
+    """
+
+    GIT = 'git'
+    """Command of the git command-line client."""
+
+    def __init__(self, directory, revision):
+        """ Constructor.
+
+            @param directory: directory in a git-working-tree, only files in it and its subdirectories are listed.
+            @param revision: revision the working-tree is compared with, like a commit, branch or tag.
+        """
+        self.directory = directory or '.'
+        self.revision = revision
+
+    def git(self, *arguments):
+        """ Run git in the directory and return its output.
+
+            @param arguments: arguments of the git-command.
+            @raise OSError: if git is not installed.
+            @raise CalledProcessError: if git fails, like for unknown revisions or directories outside of a working-tree.
+        """
+        return subprocess.check_output((self.GIT,) + arguments, cwd=self.directory)
+
+    def changed_files(self):
+        """ Return the files changed since the revision, joined with the directory.
+
+            @return: tuple of the list of added and modified files and of the list of deleted files.
+        """
+        changed, deleted = [], []
+        fields = self.git('diff', '--name-status', '-z', '--no-renames', '--relative', self.revision, '--').split('\0')
+        for status, path in zip(fields[0::2], fields[1::2]):
+            if status == 'D':
+                deleted.append(os.path.join(self.directory, path))
+            else:
+                changed.append(os.path.join(self.directory, path))
+        for path in self.git('ls-files', '-z', '--others', '--exclude-standard').split('\0'):
+            if path:
+                changed.append(os.path.join(self.directory, path))
+        return changed, deleted
@@ -0,0 +1,86 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from GitChanges import GitChanges
+
+class GitChangesTest(unittest.TestCase):
+    """Unittests for class GitChanges."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ('Kept.bmml', 'Changed.bmml', 'Deleted.bmml'):
+            self.write(name, '<mockup/>')
+        self.git('init', '-q')
+        self.git('add', '.')
+        self.git('-c', 'user.name=test', '-c', 'user.email=test@example.com', 'commit', '-q', '-m', 'mockups')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def git(self, *arguments):
+        """Run git in the temporary repository."""
+        subprocess.check_call(('git',) + arguments, cwd=self.directory)
+
+    def write(self, name, content):
+        """Write a file into the temporary repository."""
+        path = os.path.join(self.directory, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as outputfile:
+            outputfile.write(content)
+
+    def test_changed_files(self):
+        """Test if modified, added, untracked and deleted files are listed, but not unchanged files."""
+        self.write('Changed.bmml', '<mockup><controls/></mockup>')
+        self.write(os.path.join('assets', 'Added.bmml'), '<mockup/>')
+        self.git('add', 'assets')
+        self.write('Untracked.bmml', '<mockup/>')
+        os.remove(os.path.join(self.directory, 'Deleted.bmml'))
+        changed, deleted = GitChanges(self.directory, 'HEAD').changed_files()
+        self.assertEqual(sorted(os.path.relpath(path, self.directory) for path in changed),
+                         ['Changed.bmml', 'Untracked.bmml', os.path.join('assets', 'Added.bmml')])
+        self.assertEqual(deleted, [os.path.join(self.directory, 'Deleted.bmml')])
+
+    def test_changed_files_of_subdirectory(self):
+        """Test if only the files in the directory are listed, joined with the directory."""
+        self.write(os.path.join('assets', 'Added.bmml'), '<mockup/>')
+        self.write('Changed.bmml', '<mockup><controls/></mockup>')
+        assets = os.path.join(self.directory, 'assets')
+        self.assertEqual(GitChanges(assets, 'HEAD').changed_files(), ([os.path.join(assets, 'Added.bmml')], []))
+
+    def test_unknown_revision(self):
+        """Test if an unknown revision raises an error."""
+        self.assertRaises(subprocess.CalledProcessError, GitChanges(self.directory, 'unknown').changed_files)
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(GitChangesTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
@@ -0,0 +1,150 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that is used to generate synthetic balsamiq-mockup-files for benchmarks.
+"""
+
+import os
+import random
+
+class MockupCorpusGenerator:
+    """ Class that writes directories of synthetic mockup-files.
+
+        The files contain controls of the types that hold texts, their texts are built of words in the format of
+        balsamiq-mockups (html-whitespaces, newlines, bold text and umlauts). All random choices are made by a
+        generator seeded with the given seed, so the same parameters always give the same files.
+    """
+
+    CONTROL_TYPES = ["Label", "Paragraph", "TextArea", "TextInput", "SubTitle", "Button", "RadioButton", "Accordion",
+                     "Tooltip", "IconLabel", "ComboBox", "ButtonBar", "TabBar", "CheckBox", "Link"]
+    """Types of controls containing texts, without the prefix com.balsamiq.mockups::."""
+
+    WORDS = ["Save", "Cancel", "Name", "Address", "%C3%84nderung", "Gr%C3%B6%C3%9Fe", "*bold*", "C%2B%2B",
+             "%0A", "breakNewLine", "%20%20", "%28optional%29", "a%26b", "%3Cli%3E"]
+    """Words the texts of the controls are built of."""
+
+    def __init__(self, files=100, controls=50, mix=None, fanout=3, duplicates=0.05, text_length=5, seed=0):
+        """ Constructor.
+
+            @param files: number of mockup-files (default 100)
+            @param controls: number of controls per mockup-file (default 50)
+            @param mix: dictionary of weights of the control-types, all types are equally weighted if not given (default None)
+            @param fanout: number of texts of ButtonBars, TabBars and ComboBoxes (default 3)
+            @param duplicates: rate of controls repeating the ID and text of a former control (default 0.05)
+            @param text_length: number of words of every text (default 5)
+            @param seed: seed of the random-generator (default 0)
+        """
+        self.files = files
+        self.controls = controls
+        self.mix = mix or dict((control_type, 1) for control_type in self.CONTROL_TYPES)
+        self.fanout = fanout
+        self.duplicates = duplicates
+        self.text_length = text_length
+        self.seed = seed
+
+    @staticmethod
+    def parse_mix(mix):
+        """ Return the weights of control-types given as comma-separated list like Label=3,Button=1.
+
+            @param mix: string with the weights of control-types.
+        """
+        result = {}
+        for item in mix.split(','):
+            control_type, _, weight = item.partition('=')
+            if control_type.strip() not in MockupCorpusGenerator.CONTROL_TYPES:
+                raise ValueError('Unknown control-type %s' % control_type)
+            result[control_type.strip()] = float(weight or 1)
+        return result
+
+    def parameters(self):
+        """Return all parameters of the generator."""
+        return {'files': self.files, 'controls': self.controls, 'mix': self.mix, 'fanout': self.fanout,
+                'duplicates': self.duplicates, 'text_length': self.text_length, 'seed': self.seed}
+
+    def text(self, generator):
+        """ Return a random text built of text_length words.
+
+            @param generator: random-generator.
+        """
+        return '%20'.join(generator.choice(self.WORDS) for _ in range(self.text_length))
+
+    def control(self, number, control_type, identifier, text):
+        """ Return a control in the format of mockup-files.
+
+            @param number: number of the control in its mockup-file.
+            @param control_type: type of the control without the prefix com.balsamiq.mockups::.
+            @param identifier: custom control ID of the control.
+            @param text: text of the control.
+        """
+        return ('    <control controlID="%d" controlTypeID="com.balsamiq.mockups::%s" x="%d" y="%d" w="-1" h="-1" '
+                'measuredW="100" measuredH="27" zOrder="%d" locked="false" isInGroup="-1">\n'
+                '      <controlProperties>\n'
+                '        <customID>%s</customID>\n'
+                '        <text>%s</text>\n'
+                '      </controlProperties>\n'
+                '    </control>\n') % (number, control_type, number % 10 * 110, number // 10 * 40, number, identifier, text)
+
+    def generate(self, output_dir):
+        """ Write all mockup-files into a directory and return their paths.
+
+            @param output_dir: directory the mockup-files are written to, it is created if it does not exist.
+        """
+        generator = random.Random(self.seed)
+        control_types = sorted(self.mix)
+        weights = [self.mix[control_type] for control_type in control_types]
+        total = float(sum(weights))
+        written = []
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+        paths = []
+        for file_number in range(self.files):
+            controls = []
+            for number in range(self.controls):
+                if written and generator.random() < self.duplicates:
+                    control_type, identifier, text = generator.choice(written)
+                else:
+                    choice = generator.random() * total
+                    for control_type, weight in zip(control_types, weights):
+                        choice -= weight
+                        if choice < 0:
+                            break
+                    identifier = 'f%04d_c%04d' % (file_number, number)
+                    if control_type in ('ButtonBar', 'TabBar'):
+                        text = '%2C'.join(self.text(generator) for _ in range(self.fanout))
+                    elif control_type == 'ComboBox':
+                        text = '%0A'.join(self.text(generator) for _ in range(self.fanout))
+                    else:
+                        text = self.text(generator)
+                        written.append((control_type, identifier, text))
+                controls.append(self.control(number, control_type, identifier, text))
+            path = os.path.join(output_dir, 'mockup%04d.bmml' % file_number)
+            with open(path, 'w') as outputfile:
+                outputfile.write('<mockup version="1.0" skin="sketch" measuredW="1100" measuredH="%d" mockupW="1100" mockupH="%d">\n'
+                                 '  <controls>\n' % (self.controls * 4 + 40, self.controls * 4 + 40))
+                outputfile.writelines(controls)
+                outputfile.write('  </controls>\n</mockup>\n')
+            paths.append(path)
+        return paths
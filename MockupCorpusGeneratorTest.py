@@ -0,0 +1,77 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import shutil
+import tempfile
+import unittest
+
+from lxml import etree
+
+from MockupCorpusGenerator import MockupCorpusGenerator
+
+class MockupCorpusGeneratorTest(unittest.TestCase):
+    """Unittests for class MockupCorpusGenerator."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_files(self, paths):
+        """Return the contents of the given files."""
+        contents = []
+        for path in paths:
+            with open(path) as inputfile:
+                contents.append(inputfile.read())
+        return contents
+
+    def test_generates_same_files_for_same_seed(self):
+        """Test if the same parameters and seed give the same mockup-files."""
+        first = self.read_files(MockupCorpusGenerator(files=3, controls=20, seed=7).generate(self.directory + '/first'))
+        second = self.read_files(MockupCorpusGenerator(files=3, controls=20, seed=7).generate(self.directory + '/second'))
+        other = self.read_files(MockupCorpusGenerator(files=3, controls=20, seed=8).generate(self.directory + '/other'))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test_generates_controls_of_mix(self):
+        """Test if the mockup-files contain the given number of controls of the given types."""
+        generator = MockupCorpusGenerator(files=2, controls=10, mix=MockupCorpusGenerator.parse_mix('ButtonBar=1'),
+                                          fanout=4, duplicates=0)
+        for path in generator.generate(self.directory):
+            controls = etree.parse(path).getroot().findall('controls/control')
+            self.assertEqual(len(controls), 10)
+            for control in controls:
+                self.assertEqual(control.get('controlTypeID'), 'com.balsamiq.mockups::ButtonBar')
+                self.assertEqual(len(control.findtext('controlProperties/text').split('%2C')), 4)
+
+    def test_unknown_control_type(self):
+        """Test if unknown control-types in the mix are rejected."""
+        self.assertRaises(ValueError, MockupCorpusGenerator.parse_mix, 'Label=1,Unknown=2')
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(MockupCorpusGeneratorTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
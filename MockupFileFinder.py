@@ -0,0 +1,117 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that is used to search directories recursively for balsamiq-mockup-files.
+"""
+
+import fnmatch
+import os
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+class MockupFileFinder:
+    """ Class that walks through a directory-tree and yields the paths of all mockup-files in it.
+
+        Files and directories are matched against glob-patterns by their name and by their path relative to the
+        searched directory. Excluded directories are not entered at all. The paths are yielded while walking
+        through the tree, so the files can be parsed before the whole tree was searched.
+    """
+
+    def __init__(self, include=None, exclude=None, follow_symlinks=False):
+        """ Constructor.
+
+            @param include: glob-patterns of files that should be found (default ['*.bmml'])
+            @param exclude: glob-patterns of files and directories that should be skipped (default None)
+            @param follow_symlinks: flag indicating if symbolic links to directories should be followed (default False)
+        """
+        self.include = include or ['*.bmml']
+        self.exclude = exclude or []
+        self.follow_symlinks = follow_symlinks
+
+    @staticmethod
+    def matches(patterns, name, relative_path):
+        """ Return if the name or the relative path of a file or directory matches one of the patterns.
+
+            @param patterns: list of glob-patterns.
+            @param name: name of the file or directory.
+            @param relative_path: path of the file or directory relative to the searched directory.
+        """
+        for pattern in patterns:
+            if fnmatch.fnmatchcase(name, pattern) or fnmatch.fnmatchcase(relative_path, pattern):
+                return True
+        return False
+
+    @staticmethod
+    def list_directory(path):
+        """ Return name, path and the flags is-directory and is-symbolic-link of all entries of a directory sorted by name.
+            If available, os.scandir is used, so the type of most entries is known without calling stat.
+
+            @param path: path of the directory.
+        """
+        if scandir:
+            entries = [(entry.name, entry.path, entry.is_dir(), entry.is_symlink()) for entry in scandir(path)]
+        else:
+            entries = []
+            for name in os.listdir(path):
+                entry_path = os.path.join(path, name)
+                entries.append((name, entry_path, os.path.isdir(entry_path), os.path.islink(entry_path)))
+        entries.sort()
+        return entries
+
+    def find(self, input_path):
+        """ Yield the paths of all mockup-files in a directory and its subdirectories.
+            The files of a directory are yielded before the files of its subdirectories. Symbolic links to
+            directories are only followed if the flag follow_symlinks is set, every directory is entered only
+            once, so links pointing to a parent directory do not lead to endless loops.
+
+            @param input_path: directory that should be searched.
+        """
+        visited = set()
+        directories = [(input_path, '')]
+        while directories:
+            path, relative_path = directories.pop()
+            if self.follow_symlinks:
+                stat = os.stat(path)
+                if (stat.st_dev, stat.st_ino) in visited:
+                    continue
+                visited.add((stat.st_dev, stat.st_ino))
+            subdirectories = []
+            for name, entry_path, is_dir, is_symlink in self.list_directory(path):
+                entry_relative_path = relative_path + name
+                if self.matches(self.exclude, name, entry_relative_path):
+                    continue
+                if is_dir:
+                    if self.follow_symlinks or not is_symlink:
+                        subdirectories.append((entry_path, entry_relative_path + '/'))
+                elif self.matches(self.include, name, entry_relative_path):
+                    yield entry_path
+            directories.extend(reversed(subdirectories))
@@ -0,0 +1,75 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from MockupFileFinder import MockupFileFinder
+
+class MockupFileFinderTest(unittest.TestCase):
+    """Unittests for class MockupFileFinder."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for path in ['main.bmml', 'notes.txt', 'assets/symbol.bmml', 'screens/login/login.bmml', 'vendor/library.bmml']:
+            path = os.path.join(self.directory, path)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            open(path, 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def find(self, finder):
+        """Return the found files relative to the searched directory."""
+        return [os.path.relpath(path, self.directory) for path in finder.find(self.directory)]
+
+    def test_find_recursively(self):
+        """Test if all mockup-files are found, the files of a directory before the files of its subdirectories."""
+        result = self.find(MockupFileFinder())
+        self.assertEqual(result, ['main.bmml', 'assets/symbol.bmml', 'screens/login/login.bmml', 'vendor/library.bmml'])
+
+    def test_exclude_directory(self):
+        """Test if excluded directories are skipped."""
+        result = self.find(MockupFileFinder(exclude=['vendor', 'screens/login']))
+        self.assertEqual(result, ['main.bmml', 'assets/symbol.bmml'])
+
+    def test_include_pattern(self):
+        """Test if only files matching the include-patterns are found."""
+        result = self.find(MockupFileFinder(include=['*.txt', 'assets/*']))
+        self.assertEqual(result, ['notes.txt', 'assets/symbol.bmml'])
+
+    def test_symlink_loop(self):
+        """Test if a symbolic link to a parent directory is followed only once."""
+        os.symlink(self.directory, os.path.join(self.directory, 'screens', 'loop'))
+        self.assertEqual(len(self.find(MockupFileFinder(follow_symlinks=True))), 4)
+        self.assertEqual(len(self.find(MockupFileFinder())), 4)
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(MockupFileFinderTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
@@ -24,8 +24,9 @@ THE SOFTWARE.
 '''
 
 
-"""This module containes a class that is used to extract texts from balsamiq-mockup-files and to write them
-into XML-files that can be used as input for translation-memory-systems.
+
+"""This module containes a class that is used to write translated texts from files exported by
+AdvancedMockupStringExtractor back into balsamiq-mockup-files.
 """
 
 __version__ = "1.0.3"
@@ -33,76 +34,258 @@ __version__ = "1.0.3"
 import argparse
 import glob
 import logging
+import multiprocessing
 import os
 import re
 import sys
+import urllib
 
 from lxml import etree
 
+from AdvancedMockupStringExtractor import AdvancedMockupStringExtractor
+from ExportReader import ExportReader
+from MockupFileFinder import MockupFileFinder
 from OutputExporter import OutputExporter
-from TextElement import TextElement
-from TextFormatFixer import TextFormatFixer
+from TextNormalizer import TextNormalizer
 
-logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.DEBUG)
+logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.WARNING)
 
 class MockupTranslator():
-    """Class handling the extracting-process of text from Mockup-files."""
+    """ Class handling the translation of Mockup-files.
+
+        The translated texts are read from an export and indexed by their identifier and, for the items of
+        ButtonBars, TabBars and ComboBoxes, by their identifier and index, so every text is found in constant time.
+        The text of every control is replaced by its translation and the mockup-file is written to the
+        output-directory.
+    """
 
-    texts = []
-    """List with all recognized text in balsamiq-objects."""
+    SAFE_CHARACTERS = "!'()*-._~"
+    """Characters that are not percent-encoded in texts of mockup-files."""
 
+    LINEBREAK_PATTERN = re.compile(r'<br\s*/?>')
+    """Pattern of regular expression that matches html-linebreaks in translated texts."""
 
-    def __init__(self, input_file_dir=None, input_translation=None):
-        self.readTranslation(input_translation)
+    def __init__(self, input_file_dir=None, input_translation=None, output_dir=None, force=False, jobs=1, finder=None, control_handlers=None):
+        """ Constructor.
+            If input_file_dir and output_dir are given, the mockup-files are translated. If input_file_dir is a
+            directory, all mockup-files in it and its subdirectory assets are translated.
+
+            @param input_file_dir: mockup-file or directory that should be translated (default None)
+            @param input_translation: export in XML- or JSON-format containing the translated texts (default None)
+            @param output_dir: directory the translated mockup-files are written to (default None)
+            @param force: flag indicating if the translation should go on after errors (default False)
+            @param jobs: number of processes that translate mockup-files in parallel, 0 for one per cpu (default 1)
+            @param finder: MockupFileFinder searching directories recursively for mockup-files (default None)
+            @param control_handlers: handlers of the control-types by name, like controlHandlers of an extractor
+                                     with registered control-types (default AdvancedMockupStringExtractor.controlHandlers)
+        """
+        self.force = force
+        self.control_handlers = control_handlers or AdvancedMockupStringExtractor.controlHandlers
+        self.jobs = jobs
+        self.finder = finder
+        self.output_dir = output_dir
+        self.translations = {}
+        if input_translation:
+            self.readTranslation(input_translation)
+        if input_file_dir and output_dir:
+            if os.path.isfile(input_file_dir):
+                self.translate_mockups([input_file_dir], os.path.dirname(input_file_dir))
+            else:
+                self.translate_mockups_in_directory(input_file_dir)
 
     def readTranslation(self, input_file):
-        logging.info("Extracting text from file " + input_file)
+        """ Read the translated texts of an export. Texts are indexed by their identifier and by their identifier and
+            index, so the items of ButtonBars, TabBars and ComboBoxes can be found as well.
+
+            @param input_file: export in XML- or JSON-format containing the translated texts.
+        """
+        logging.info("Reading translation from file " + input_file)
         try:
-            tree = etree.parse(input_file)
-        except etree.XMLSyntaxError:
-            logging.error("XML syntaxerror in file " + input_file)
+            texts = ExportReader.read(input_file)
+        except (IOError, ValueError) as error:
+            logging.error("Error reading translation from file %s: %s", input_file, error)
             if self.force:
                 return
             else:
                 sys.exit(-1)
-        root = tree.getroot()
-        for element in root.iter("gui_element"):           
+        for text in texts:
+            self.translations[text.identifier] = text.text
+            self.translations[(text.identifier, text.index)] = text.text
+
+    def translate_mockups_in_directory(self, input_path):
+        """ Translate the mockup-files in a directory and in its subdirectory assets.
+            If a MockupFileFinder is given, all mockup-files found by it in the directory-tree are translated instead.
+
+            @param input_path: directory that should be searched for mockup-files.
+        """
+        if self.finder:
+            input_files = list(self.finder.find(input_path))
+        else:
+            input_files = glob.glob(os.path.join(input_path, '*.bmml'))
+            input_files.extend(glob.glob(os.path.join(input_path + "/assets", '*.bmml')))
+        self.translate_mockups(input_files, input_path)
+
+    def translate_mockups(self, input_files, input_path):
+        """ Translate mockup-files and write them to the output-directory with their path relative to input_path.
+            If more than one job is configured, the files are translated by a pool of processes.
+
+            @param input_files: list of mockup-files that should be translated.
+            @param input_path: directory the paths of the translated files are relative to.
+        """
+        arguments = [(infile, os.path.join(self.output_dir, os.path.relpath(infile, input_path))) for infile in input_files]
+        jobs = self.jobs or multiprocessing.cpu_count()
+        if jobs > 1 and len(arguments) > 1:
+            pool = multiprocessing.Pool(jobs, initialize_worker, [self.translations, self.force, self.control_handlers])
+            try:
+                results = pool.map(translate_mockup_file, arguments)
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            results = [self.translate_mockup(infile, outfile) for infile, outfile in arguments]
+        if False in results and not self.force:
+            sys.exit(-1)
+
+    def encode_text(self, text):
+        """ Return a translated text in the format of mockup-files.
+
+            @param text: translated text from an export.
+        """
+        text = text.replace('<b>', '*').replace('</b>', '*')
+        text = self.LINEBREAK_PATTERN.sub('\n', text)
+        if isinstance(text, unicode):
+            text = text.encode('utf8')
+        return urllib.quote(text, self.SAFE_CHARACTERS)
+
+    def translate_text(self, control_id, input_file):
+        """ Return the translated text of a control in the format of mockup-files or None if there is no translation.
+
+            @param control_id: custom control ID of the control.
+            @param input_file: mockup-file containing the control.
+        """
+        try:
+            return self.encode_text(self.translations[ExportReader.exported_identifier(control_id)])
+        except KeyError:
+            logging.warning("No translation for element %s in file %s", control_id, input_file)
+            return None
+
+    def translate_combined_text(self, control_id, text, input_file, seperator, joiner):
+        """ Return the translated items of a control holding more than one text in the format of mockup-files
+            or None if an item has no translation.
+
+            @param control_id: custom control ID of the control.
+            @param text: text of the control normalized like by AdvancedMockupStringExtractor.
+            @param input_file: mockup-file containing the control.
+            @param seperator: seperator of the items in the normalized text.
+            @param joiner: seperator of the items in mockup-files.
+        """
+        result = []
+        for index, item in enumerate(text.split(seperator)):
+            identifier = ExportReader.exported_identifier(control_id + "_" + item.replace(' ', ''))
             try:
-                id = ''
-                text = ''
-                for prop in element:
-                    if prop.tag == "id":
-                        id = prop.text
-                    if prop.tag == "text":
-                        text = prop.text
-                self.texts.append((id, text))                   
+                result.append(self.encode_text(self.translations[(identifier, index)]))
             except KeyError:
+                logging.warning("No translation for element %s in file %s", identifier, input_file)
+                return None
+        return joiner.join(result)
+
+    def translate_control(self, control, input_file):
+        """ Replace the text of a control with its translation. Controls without translation are not changed.
+            The texts of controls are split into items like by the method registered for their control-type.
+
+            @param control: control-element of a mockup-file.
+            @param input_file: mockup-file containing the control.
+        """
+        handler = self.control_handlers.get(control.get("controlTypeID"))
+        if handler is None:
+            return
+        control_id = control.findtext('controlProperties/customID')
+        text_element = control.find('controlProperties/text')
+        if not control_id or text_element is None or control_id.upper() in AdvancedMockupStringExtractor.IgnoreTags:
+            return
+        if handler == 'extract_text_from_buttonbar_tabbar':
+            translation = self.translate_combined_text(control_id, TextNormalizer.normalize_text(text_element.text), input_file, '%2C', '%2C')
+        elif handler == 'extract_text_from_combobox':
+            translation = self.translate_combined_text(control_id, TextNormalizer.normalize_text(text_element.text), input_file, '<br />', '%0A')
+        else:
+            translation = self.translate_text(control_id, input_file)
+        if translation is not None:
+            text_element.text = translation
+
+    def translate_mockup(self, input_file, output_file):
+        """ Translate the texts of all controls in a mockup-file and write it to the output-file.
+            The output-file is replaced atomically, so it is never left half written.
+
+            @param input_file: mockup-file that should be translated.
+            @param output_file: path and name of the translated mockup-file.
+            @return: False if the mockup-file could not be parsed, otherwise True.
+        """
+        logging.info("Translating file " + input_file)
+        try:
+            tree = etree.parse(input_file)
+        except etree.XMLSyntaxError:
+            logging.error("XML syntaxerror in file " + input_file)
+            return False
+        for control in tree.iter("control"):
+            self.translate_control(control, input_file)
+        output_dir = os.path.dirname(output_file)
+        if output_dir and not os.path.isdir(output_dir):
+            try:
+                os.makedirs(output_dir)
+            except OSError: #created by another worker-process
                 pass
+        with OutputExporter.open_atomic(output_file) as outputfile:
+            tree.write(outputfile, encoding='utf-8')
+        return True
 
-    def translate_mockups_in_directory(self, input_path):
-        for infile in glob.glob(os.path.join(input_path, '*.bmml')):
-                self.translate_mockup(infile)
-        for infile in glob.glob(os.path.join(input_path + "/assets", '*.bmml')):
-                self.translate_mockup(infile)
 
-    def translate_mockup(self, input_file):
-        pass
+WORKER_TRANSLATOR = None
+"""MockupTranslator of a worker-process."""
+
+def initialize_worker(translations, force, control_handlers):
+    """ Create the MockupTranslator of a worker-process holding the translated texts.
+
+        @param translations: dictionary of translated texts.
+        @param force: flag indicating if the translation should go on after errors.
+        @param control_handlers: handlers of the control-types by name.
+    """
+    global WORKER_TRANSLATOR
+    WORKER_TRANSLATOR = MockupTranslator(force=force, control_handlers=control_handlers)
+    WORKER_TRANSLATOR.translations = translations
+
+def translate_mockup_file(arguments):
+    """ Translate a mockup-file. Used as function of the worker-processes.
 
+        @param arguments: tuple of the mockup-file and the output-file.
+    """
+    return WORKER_TRANSLATOR.translate_mockup(*arguments)
 
 
 if __name__ == "__main__":
 
     PARSER = argparse.ArgumentParser()
-    PARSER.add_argument('-i', '--input', help='input-file or directory that will be read. When directory is given, all mockup-files in directory will be read.')
+    PARSER.add_argument('-i', '--input', help='input-file or directory that will be translated. When directory is given, all mockup-files in directory will be translated.')
+    PARSER.add_argument('-t', '--translation', help='export in XML- or JSON-format containing the translated texts. Can be given more than once, every translation is written into a subdirectory of the output-directory named like the export.', action='append')
+    PARSER.add_argument('-o', '--output', help='directory the translated mockup-files are written to.')
+    PARSER.add_argument('-f', '--force', help='force translating even if errors occure.', action='store_true')
+    PARSER.add_argument('-r', '--recursive', help='search for mockup-files in all subdirectories of the input-directory.', action='store_true')
+    PARSER.add_argument('-j', '--jobs', help='number of processes translating mockup-files in parallel, 0 uses one process per cpu.', type=int, default=1)
     PARSER.add_argument('-v', '--version', help='show version number.', action='store_true')
     PARSER.add_argument('--verbose', help='increase output verbosity.', action='store_true')
     ARGUMENTS = PARSER.parse_args()
     if ARGUMENTS.version:
-        pass #TODO
+        print 'MockupTranslator V', __version__
         sys.exit(0)
-    if not ARGUMENTS.input:
-        logging.error('TODO')
+    if not ARGUMENTS.translation or not ARGUMENTS.output:
+        logging.error('You have to give the translated export and the output-directory the translated mockups will be written to.')
         sys.exit(-1)
     if ARGUMENTS.verbose:
-        logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.INFO)
-    mt = MockupTranslator(input_translation=ARGUMENTS.input)
\ No newline at end of file
+        logging.getLogger().setLevel(logging.INFO)
+    FINDER = None
+    if ARGUMENTS.recursive:
+        FINDER = MockupFileFinder()
+    for TRANSLATION in ARGUMENTS.translation:
+        OUTPUT = ARGUMENTS.output
+        if len(ARGUMENTS.translation) > 1:
+            OUTPUT = os.path.join(OUTPUT, os.path.splitext(os.path.basename(TRANSLATION))[0])
+        MockupTranslator(ARGUMENTS.input or ".", TRANSLATION, OUTPUT, force=ARGUMENTS.force, jobs=ARGUMENTS.jobs, finder=FINDER)
@@ -0,0 +1,105 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from AdvancedMockupStringExtractor import AdvancedMockupStringExtractor
+from MockupFileFinder import MockupFileFinder
+from MockupTranslator import MockupTranslator
+from OutputExporter import OutputExporter
+
+class MockupTranslatorTest(unittest.TestCase):
+    """Unittests for class MockupTranslator."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.export = os.path.join(self.directory, 'export.xml')
+        OutputExporter(self.extract('test_input')).xml_export(self.export)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def extract(self, input_dir):
+        """Return identifier, text, index and metainformation of all texts extracted from a directory."""
+        return list(AdvancedMockupStringExtractor().extract(input_dir).texts)
+
+    def translate(self, replacements, jobs=1):
+        """Translate the test-mockups with the export after replacing texts in it and return the output-directory."""
+        with open(self.export) as inputfile:
+            translation = inputfile.read()
+        for text, translated in replacements:
+            translation = translation.replace(text, translated)
+        translation_file = os.path.join(self.directory, 'translation.xml')
+        with open(translation_file, 'w') as outputfile:
+            outputfile.write(translation)
+        output_dir = os.path.join(self.directory, 'output%d' % jobs)
+        MockupTranslator('test_input', translation_file, output_dir, jobs=jobs)
+        return output_dir
+
+    def summary(self, texts):
+        """Return identifier, text and index of the texts sorted by identifier."""
+        return sorted((text.identifier, text.text, text.index) for text in texts)
+
+    def test_translation_with_untranslated_export(self):
+        """Test if mockups translated with their own export contain the same texts."""
+        output_dir = self.translate([])
+        self.assertEqual(self.summary(self.extract(output_dir)), self.summary(self.extract('test_input')))
+
+    def test_translate_texts_and_items(self):
+        """Test if texts and items of ButtonBars are replaced by their translation."""
+        output_dir = self.translate([('<text>Text in RadioButton</text>', '<text>Text im *Radiobutton*</text>'),
+                                     ('<text>First</text>', '<text>Erste &amp; \xc3\x84</text>')])
+        self.assertEqual(self.summary(self.extract(output_dir)),
+                         [('button', 'Button', ''), ('firstElement', 'Text im <b>Radiobutton</b>', ''),
+                          ('groupBar_Erste%26%C3%84', 'Erste %26 %C3%84', 0), ('groupBar_Second', 'Second', 1),
+                          ('groupLabel', 'Label in group', '')])
+
+    def test_parallel_translation_equals_serial_translation(self):
+        """Test if mockups translated by several processes equal the mockups translated by one process."""
+        replacements = [('<text>Button</text>', '<text>Knopf</text>')]
+        serial = self.translate(replacements, jobs=1)
+        parallel = self.translate(replacements, jobs=2)
+        for name in ('Group01.bmml', 'RadioButton01.bmml'):
+            with open(os.path.join(serial, name)) as first, open(os.path.join(parallel, name)) as second:
+                self.assertEqual(first.read(), second.read())
+
+    def test_recursive_translation_skips_project_files(self):
+        """Test if project-files found in the directory-tree are not translated like mockup-files."""
+        input_dir = os.path.join(self.directory, 'input')
+        shutil.copytree('test_input', os.path.join(input_dir, 'screens'))
+        with open(os.path.join(input_dir, 'project.bmpr'), 'wb') as outputfile:
+            outputfile.write('SQLite format 3\0')
+        output_dir = os.path.join(self.directory, 'output')
+        MockupTranslator(input_dir, self.export, output_dir, finder=MockupFileFinder())
+        self.assertEqual(sorted(os.listdir(os.path.join(output_dir, 'screens'))), ['Group01.bmml', 'RadioButton01.bmml'])
+        self.assertEqual(os.listdir(output_dir), ['screens'])
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(MockupTranslatorTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
@@ -0,0 +1,309 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that watches balsamiq-mockup-files and rewrites the export of their texts when
+they change.
+"""
+
+import logging
+import multiprocessing
+import operator
+import os
+import time
+
+from AdvancedMockupStringExtractor import AdvancedMockupStringExtractor, extract_file_events
+from OutputExporter import OutputExporter
+from TextElement import TextElement
+
+class MockupWatcher:
+    """ Class that polls the mockup-files of a directory and keeps the export of their texts up to date.
+
+        The events of every file are kept in memory, so only files that were added or modified are parsed again.
+        The elements are indexed by their content and identifier: an element is exported by the first file
+        containing it, so only the files sharing elements with a changed file are checked for duplicates again,
+        and identifiers with different texts are found without comparing all elements. Serialized elements are
+        cached, so rewriting the output only serializes the elements of changed files.
+    """
+
+    def __init__(self, input_path, output_file, json_format=False, minified=False, force=False, finder=None,
+                 localizer=None, jobs=1, interval=0.05):
+        """ Constructor.
+
+            @param input_path: mockup-file or directory that should be watched.
+            @param output_file: path and name of the output-file.
+            @param json_format: flag indicating if the texts are written in JSON- instead of XML-format (default False)
+            @param minified: flag indicating if whitespaces should be removed from output (default False)
+            @param force: flag indicating if the output should be written even if errors occure (default False)
+            @param finder: MockupFileFinder searching directories recursively for mockup-files (default None)
+            @param localizer: PseudoLocalizer turning the texts into fake-translations (default None)
+            @param jobs: number of processes parsing mockup-files in parallel, 0 for one per cpu (default 1)
+            @param interval: seconds between two checks of the mockup-files (default 0.05)
+        """
+        self.input_path = input_path
+        self.output_file = output_file
+        self.json_format = json_format
+        self.minified = minified
+        self.force = force
+        self.finder = finder
+        self.jobs = jobs
+        self.interval = interval
+        self.exporter = OutputExporter([], localizer=localizer)
+        self.files = []
+        """Watched files in the order they are extracted in."""
+        self.order = {}
+        """Position of every watched file."""
+        self.signatures = {}
+        """Modification time and size of every watched file."""
+        self.events = {}
+        """Events recorded while parsing every watched file."""
+        self.entries = {}
+        """Filename and element of the elements exported by every file, None if they have to be determined again."""
+        self.fragments = {}
+        """Serialized elements by the id of the element."""
+        self.holders = {}
+        """Files containing an element with same identifier, text, metainformation and index."""
+        self.identifier_texts = {}
+        """Number of elements per text of every identifier."""
+        self.plain_identifiers = {}
+        """Number of elements of every identifier that are not part of a ButtonBar, TabBar or ComboBox."""
+        self.conflicting = set()
+        """Identifiers of elements with different texts."""
+        self.failed = set()
+        """Files whose extraction was aborted because of errors."""
+
+    def input_files(self):
+        """Return all mockup-files that should be watched."""
+        if os.path.isfile(self.input_path):
+            return [self.input_path]
+        return list(AdvancedMockupStringExtractor.find_input_files(self.input_path, self.finder))
+
+    @staticmethod
+    def signature(input_file):
+        """ Return modification time and size of a file or None if the file does not exist.
+
+            @param input_file: path of the file.
+        """
+        try:
+            stat = os.stat(input_file)
+        except OSError:
+            return None
+        return (stat.st_mtime, stat.st_size)
+
+    def parse(self, input_files):
+        """ Return the events of the given files, parsed by a pool of processes if more than one job is configured.
+
+            @param input_files: list of mockup-files.
+        """
+        arguments = [(input_file, self.force, False, None) for input_file in input_files]
+        if self.jobs != 1 and len(arguments) > 1:
+            pool = multiprocessing.Pool(self.jobs or multiprocessing.cpu_count())
+            try:
+                return pool.map(extract_file_events, arguments)
+            finally:
+                pool.terminate()
+                pool.join()
+        return [extract_file_events(argument) for argument in arguments]
+
+    def count_text(self, element, amount, plain):
+        """ Change the number of elements with the identifier and text of an element.
+
+            @param element: text-element that was added or removed.
+            @param amount: 1 if the element was added, -1 if it was removed.
+            @param plain: flag indicating if the element is not part of a ButtonBar, TabBar or ComboBox.
+        """
+        texts = self.identifier_texts.setdefault(element.identifier, {})
+        count = texts.get(element.text, 0) + amount
+        if count:
+            texts[element.text] = count
+        else:
+            del texts[element.text]
+            if not texts:
+                del self.identifier_texts[element.identifier]
+        if plain:
+            count = self.plain_identifiers.get(element.identifier, 0) + amount
+            if count:
+                self.plain_identifiers[element.identifier] = count
+            else:
+                del self.plain_identifiers[element.identifier]
+
+    def add_file(self, input_file, events, touched, identifiers):
+        """ Add the events of a file to the indexes and emit its log-messages.
+
+            @param input_file: path of the mockup-file.
+            @param events: events recorded while parsing the file.
+            @param touched: set the elements of the file are added to.
+            @param identifiers: set the identifiers of the file are added to.
+        """
+        self.events[input_file] = events
+        for event in events:
+            if event[0] == 'text' or event[0] == 'combined':
+                element = event[1]
+                self.count_text(element, 1, event[0] == 'text')
+                identifiers.add(element.identifier)
+                if event[0] == 'text':
+                    self.holders.setdefault(element, set()).add(input_file)
+                    touched.add(element)
+            elif event[0] == 'log':
+                logging.getLogger(event[1].name).handle(event[1])
+            elif event[0] == 'abort':
+                self.failed.add(input_file)
+
+    def remove_file(self, input_file, touched, identifiers):
+        """ Remove the events of a file from the indexes.
+
+            @param input_file: path of the mockup-file.
+            @param touched: set the elements of the file are added to.
+            @param identifiers: set the identifiers of the file are added to.
+        """
+        for event in self.events.pop(input_file):
+            if event[0] == 'text' or event[0] == 'combined':
+                element = event[1]
+                self.fragments.pop(id(element), None)
+                self.count_text(element, -1, event[0] == 'text')
+                identifiers.add(element.identifier)
+                if event[0] == 'text':
+                    holders = self.holders.get(element)
+                    if holders is not None:
+                        holders.discard(input_file)
+                        if not holders:
+                            del self.holders[element]
+                    touched.add(element)
+        self.entries.pop(input_file, None)
+        self.failed.discard(input_file)
+
+    def check_identifiers(self, identifiers):
+        """ Log an error for every identifier of elements with different texts.
+
+            @param identifiers: identifiers of elements that were added or removed.
+        """
+        for identifier in sorted(identifiers):
+            texts = self.identifier_texts.get(identifier, {})
+            if len(texts) > 1 and self.plain_identifiers.get(identifier):
+                self.conflicting.add(identifier)
+                logging.error("Elements have got same ID but different texts:\n\tID: %s\n\ttexts: %s", identifier, ', '.join(sorted(texts)))
+            else:
+                self.conflicting.discard(identifier)
+
+    def exported_entries(self, input_file):
+        """ Return key of the export order and element of the elements exported by a file. Elements that are contained in a file
+            extracted before are exported by that file.
+
+            @param input_file: path of the mockup-file.
+        """
+        position = self.order[input_file]
+        seen = set()
+        result = []
+        for event in self.events[input_file]:
+            if event[0] == 'combined':
+                result.append((TextElement.SORT_KEY(event[1]), event[1]))
+            elif event[0] == 'text' and event[1] not in seen:
+                seen.add(event[1])
+                if min(self.order[holder] for holder in self.holders[event[1]]) >= position:
+                    result.append((TextElement.SORT_KEY(event[1]), event[1]))
+        return result
+
+    def fragment(self, element):
+        """ Return an element serialized like in the output-file.
+
+            @param element: text-element that will be exported.
+        """
+        try:
+            return self.fragments[id(element)]
+        except KeyError:
+            if self.json_format:
+                fragment = self.exporter.json_entry(element)
+            else:
+                fragment = self.exporter.xml_fragment(element, self.minified)
+            self.fragments[id(element)] = fragment
+            return fragment
+
+    def write_output(self):
+        """Write all exported elements to the output-file. The output-file is replaced atomically."""
+        entries = []
+        for input_file in self.files:
+            if self.entries.get(input_file) is None:
+                self.entries[input_file] = self.exported_entries(input_file)
+            entries.extend(self.entries[input_file])
+        entries.sort(key=operator.itemgetter(0))
+        fragments = (self.fragment(element) for _, element in entries)
+        with OutputExporter.open_atomic(self.output_file) as outputfile:
+            if self.json_format:
+                self.exporter.write_json(outputfile, fragments, self.minified)
+            else:
+                self.exporter.write_xml(outputfile, fragments, self.minified)
+
+    def update(self):
+        """ Parse the files that were added or modified since the last call, remove the files that were deleted and
+            rewrite the output-file. The output-file is not written if there are errors in the mockups, unless
+            force is set.
+
+            @return: True if the output-file was written.
+        """
+        files = []
+        signatures = {}
+        for input_file in self.input_files():
+            signature = self.signature(input_file)
+            if signature is not None:
+                files.append(input_file)
+                signatures[input_file] = signature
+        changed = [input_file for input_file in files if self.signatures.get(input_file) != signatures[input_file]]
+        deleted = [input_file for input_file in self.files if input_file not in signatures]
+        if not changed and not deleted:
+            return False
+        order = dict((input_file, position) for position, input_file in enumerate(files))
+        kept = [input_file for input_file in self.files if input_file in order]
+        reordered = kept != sorted(kept, key=order.get)
+        touched = set()
+        identifiers = set()
+        for input_file in deleted:
+            self.remove_file(input_file, touched, identifiers)
+        for input_file, events in zip(changed, self.parse(changed)):
+            if input_file in self.events:
+                self.remove_file(input_file, touched, identifiers)
+            self.add_file(input_file, events, touched, identifiers)
+        self.files = files
+        self.order = order
+        self.signatures = signatures
+        if reordered:
+            self.entries = {}
+        for element in touched:
+            for holder in self.holders.get(element, ()):
+                self.entries[holder] = None
+        self.check_identifiers(identifiers)
+        if (self.failed or self.conflicting) and not self.force:
+            logging.error("Output-file %s is not written because of errors in the mockups.", self.output_file)
+            return False
+        self.write_output()
+        logging.info("Wrote output-file %s after changes of %d files.", self.output_file, len(changed) + len(deleted))
+        return True
+
+    def run(self):
+        """Check the mockup-files for changes in the configured interval until the program is interrupted."""
+        logging.info("Watching mockup-files in %s", self.input_path)
+        while True:
+            start = time.time()
+            self.update()
+            time.sleep(max(0.0, self.interval - (time.time() - start)))
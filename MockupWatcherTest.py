@@ -0,0 +1,112 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from AdvancedMockupStringExtractor import AdvancedMockupStringExtractor
+from MockupCorpusGenerator import MockupCorpusGenerator
+from MockupWatcher import MockupWatcher
+from OutputExporter import OutputExporter
+
+class MockupWatcherTest(unittest.TestCase):
+    """Unittests for class MockupWatcher."""
+
+    FORMATS = [(False, False), (False, True), (True, False), (True, True)]
+    """Combinations of json-flag and minified-flag."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.directory, 'mockups')
+        MockupCorpusGenerator(files=6, controls=15, duplicates=0.3, seed=3).generate(self.input_dir)
+        shutil.copy('test_input/Group01.bmml', self.input_dir)
+        self.watchers = [MockupWatcher(self.input_dir, os.path.join(self.directory, 'watched%d' % number), json_format,
+                                       minified, force=True) for number, (json_format, minified) in enumerate(self.FORMATS)]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self, output_file):
+        """Return the content of a file."""
+        with open(output_file) as inputfile:
+            return inputfile.read()
+
+    def assertOutputEqualsExtraction(self):
+        """Check if the outputs of the watchers equal the outputs of a new extraction."""
+        texts = AdvancedMockupStringExtractor(force=True).extract(self.input_dir).texts
+        expected_file = os.path.join(self.directory, 'expected')
+        for watcher, (json_format, minified) in zip(self.watchers, self.FORMATS):
+            OutputExporter(list(texts)).export(expected_file, json_format, minified)
+            self.assertEqual(self.read(watcher.output_file), self.read(expected_file))
+
+    def modify(self, name, old, new):
+        """Replace a text in a mockup-file and change its modification time."""
+        path = os.path.join(self.input_dir, name)
+        content = self.read(path)
+        with open(path, 'w') as outputfile:
+            outputfile.write(content.replace(old, new))
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+    def update(self):
+        """Update all watchers and check if every watcher wrote its output."""
+        for watcher in self.watchers:
+            self.assertTrue(watcher.update())
+
+    def test_initial_output_equals_extraction(self):
+        """Test if the first update writes the same output as an extraction."""
+        self.update()
+        self.assertOutputEqualsExtraction()
+        self.assertFalse(self.watchers[0].update())
+
+    def test_changes_are_extracted(self):
+        """Test if modified, added and deleted files are extracted like by a new extraction."""
+        self.update()
+        self.modify('mockup0000.bmml', '<customID>f0000_c0002</customID>', '<customID>changed</customID>')
+        self.modify('Group01.bmml', 'First%2CSecond', 'First%2CThird%2CFourth')
+        self.update()
+        self.assertOutputEqualsExtraction()
+        shutil.copy(os.path.join(self.input_dir, 'mockup0001.bmml'), os.path.join(self.input_dir, 'copy.bmml'))
+        os.remove(os.path.join(self.input_dir, 'mockup0000.bmml'))
+        self.update()
+        self.assertOutputEqualsExtraction()
+
+    def test_conflicts_keep_output(self):
+        """Test if the output is kept while elements with same ID have different texts, unless force is set."""
+        watcher = MockupWatcher(self.input_dir, os.path.join(self.directory, 'output.xml'))
+        self.assertTrue(watcher.update())
+        self.modify('Group01.bmml', '<customID>button</customID>', '<customID>groupLabel</customID>')
+        self.assertFalse(watcher.update())
+        self.assertEqual(watcher.conflicting, set(['groupLabel']))
+        self.modify('Group01.bmml', '<text>Button</text>', '<text>Label%20in%20group</text>')
+        self.assertTrue(watcher.update())
+        self.assertEqual(watcher.conflicting, set())
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(MockupWatcherTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
@@ -27,19 +27,138 @@ THE SOFTWARE.
 """This module containes a class that is used to write extractedtexts from balsamiq-mockup-files into files.
 """
 
+import collections
+import contextlib
+import cStringIO
+import hashlib
+import heapq
+import itertools
+import json
 import logging
+import multiprocessing
+import operator
+import os
+import re
+import struct
+import tempfile
 import urllib
 
 from lxml import etree
 
+from CompactCatalog import CompactCatalog
+from ExportReader import ExportReader
+from ExtractionStatistics import NullStatistics
+from TextElement import TextElement
+
 class OutputExporter:
     """ Class that manages writing the results from MockupStringExtractors to output-files in JSON or XML-format.
     """
 
-    def __init__(self, texts, encoding='ISO-8859-1'):
-        """ Get texts that should be exported at init-time"""
+    BUFFER_SIZE = 1 << 16
+    """Size of the buffer of output-files in bytes."""
+
+    JSON_ESCAPED_CHARACTERS = re.compile(r'["\\\x00-\x1f]')
+    """Pattern of regular expression that matches all characters that have to be escaped in json-strings."""
+
+    JSON_ESCAPES = dict([(chr(code), '\\u%04x' % code) for code in range(0x20)] + [('"', '\\"'), ('\\', '\\\\'),
+                        ('\n', '\\n'), ('\r', '\\r'), ('\t', '\\t'), ('\b', '\\b'), ('\f', '\\f')])
+    """Escape-sequences of the characters that have to be escaped in json-strings."""
+
+    FORMATS = ['xml', 'json', 'po', 'mo', 'catalog']
+    """Names of the formats texts can be exported in."""
+
+    PO_ESCAPES = {'"': '\\"', '\\': '\\\\', '\n': '\\n', '\r': '\\r', '\t': '\\t'}
+    """Escape-sequences of the characters that have to be escaped in strings of po-files."""
+
+    PO_ESCAPED_CHARACTERS = re.compile(r'["\\\n\r\t]')
+    """Pattern of regular expression that matches all characters that have to be escaped in strings of po-files."""
+
+    CATALOG_HEADER = 'Content-Type: text/plain; charset=UTF-8\nContent-Transfer-Encoding: 8bit\n'
+    """Header of gettext-catalogs, stored as translation of the empty msgid."""
+
+    SHARD_KEYS = ['file', 'prefix']
+    """Names of the keys the texts of sharded JSON-exports can be split by."""
+
+    SHARD_SEPARATOR = '_'
+    """Seperator ending the prefix of identifiers that texts are sharded by."""
+
+    SHARD_MANIFEST = 'manifest.json'
+    """Name of the manifest of sharded JSON-exports."""
+
+    SHARD_UNSAFE_CHARACTERS = re.compile(r'[^A-Za-z0-9.\-]+')
+    """Pattern of regular expression that matches characters that are replaced in the names of shard-files."""
+
+    XML_INVALID_CHARACTERS = re.compile(u'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+    """Pattern of regular expression that matches characters that can not be written into XML-exports."""
+
+    XML_CONVERTED_CHARACTERS = re.compile(u'[&<>\r%+]')
+    """Pattern of regular expression that matches characters that are changed by writing and reading an XML-export."""
+
+
+    def __init__(self, texts, encoding='ISO-8859-1', statistics=None, localizer=None):
+        """ Get texts that should be exported at init-time
+
+            @param texts: list of TextElements that will be exported.
+            @param encoding: encoding declared in XML-exports (default ISO-8859-1)
+            @param statistics: ExtractionStatistics recording the time of the exports (default None)
+            @param localizer: PseudoLocalizer turning the texts into fake-translations while they are written (default None)
+        """
         self.texts = texts
         self.output_encoding = encoding
+        self.statistics = statistics or NullStatistics()
+        self.localizer = localizer
+
+    def sorted_texts(self):
+        """ Return the texts in the order of the exports, by filename, identifier and index, without changing the
+            order of the texts given to the exporter.
+
+            The texts of a mockup-file are extracted one after another, so the texts are split into runs of the same
+            filename. Every run is sorted by itself and the runs are merged: runs of different files are ordered by
+            their filename, runs of the same file are merged element by element. Texts of a SqliteTextRegistry are
+            sorted by the database.
+        """
+        if getattr(self.texts, 'spilled', False):
+            return self.texts.in_export_order()
+        runs = [sorted(run, key=TextElement.SORT_KEY) for _, run in itertools.groupby(self.texts, operator.attrgetter('filename'))]
+        runs.sort(key=lambda run: run[0].filename)
+        return itertools.chain.from_iterable(self.merge_runs(list(runs)) for _, runs in itertools.groupby(runs, lambda run: run[0].filename))
+
+    @staticmethod
+    def merge_runs(runs):
+        """ Return an iterator merging sorted runs of texts into one sorted sequence.
+
+            @param runs: list of lists of TextElements, each sorted by TextElement.SORT_KEY.
+        """
+        if len(runs) == 1:
+            return iter(runs[0])
+        decorated = [[((TextElement.SORT_KEY(txt), number, position), txt) for position, txt in enumerate(run)] for number, run in enumerate(runs)]
+        return itertools.imap(operator.itemgetter(1), heapq.merge(*decorated))
+
+    @staticmethod
+    @contextlib.contextmanager
+    def open_atomic(output_file):
+        """ Return a context-manager opening a temporary file that replaces the output-file when it is closed.
+            The temporary file is created in the directory of the output-file and renamed, so the output-file is
+            never left half written. If an error occures, the temporary file is removed and the output-file is kept.
+
+            @param output_file: path and name of the output-file.
+        """
+        directory = os.path.dirname(os.path.abspath(output_file))
+        handle, temporary = tempfile.mkstemp(prefix='.' + os.path.basename(output_file), suffix='.tmp', dir=directory)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporary, 0666 & ~umask)
+        outputfile = os.fdopen(handle, 'wb', OutputExporter.BUFFER_SIZE)
+        try:
+            yield outputfile
+            outputfile.close()
+            if os.name == 'nt' and os.path.exists(output_file):
+                os.remove(output_file)
+            os.rename(temporary, output_file)
+        except:
+            outputfile.close()
+            os.remove(temporary)
+            raise
 
     def unescape_html(self, text):
         """ Unescape HTML-encoding and special characters from html-formated text in mockups.
@@ -61,76 +180,717 @@ class OutputExporter:
         return result
 
 
+    def exported_text(self, text):
+        """ Return the text of a TextElement like it is exported, as fake-translation if a localizer is given.
+
+            @param text: TextElement that will be exported.
+        """
+        if self.localizer is None:
+            return text.text
+        return self.localizer.localize(text.text)
+
     def string_to_json_value(self, text):
-        """Makes string compatible so it can be used as json-value."""
-        return text.replace('\"', '\\\"')
+        """ Makes string compatible so it can be used as json-value.
+
+            Quotes, backslashes and control characters are escaped, other characters are written as utf-8.
+
+            @param text: text that will be written into a json-string.
+            @return: escaped text.
+        """
+        if isinstance(text, unicode):
+            text = text.encode('utf8')
+        return self.JSON_ESCAPED_CHARACTERS.sub(lambda match: self.JSON_ESCAPES[match.group()], text)
+
+    def json_entry(self, text):
+        """ Return a text as key-value-pair of its identifier and text in json-format.
+
+            @param text: TextElement that will be exported.
+            @return: json-entry or None if the element has no text.
+        """
+        try:
+            return '\"%s\":\"%s\"' %(self.string_to_json_value(text.identifier), self.string_to_json_value(self.exported_text(text)))
+        except TypeError:
+            logging.error("Element %s has no text", text.identifier)
+            return None
 
     def json_export(self, output_file, minified=False):
         """ Write all texts to file in JSON-format.
 
+            The entries are written one by one through a buffered file, so the export does not hold more than one
+            formated entry in memory. The output-file is replaced atomically when all entries are written.
+
             @param output_file: path and name outputfile output-file.
             @param minified: Flag indicating if whitespaces should be removed from output (default False).
         """
-        logging.info("Writing JSON-export to file " + output_file)
-        outputfile = open(output_file, "w")
-        outputfile.write("{")
-        if not minified:
-            outputfile.write("\n")
-            self.texts.sort()
-            for text in self.texts[:-1]:
-                outputfile.write('\t\"%s\":\"%s\",\n' %(text.identifier, self.string_to_json_value(text.text)))
-            try:
-                outputfile.write('\t\"%s\":\"%s\"\n' %(self.texts[-1].identifier, self.string_to_json_value(self.texts[-1].text)))
-            except IndexError:
-                pass #no texts in self.texts
+        with self.statistics.stage('json_export'):
+            logging.info("Writing JSON-export to file " + output_file)
+            texts = self.sorted_texts()
+            with self.open_atomic(output_file) as outputfile:
+                written = self.write_json(outputfile, (self.json_entry(text) for text in texts), minified)
+            self.statistics.count('exported_texts', written)
+
+    def write_json(self, outputfile, entries, minified=False):
+        """ Write a JSON-document containing the given entries. Entries that are None are skipped.
+
+            @param outputfile: file the document is written to.
+            @param entries: iterable of entries formated by json_entry.
+            @param minified: Flag indicating if whitespaces should be removed from output (default False).
+            @return: number of written entries.
+        """
+        if minified:
+            newline, indent = '', ''
         else:
-            for text in self.texts[:-1]:
-                try:
-                    outputfile.write('\"%s\":\"%s\",' %(text.identifier, self.string_to_json_value(text.text)))
-                except AttributeError:
-                    logging.error(text.text)
-                except IndexError:
-                    pass #no texts in self.texts
-            try:
-                outputfile.write('\"%s\":\"%s\"' %(self.texts[-1].identifier, self.string_to_json_value(self.texts[-1].text)))
-            except AttributeError:
-                logging.error("Error in last element: %s", self.string_to_json_value(text.text))
-            except IndexError:
-                pass #no texts in self.texts
-        outputfile.write("}")
-        outputfile.close()
+            newline, indent = '\n', '\t'
+        outputfile.write('{' + newline)
+        written = 0
+        for entry in entries:
+            if entry is None:
+                continue
+            if written:
+                outputfile.write(',' + newline)
+            outputfile.write(indent + entry)
+            written += 1
+        if written:
+            outputfile.write(newline)
+        outputfile.write('}')
+        return written
+
+    def xml_element(self, txt):
+        """ Return a text as gui_element in XML-format.
+
+            @param txt: TextElement that will be exported.
+            @return: gui_element containing file, id, index, text and metainformation of the text.
+        """
+        child = etree.Element("gui_element")
+        text_element = etree.SubElement(child, "file")
+        text_element.text = txt.filename
+        id_element = etree.SubElement(child, "id")
+        id_element.text = txt.identifier.decode('unicode-escape')
+        id_element.text = id_element.text.replace(" ", "_")
+        index_element = etree.SubElement(child, "index")
+        index_element.text = str(txt.index)
+        text_element = etree.SubElement(child, "text")
+        try:
+            text_element.text = self.exported_text(txt).decode('unicode-escape')
+        except ValueError:
+            logging.error("Value-error in text-element %s", txt.text)
+        text_element = etree.SubElement(child, "metainformation")
+        try:
+            text_element.text = txt.meta.decode('unicode-escape')
+        except AttributeError: #None-Type object -> no meta-information in mockup
+            pass
+        return child
+
+    def xml_fragment(self, txt, minified=False):
+        """ Return a text as serialized gui_element like it is written into the XML-export.
+
+            The element is serialized as only child of a root-element, so it is indented like in the whole document,
+            and the tags of the root-element are cut off afterwards.
+
+            @param txt: TextElement that will be exported.
+            @param minified: Flag indicating if whitespaces should be removed from output (default False).
+            @return: unescaped gui_element.
+        """
+        return self.unescape_html(self.serialize_element(self.xml_element(txt), minified))
+
+    def serialize_element(self, element, minified=False):
+        """ Return a gui_element serialized like it is written into the XML-export, without unescaping it.
+
+            @param element: gui_element that will be serialized.
+            @param minified: Flag indicating if whitespaces should be removed from output (default False).
+        """
+        root = etree.Element("root")
+        root.append(element)
+        fragment = etree.tostring(root, pretty_print=not minified, xml_declaration=False, encoding=self.output_encoding)
+        if minified:
+            return fragment[len('<root>'):-len('</root>')]
+        return fragment[len('<root>\n'):-len('</root>\n')]
 
     def xml_export(self, output_file, minified=False):
         """ Write all texts to file in XML-format.
 
+            The gui_elements are serialized and unescaped one by one, so the export does not hold more than one
+            element in memory. etree.xmlfile is not used, because the html-markup in the texts is unescaped after
+            serialization. The output-file is replaced atomically when all elements are written.
+
             @param output_file: path and name outputfile output-file.
             @param minified: Flag indicating if whitespaces should be removed from output (default False).
         """
-        root = etree.Element("root")
-        self.texts.sort()
-        for txt in self.texts:
-            child = etree.SubElement(root, "gui_element")
-            text_element = etree.SubElement(child, "file")
-            text_element.text = txt.filename
-            id_element = etree.SubElement(child, "id")
-            id_element.text = txt.identifier.decode('unicode-escape')
-            id_element.text = id_element.text.replace(" ", "_")
-            index_element = etree.SubElement(child, "index")
-            index_element.text = str(txt.index)
-            text_element = etree.SubElement(child, "text")
-            try:
-                text_element.text = txt.text.decode('unicode-escape')
-            except ValueError:
-                logging.error("Value-error in text-element %s", txt.text)
-            text_element = etree.SubElement(child, "metainformation")
-            try:
-                text_element.text = txt.meta.decode('unicode-escape')
-            except AttributeError: #None-Type object -> no meta-information in mockup
-                pass
-        logging.info("Writing XML-export to file " + output_file)
-        outputfile = open(output_file, "w")
+        with self.statistics.stage('xml_export'):
+            logging.info("Writing XML-export to file " + output_file)
+            with self.open_atomic(output_file) as outputfile:
+                written = self.write_xml(outputfile, (self.xml_fragment(txt, minified) for txt in self.sorted_texts()), minified)
+            self.statistics.count('exported_texts', written)
+
+    def write_xml(self, outputfile, fragments, minified=False):
+        """ Write an XML-document containing the given serialized gui_elements.
+
+            @param outputfile: file the document is written to.
+            @param fragments: iterable of gui_elements serialized by xml_fragment.
+            @param minified: Flag indicating if whitespaces should be removed from output (default False).
+            @return: number of written gui_elements.
+        """
+        newline = '' if minified else '\n'
+        outputfile.write("<?xml version='1.0' encoding='%s'?>\n" % self.output_encoding)
+        written = 0
+        for fragment in fragments:
+            if not written:
+                outputfile.write('<root>' + newline)
+            outputfile.write(fragment)
+            written += 1
+        if written:
+            outputfile.write('</root>' + newline)
+        else:
+            outputfile.write('<root/>' + newline)
+        return written
+
+    def export(self, output_file, json_format=False, minified=False, output_format=None, shard_by=None):
+        """ Write all texts to file in JSON- or XML-format or in one of the other FORMATS.
+
+            @param output_file: path and name outputfile output-file.
+            @param json_format: Flag indicating if the texts are written in JSON- instead of XML-format (default False).
+            @param minified: Flag indicating if whitespaces should be removed from output (default False).
+            @param output_format: name of the format that overrides json_format, po, mo or catalog for example (default None)
+            @param shard_by: one of the SHARD_KEYS, the texts are written as sharded JSON-export into the directory
+                             output_file instead (default None)
+        """
+        if shard_by:
+            self.sharded_export(output_file, shard_by, minified)
+        elif output_format == 'po':
+            self.po_export(output_file)
+        elif output_format == 'mo':
+            self.mo_export(output_file)
+        elif output_format == 'catalog':
+            self.catalog_export(output_file)
+        elif json_format or output_format == 'json':
+            self.json_export(output_file, minified)
+        else:
+            self.xml_export(output_file, minified)
+
+    def shard_name(self, txt, shard_by, separator=None):
+        """ Return the name of the shard a text belongs to.
+
+            @param txt: TextElement that will be exported.
+            @param shard_by: 'file' for the mockup-file of the text or 'prefix' for the prefix of its identifier.
+            @param separator: seperator ending the prefix of identifiers (default SHARD_SEPARATOR)
+        """
+        if shard_by == 'file':
+            return txt.filename or ''
+        identifier = ExportReader.exported_identifier(txt.identifier).encode('utf8')
+        return identifier.split(separator or self.SHARD_SEPARATOR, 1)[0]
+
+    def shard_file_name(self, name, used):
+        """ Return a name of a shard-file that is derived from the name of the shard and not used by another shard.
+
+            @param name: name of the shard.
+            @param used: set of the names of shard-files already used, the returned name is added to it.
+        """
+        if isinstance(name, unicode):
+            name = name.encode('utf8')
+        root = self.SHARD_UNSAFE_CHARACTERS.sub('_', name).strip('_.') or 'shard'
+        file_name = root + '.json'
+        number = 1
+        while file_name.lower() in used:
+            number += 1
+            file_name = '%s-%d.json' % (root, number)
+        used.add(file_name.lower())
+        return file_name
+
+    @staticmethod
+    def read_manifest(output_dir):
+        """ Return the shards of the manifest of a previous sharded export in a directory or an empty dictionary
+            if there is none.
+
+            @param output_dir: directory of the sharded export.
+        """
+        try:
+            with open(os.path.join(output_dir, OutputExporter.SHARD_MANIFEST), 'rb') as manifest:
+                return json.load(manifest)['shards']
+        except (IOError, ValueError, KeyError, TypeError):
+            return {}
+
+    def sharded_export(self, output_dir, shard_by='file', minified=False, separator=None):
+        """ Write the texts split into shards by their mockup-file or the prefix of their identifier into a directory.
+            Every shard is written like a JSON-export into an own file. The manifest maps the names of the shards to
+            their files, the sha1-hashes of their contents and their number of texts, so clients load only the shards
+            they need and cache them by their hash.
+
+            Shard-files whose content did not change are not rewritten. The manifest is replaced after all shards are
+            written and shard-files of the previous export that are not used anymore are removed afterwards.
+
+            @param output_dir: directory the shards and the manifest are written to.
+            @param shard_by: one of the SHARD_KEYS (default 'file')
+            @param minified: Flag indicating if whitespaces should be removed from output (default False).
+            @param separator: seperator ending the prefix of identifiers (default SHARD_SEPARATOR)
+        """
+        if shard_by not in self.SHARD_KEYS:
+            raise ValueError('Texts can not be sharded by %s' % shard_by)
+        with self.statistics.stage('sharded_export'):
+            logging.info("Writing JSON-export sharded by %s to directory %s", shard_by, output_dir)
+            if not os.path.isdir(output_dir):
+                os.makedirs(output_dir)
+            shards = collections.OrderedDict()
+            for txt in self.sorted_texts():
+                shards.setdefault(self.shard_name(txt, shard_by, separator), []).append(txt)
+            previous = self.read_manifest(output_dir)
+            manifest = {}
+            used = set([self.SHARD_MANIFEST.lower()])
+            written = 0
+            for name, texts in sorted(shards.items()):
+                content = cStringIO.StringIO()
+                count = self.write_json(content, (self.json_entry(text) for text in texts), minified)
+                content = content.getvalue()
+                digest = hashlib.sha1(content).hexdigest()
+                file_name = self.shard_file_name(name, used)
+                output_file = os.path.join(output_dir, file_name)
+                old = previous.get(name.decode('utf8') if isinstance(name, str) else name) or {}
+                if old.get('file') != file_name or old.get('sha1') != digest or not os.path.isfile(output_file):
+                    with self.open_atomic(output_file) as outputfile:
+                        outputfile.write(content)
+                manifest[name] = {'file': file_name, 'sha1': digest, 'texts': count}
+                written += count
+            with self.open_atomic(os.path.join(output_dir, self.SHARD_MANIFEST)) as outputfile:
+                json.dump({'shard_by': shard_by, 'shards': manifest}, outputfile, sort_keys=True,
+                          indent=None if minified else 1, separators=(',', ':') if minified else (',', ': '))
+            for shard in previous.values():
+                file_name = shard.get('file') if isinstance(shard, dict) else None
+                if file_name and file_name.lower() not in used and os.path.basename(file_name) == file_name:
+                    try:
+                        os.remove(os.path.join(output_dir, file_name))
+                    except OSError:
+                        pass
+            self.statistics.count('exported_texts', written)
+            self.statistics.count('shards', len(manifest))
+
+    def catalog_entries(self, texts=None):
+        """ Return the texts as tuples of identifier and text like they are read back from an XML-export, encoded in
+            utf-8, and the TextElement. Texts are identified by their identifier only, so of texts with the same
+            identifier only the first is returned.
+
+            @param texts: iterable of the TextElements in the order they are returned in (default texts of the exporter)
+        """
+        result = []
+        seen = set()
+        for txt in (self.texts if texts is None else texts):
+            text = self.exported_text(txt)
+            if text is None:
+                logging.error("Element %s has no text", txt.identifier)
+                continue
+            identifier = ExportReader.exported_identifier(txt.identifier).encode('utf8')
+            if identifier in seen:
+                continue
+            seen.add(identifier)
+            result.append((identifier, ExportReader.exported_text(text).encode('utf8'), txt))
+        return result
+
+    def po_string(self, text):
+        """ Return a text as quoted string of a po-file.
+
+            @param text: text encoded in utf-8.
+        """
+        return '"%s"' % self.PO_ESCAPED_CHARACTERS.sub(lambda match: self.PO_ESCAPES[match.group()], text)
+
+    def po_export(self, output_file):
+        """ Write all texts to file as gettext po-file, with the identifiers as msgid and the texts as msgstr.
+            The metainformation is written as comment for translators and the mockup-file as reference.
+
+            @param output_file: path and name of the output-file.
+        """
+        with self.statistics.stage('po_export'):
+            logging.info("Writing po-export to file " + output_file)
+            entries = self.catalog_entries(self.sorted_texts())
+            with self.open_atomic(output_file) as outputfile:
+                outputfile.write('msgid ""\nmsgstr ""\n')
+                for line in self.CATALOG_HEADER.splitlines(True):
+                    outputfile.write(self.po_string(line) + '\n')
+                for identifier, text, txt in entries:
+                    outputfile.write('\n')
+                    if txt.meta:
+                        meta = ExportReader.exported_text(txt.meta).encode('utf8')
+                        outputfile.write(''.join('#. %s\n' % line for line in meta.splitlines()))
+                    if txt.filename:
+                        outputfile.write('#: %s\n' % txt.filename)
+                    outputfile.write('msgid %s\nmsgstr %s\n' % (self.po_string(identifier), self.po_string(text)))
+            self.statistics.count('exported_texts', len(entries))
+
+    @staticmethod
+    def mo_hash(string):
+        """ Return the hash of a string used by the hash table of gettext mo-files (hashpjw of GNU gettext).
+
+            @param string: string encoded in utf-8.
+        """
+        hashed = 0
+        for character in string:
+            hashed = (hashed << 4) + ord(character)
+            high = hashed & 0xf0000000
+            if high:
+                hashed ^= high >> 24
+                hashed ^= high
+        return hashed & 0xffffffff
+
+    @staticmethod
+    def mo_hash_size(count):
+        """ Return the size of the hash table of a mo-file with count strings, the smallest prime not below 4/3 of count.
+
+            @param count: number of strings in the mo-file.
+        """
+        size = max(3, count * 4 // 3)
+        if size % 2 == 0:
+            size += 1
+        while any(size % divisor == 0 for divisor in xrange(3, int(size ** 0.5) + 1, 2)):
+            size += 2
+        return size
+
+    def mo_export(self, output_file):
+        """ Write all texts to file as gettext mo-file, with the identifiers as msgid and the texts as msgstr.
+            The strings are sorted by their msgid and the file containes the hash table of GNU gettext, so the texts
+            can be looked up by binary search or in constant time.
+
+            @param output_file: path and name of the output-file.
+        """
+        with self.statistics.stage('mo_export'):
+            logging.info("Writing mo-export to file " + output_file)
+            entries = [('', self.CATALOG_HEADER)] + sorted((identifier, text) for identifier, text, _ in self.catalog_entries(self.sorted_texts()))
+            count = len(entries)
+            hash_size = self.mo_hash_size(count)
+            table = [0] * hash_size
+            for number, (identifier, _) in enumerate(entries):
+                hashed = self.mo_hash(identifier)
+                slot = hashed % hash_size
+                increment = 1 + hashed % (hash_size - 2)
+                while table[slot]:
+                    slot += increment
+                    if slot >= hash_size:
+                        slot -= hash_size
+                table[slot] = number + 1
+            originals_offset = 28
+            translations_offset = originals_offset + 8 * count
+            hash_offset = translations_offset + 8 * count
+            offset = hash_offset + 4 * hash_size
+            originals, translations = [], []
+            for identifier, _ in entries:
+                originals.append((len(identifier), offset))
+                offset += len(identifier) + 1
+            for _, text in entries:
+                translations.append((len(text), offset))
+                offset += len(text) + 1
+            with self.open_atomic(output_file) as outputfile:
+                outputfile.write(struct.pack('<7I', 0x950412de, 0, count, originals_offset, translations_offset, hash_size, hash_offset))
+                outputfile.write(''.join(struct.pack('<2I', *pair) for pair in originals + translations))
+                outputfile.write(struct.pack('<%dI' % hash_size, *table))
+                for identifier, _ in entries:
+                    outputfile.write(identifier + '\0')
+                for _, text in entries:
+                    outputfile.write(text + '\0')
+            self.statistics.count('exported_texts', count - 1)
+
+    def catalog_export(self, output_file):
+        """ Write all texts to file as CompactCatalog, with the identifiers as keys, that can be memory-mapped and
+            read without parsing the whole file.
+
+            @param output_file: path and name of the output-file.
+        """
+        with self.statistics.stage('catalog_export'):
+            logging.info("Writing catalog-export to file " + output_file)
+            entries = sorted((identifier, text) for identifier, text, _ in self.catalog_entries(self.sorted_texts()))
+            with self.open_atomic(output_file) as outputfile:
+                CompactCatalog.write(outputfile, entries)
+            self.statistics.count('exported_texts', len(entries))
+
+    def delta(self, baseline, indexed=True, texts=None):
+        """ Return the texts that were added or changed since a previous export and the texts of the previous
+            export that were deleted. The previous texts are indexed once by identifier, index, text and
+            metainformation, every text is looked up in the index afterwards, so the delta is found in linear time.
+            Texts are compared in the form they are read back from an export, so texts that did not change are never
+            reported as changed.
+
+            Identifiers can be used by several texts, with the same text in several files or with different
+            metainformation, so the texts are matched as multisets: every text of the previous export is matched by
+            one text at most, preferably of the same file. Texts without an equal previous text are changed if a
+            previous text with the same identifier and index is left unmatched, otherwise added. Previous texts left
+            unmatched are deleted. A JSON-export containes every identifier once, with the text written last, so of
+            texts with the same identifier only the last is compared.
+
+            @param baseline: list of TextElements of the previous export read by ExportReader.
+            @param indexed: flag indicating if texts are identified by identifier and index, like in XML-exports, or
+                            by identifier only, like in JSON-exports, which also contain no metainformation (default True).
+            @param texts: iterable of the TextElements in the order they are written in (default texts of the exporter)
+            @return: tuple of lists of the added and changed TextElements and of the deleted TextElements of the baseline.
+        """
+        equal, same_file = {}, {}
+        for number, text in enumerate(baseline):
+            key = (text.identifier, text.index if indexed else '', text.text, text.meta)
+            equal.setdefault(key, collections.deque()).append(number)
+            same_file.setdefault(key + (text.filename or u'',), collections.deque()).append(number)
+        current = ((text, self.exported_element(text, indexed)) for text in (self.texts if texts is None else texts))
+        current = ((text, exported) for text, exported in current if exported is not None)
+        if not indexed:
+            current = collections.OrderedDict((exported.identifier, (text, exported)) for text, exported in current).itervalues()
+        matched = [False] * len(baseline)
+        unmatched = []
+        for text, exported in current:
+            self.match_text(text, exported, equal, same_file, matched, unmatched)
+        remaining = {}
+        for number, text in enumerate(baseline):
+            if not matched[number]:
+                remaining.setdefault((text.identifier, text.index if indexed else ''), collections.deque()).append(number)
+        added, changed = [], []
+        for text, exported in unmatched:
+            numbers = remaining.get((exported.identifier, exported.index if indexed else ''))
+            if numbers:
+                matched[numbers.popleft()] = True
+                changed.append(text)
+            else:
+                added.append(text)
+        deleted = [text for number, text in enumerate(baseline) if not matched[number]]
+        deleted.sort(key=TextElement.SORT_KEY)
+        return added, changed, deleted
+
+    @staticmethod
+    def match_text(text, exported, equal, same_file, matched, unmatched):
+        """ Match a text with an unmatched equal text of a previous export, preferably of the same file, or add
+            it to the unmatched texts.
+
+            @param text: TextElement that is exported.
+            @param exported: the text like it is read back from the export.
+            @param equal: queues of the numbers of the previous texts by identifier, index, text and metainformation.
+            @param same_file: queues of the numbers of the previous texts by identifier, index, text, metainformation and file.
+            @param matched: flags of the previous texts that are matched.
+            @param unmatched: list of tuples of text and exported text without equal previous text.
+        """
+        key = (exported.identifier, exported.index, exported.text, exported.meta)
+        for numbers in (same_file.get(key + (exported.filename or u'',)), equal.get(key)):
+            while numbers:
+                number = numbers.popleft()
+                if not matched[number]:
+                    matched[number] = True
+                    return
+        unmatched.append((text, exported))
+
+    def exported_element(self, txt, indexed=True):
+        """ Return a text like it is read back by ExportReader from an XML-export or, if not indexed, from a JSON-export.
+            The values are converted like by writing and reading the export, without serializing and parsing the text.
+
+            @param txt: TextElement that will be exported.
+            @param indexed: flag indicating if the text is read back from an XML-export (default True)
+            @return: TextElement read back or None if the text is not exported.
+        """
+        text = self.exported_text(txt)
+        if not indexed:
+            if text is None:
+                return None
+            identifier = txt.identifier.encode('utf8') if isinstance(txt.identifier, unicode) else txt.identifier
+            return TextElement(ExportReader.exported_identifier(identifier), ExportReader.exported_text(text), None, None)
+        try:
+            text = text.decode('unicode-escape')
+        except ValueError:
+            text = u''
+        if self.XML_INVALID_CHARACTERS.search(text):
+            text = u''
+        filename = txt.filename or u''
+        if isinstance(filename, str):
+            filename = ExportReader.decode(filename)
+        meta = txt.meta and self.xml_value(txt.meta.decode('unicode-escape'))
+        return TextElement(self.xml_value(txt.identifier.decode('unicode-escape').replace(" ", "_")), self.xml_value(text),
+                           self.xml_value(filename), meta or None, int(txt.index) if str(txt.index).isdigit() else '')
+
+    def xml_value(self, value):
+        """ Return a value of a gui_element like it is read back by ExportReader from an XML-export.
+            The value is escaped like by the serialization and unescaped like by xml_fragment and ExportReader.
+            Values without characters that are escaped, unquoted or unescaped are returned unchanged.
+
+            @param value: unicode-value of a property of a gui_element.
+        """
+        if not self.XML_CONVERTED_CHARACTERS.search(value):
+            return value
+        value = value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('\r', '&#13;')
+        return ExportReader.unescape(ExportReader.decode(self.unescape_html(value)))
+
+    def export_delta(self, output_file, baseline_file, json_format=False, minified=False):
+        """ Write only the texts that were added, changed or deleted since a previous export to file.
+
+            The XML-delta containes the gui_elements of added and changed texts with the additional property change,
+            deleted texts are written with file, id, index and change only. The JSON-delta containes the objects
+            added and changed and the list deleted of the identifiers of the deleted texts.
+
+            @param output_file: path and name of the output-file.
+            @param baseline_file: previous export in XML- or JSON-format, recognized by the file-extension json.
+            @param json_format: Flag indicating if the delta is written in JSON- instead of XML-format (default False).
+            @param minified: Flag indicating if whitespaces should be removed from output (default False).
+            @return: tuple of the numbers of added, changed and deleted texts.
+        """
+        with self.statistics.stage('delta_export'):
+            baseline = ExportReader.read(baseline_file)
+            texts = self.sorted_texts()
+            added, changed, deleted = self.delta(baseline, not baseline_file.lower().endswith('.json'), texts)
+            logging.info("Writing delta of %d added, %d changed and %d deleted texts to file %s", len(added), len(changed), len(deleted), output_file)
+            with self.open_atomic(output_file) as outputfile:
+                if json_format:
+                    self.write_json_delta(outputfile, added, changed, deleted, minified)
+                else:
+                    fragments = [self.xml_change_fragment(text, 'added', minified) for text in added]
+                    fragments.extend(self.xml_change_fragment(text, 'changed', minified) for text in changed)
+                    fragments.extend(self.xml_deleted_fragment(text, minified) for text in deleted)
+                    self.write_xml(outputfile, fragments, minified)
+            self.statistics.count('added_texts', len(added))
+            self.statistics.count('changed_texts', len(changed))
+            self.statistics.count('deleted_texts', len(deleted))
+        return len(added), len(changed), len(deleted)
+
+    @staticmethod
+    def mockup_file(filename):
+        """ Return the normalized path of the mockup-, project- or archive-file a text of an export was extracted from.
+
+            @param filename: filename of a text, members of archives are named by archive and member.
+        """
+        if isinstance(filename, unicode):
+            filename = filename.encode('utf8')
+        return os.path.normpath(filename.split('!', 1)[0])
+
+    def export_merged(self, output_file, baseline, minified=False):
+        """ Write the texts merged with the texts of the unchanged mockup-files of a previous XML-export.
+
+            The gui_elements of the previous export are copied unchanged, so it has to be written with the same
+            minified-flag. The texts of the exporter are inserted in the order of the exports, by filename.
+
+            @param output_file: path and name of the output-file, can be the previous export itself.
+            @param baseline: tuples of TextElement and gui_element of the unchanged files read by ExportReader.read_fragments.
+            @param minified: Flag indicating if whitespaces should be removed from output (default False).
+            @return: tuple of the numbers of written texts of the exporter and of the previous export.
+            @raise ValueError: if the previous export was written with another minified-flag.
+        """
+        with self.statistics.stage('merged_export'):
+            fragments = []
+            for text, fragment in baseline:
+                if fragment.startswith('<') != minified:
+                    raise ValueError("previous export was written %s" % ('with whitespaces' if minified else 'minified'))
+                fragments.append((text.filename or u'', fragment))
+            kept = len(fragments)
+            filenames = {}
+            for txt in self.sorted_texts():
+                filename = filenames.get(txt.filename)
+                if filename is None:
+                    filename = filenames[txt.filename] = self.xml_value(ExportReader.decode(txt.filename or ''))
+                fragments.append((filename, self.xml_fragment(txt, minified)))
+            fragments.sort(key=operator.itemgetter(0))
+            logging.info("Writing %d texts merged with %d texts of the previous export to file %s", len(fragments) - kept, kept, output_file)
+            with self.open_atomic(output_file) as outputfile:
+                self.write_xml(outputfile, itertools.imap(operator.itemgetter(1), fragments), minified)
+            self.statistics.count('exported_texts', len(fragments) - kept)
+            self.statistics.count('baseline_texts', kept)
+        return len(fragments) - kept, kept
+
+    def xml_change_fragment(self, txt, change, minified=False):
+        """ Return an added or changed text as serialized gui_element of an XML-delta.
+
+            @param txt: TextElement that will be exported.
+            @param change: kind of change, added or changed.
+            @param minified: Flag indicating if whitespaces should be removed from output (default False).
+        """
+        element = self.xml_element(txt)
+        etree.SubElement(element, "change").text = change
+        return self.unescape_html(self.serialize_element(element, minified))
+
+    def xml_deleted_fragment(self, txt, minified=False):
+        """ Return a deleted text of a previous export as serialized gui_element of an XML-delta.
+
+            @param txt: TextElement read from the previous export by ExportReader.
+            @param minified: Flag indicating if whitespaces should be removed from output (default False).
+        """
+        element = etree.Element("gui_element")
+        etree.SubElement(element, "file").text = txt.filename
+        etree.SubElement(element, "id").text = txt.identifier
+        etree.SubElement(element, "index").text = unicode(txt.index)
+        etree.SubElement(element, "change").text = "deleted"
+        return self.serialize_element(element, minified)
+
+    def write_json_delta(self, outputfile, added, changed, deleted, minified=False):
+        """ Write a JSON-document containing the objects added and changed and the list deleted.
+
+            @param outputfile: file the document is written to.
+            @param added: list of added TextElements.
+            @param changed: list of changed TextElements.
+            @param deleted: list of deleted TextElements of the previous export.
+            @param minified: Flag indicating if whitespaces should be removed from output (default False).
+        """
         if minified:
-            outputfile.write(self.unescape_html(etree.tostring(root, pretty_print=False, xml_declaration=True, encoding=self.output_encoding).encode('utf8')))
+            newline, indent, separator = '', '', ':'
+        else:
+            newline, indent, separator = '\n', '\t', ': '
+        entries = [(name, [self.json_entry(text) for text in texts]) for name, texts in (('added', added), ('changed', changed))]
+        entries.append(('deleted', ['"%s"' % self.string_to_json_value(text.identifier) for text in deleted]))
+        outputfile.write('{' + newline)
+        for number, (name, values) in enumerate(entries):
+            values = [value for value in values if value is not None]
+            opening, closing = ('[', ']') if name == 'deleted' else ('{', '}')
+            outputfile.write('%s"%s"%s%s' % (indent, name, separator, opening))
+            if values:
+                outputfile.write(newline + (',' + newline).join(indent * 2 + value for value in values) + newline + indent)
+            outputfile.write(closing + (',' if number < len(entries) - 1 else '') + newline)
+        outputfile.write('}')
+
+    @staticmethod
+    def localized_output_file(output_file, locale):
+        """ Return the name of the output-file of a locale. The locale replaces the placeholder {locale} in the name
+            or, if there is none, is appended to the name before the file-extension.
+
+            @param output_file: path and name of the output-file.
+            @param locale: locale of the fake-translation.
+        """
+        if '{locale}' in output_file:
+            return output_file.replace('{locale}', locale)
+        root, extension = os.path.splitext(output_file)
+        return root + '_' + locale + extension
+
+    def export_localized(self, output_file, localizers, json_format=False, minified=False, jobs=1, output_format=None, shard_by=None):
+        """ Write the fake-translations of all texts for every localizer into an own file.
+            The texts are sorted once before and shared by all exports. If more than one job is configured, the
+            exports are written by a pool of processes, unless the texts are read from a SqliteTextRegistry.
+
+            @param output_file: path and name of the output-file, the names of the files of the locales are derived from it.
+            @param localizers: list of PseudoLocalizers.
+            @param json_format: Flag indicating if the texts are written in JSON- instead of XML-format (default False).
+            @param minified: Flag indicating if whitespaces should be removed from output (default False).
+            @param jobs: number of processes writing exports in parallel, 0 for one per cpu (default 1)
+            @param output_format: name of the format that overrides json_format, po, mo or catalog for example (default None)
+            @param shard_by: one of the SHARD_KEYS, every fake-translation is written as sharded JSON-export (default None)
+        """
+        texts = self.texts
+        if not getattr(texts, 'spilled', False):
+            texts = list(self.sorted_texts())
+        arguments = [(self.localized_output_file(output_file, localizer.locale), localizer, json_format, minified, output_format, shard_by)
+                     for localizer in localizers]
+        jobs = jobs or multiprocessing.cpu_count()
+        if jobs > 1 and len(arguments) > 1 and isinstance(texts, list):
+            pool = multiprocessing.Pool(min(jobs, len(arguments)), initialize_worker, [texts, self.output_encoding])
+            try:
+                pool.map(export_localized_file, arguments)
+            finally:
+                pool.terminate()
+                pool.join()
         else:
-            outputfile.write(self.unescape_html(etree.tostring(root, pretty_print=True, xml_declaration=True, encoding=self.output_encoding).encode('utf8')))
-        outputfile.close()
+            for localized_output_file, localizer, json_format, minified, output_format, shard_by in arguments:
+                with self.statistics.stage('localized_export'):
+                    OutputExporter(texts, self.output_encoding, localizer=localizer).export(localized_output_file, json_format, minified, output_format, shard_by)
+
+
+WORKER_TEXTS = None
+"""Texts exported by a worker-process and their encoding."""
+
+def initialize_worker(texts, encoding):
+    """ Store the texts exported by a worker-process.
+
+        @param texts: sorted list of TextElements.
+        @param encoding: encoding declared in XML-exports.
+    """
+    global WORKER_TEXTS
+    WORKER_TEXTS = (texts, encoding)
+
+def export_localized_file(arguments):
+    """ Write the fake-translation of a locale. Used as function of the worker-processes.
+
+        @param arguments: tuple of the output-file, the PseudoLocalizer, the JSON-flag, the minified-flag, the format and
+                          the key the texts are sharded by.
+    """
+    output_file, localizer, json_format, minified, output_format, shard_by = arguments
+    OutputExporter(WORKER_TEXTS[0], WORKER_TEXTS[1], localizer=localizer).export(output_file, json_format, minified, output_format, shard_by)
@@ -0,0 +1,306 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import gettext
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+import tempfile
+import unittest
+
+from lxml import etree
+
+from CompactCatalog import CompactCatalog
+from ExportReader import ExportReader
+from OutputExporter import OutputExporter
+from PseudoLocalizer import PseudoLocalizer
+from TextElement import TextElement
+
+class OutputExporterTest(unittest.TestCase):
+    """Unittests for class OutputExporter."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.directory, 'output')
+        self.texts = [TextElement('second', 'Text%20with%20%22quotes%22', 'b.bmml', 'Meta%20info'),
+                      TextElement('first', '<b>Bold</b><br />text', 'a.bmml', None),
+                      TextElement('bar', 'Item', 'a.bmml', None, 1),
+                      TextElement('path', 'C:\\temp\\%C3%84', 'a.bmml', None)]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_output(self):
+        """Return the content of the output-file."""
+        with open(self.output_file) as outputfile:
+            return outputfile.read()
+
+    def document(self, exporter, minified):
+        """Return the XML-export of all texts serialized as one document."""
+        root = etree.Element("root")
+        for txt in sorted(exporter.texts):
+            root.append(exporter.xml_element(txt))
+        return exporter.unescape_html(etree.tostring(root, pretty_print=not minified, xml_declaration=True,
+                                                     encoding=exporter.output_encoding))
+
+    def test_xml_export_equals_document(self):
+        """Test if the XML-export written element by element equals the export of the whole document."""
+        for minified in (False, True):
+            for texts in (self.texts, []):
+                exporter = OutputExporter(list(texts))
+                exporter.xml_export(self.output_file, minified)
+                self.assertEqual(self.read_output(), self.document(exporter, minified))
+
+    def test_json_export_escapes_texts(self):
+        """Test if the JSON-export is valid json containing all texts."""
+        for minified in (False, True):
+            OutputExporter(list(self.texts)).json_export(self.output_file, minified)
+            result = json.loads(self.read_output())
+            self.assertEqual(result, dict((txt.identifier, txt.text) for txt in self.texts))
+
+    def test_json_export_format(self):
+        """Test if the JSON-export is sorted and indented unless it is minified, then it is sorted only."""
+        texts = [TextElement('second', 'Second', 'b.bmml', None), TextElement('first', 'First', 'a.bmml', None)]
+        OutputExporter(list(texts)).json_export(self.output_file)
+        self.assertEqual(self.read_output(), '{\n\t"first":"First",\n\t"second":"Second"\n}')
+        OutputExporter(list(texts)).json_export(self.output_file, minified=True)
+        self.assertEqual(self.read_output(), '{"first":"First","second":"Second"}')
+        OutputExporter([]).json_export(self.output_file)
+        self.assertEqual(self.read_output(), '{\n}')
+
+    def test_export_localized(self):
+        """Test if one fake-translation is written per locale, serially and by several processes."""
+        localizers = [PseudoLocalizer('GR'), PseudoLocalizer('DE', accents=True)]
+        for jobs in (1, 2):
+            output_file = os.path.join(self.directory, 'output%d.json' % jobs)
+            OutputExporter(list(self.texts)).export_localized(output_file, localizers, json_format=True, jobs=jobs)
+            for localizer in localizers:
+                with open(os.path.join(self.directory, 'output%d_%s.json' % (jobs, localizer.locale))) as inputfile:
+                    result = json.loads(inputfile.read())
+                self.assertEqual(result, dict((txt.identifier, localizer.localize(txt.text)) for txt in self.texts))
+        self.assertEqual(OutputExporter.localized_output_file('out/{locale}/texts.xml', 'GR'), 'out/GR/texts.xml')
+
+    def test_export_delta(self):
+        """Test if only added, changed and deleted texts are written compared to an XML- and a JSON-export."""
+        texts = [TextElement('second', 'Text%20with%20%22quotes%22', 'b.bmml', 'Other%20info'),
+                 TextElement('first', '<b>Bold</b><br />new text', 'a.bmml', None),
+                 TextElement('bar', 'Item', 'a.bmml', None, 1),
+                 TextElement('added', 'Added', 'c.bmml', None)]
+        for extension, expected in (('xml', (['added'], ['first', 'second'], ['path'])),
+                                    ('json', (['added'], ['first'], ['path']))):
+            baseline = os.path.join(self.directory, 'baseline.' + extension)
+            OutputExporter(list(self.texts)).export(baseline, extension == 'json')
+            self.assertEqual(OutputExporter(list(self.texts)).export_delta(self.output_file, baseline), (0, 0, 0))
+            exporter = OutputExporter(list(texts))
+            added, changed, deleted = exporter.delta(ExportReader.read(baseline), extension == 'xml')
+            self.assertEqual(([text.identifier for text in added], sorted(text.identifier for text in changed),
+                              [text.identifier for text in deleted]), expected)
+            exporter.export_delta(self.output_file, baseline, json_format=True)
+            self.assertEqual(json.loads(self.read_output()), {'added': {'added': 'Added'},
+                                                              'changed': dict((text.identifier, text.text) for text in texts if text.identifier in expected[1]),
+                                                              'deleted': ['path']})
+            exporter.export_delta(self.output_file, baseline, minified=True)
+            changes = re.findall(r'<id>(.*?)</id>.*?<change>(.*?)</change>', self.read_output())
+            self.assertEqual(changes, [(identifier, change) for change, identifiers in zip(['added', 'changed', 'deleted'], expected)
+                                       for identifier in identifiers])
+
+    def test_exported_element_equals_export_read_back(self):
+        """Test if texts are converted like they are read back from an XML- and a JSON-export."""
+        self.texts.extend([TextElement('amp%26id', '&amp;lt; %26lt%3B &#65; 1+1 %2B\r\\u0394', 'x&y.bmml', '%3Cb%3E &nbsp;', 2),
+                           TextElement('empty', '', None, None)])
+        exporter = OutputExporter([])
+        for txt in self.texts:
+            xml = ExportReader.read_xml(exporter.xml_fragment(txt))[0]
+            json_text = ExportReader.read_json('{%s}' % exporter.json_entry(txt))[0]
+            for exported, expected in ((exporter.exported_element(txt), xml), (exporter.exported_element(txt, False), json_text)):
+                self.assertEqual((exported.identifier, exported.text, exported.filename, exported.meta, exported.index),
+                                 (expected.identifier, expected.text, expected.filename, expected.meta, expected.index))
+
+    def mo_lookup(self, data, identifier):
+        """Return the translation of an identifier found by the hash table of a mo-file like GNU gettext does."""
+        count, originals, translations, hash_size, hash_offset = struct.unpack_from('<5I', data, 8)
+        hashed = OutputExporter.mo_hash(identifier)
+        slot = hashed % hash_size
+        increment = 1 + hashed % (hash_size - 2)
+        while True:
+            number = struct.unpack_from('<I', data, hash_offset + 4 * slot)[0]
+            if not number:
+                return None
+            length, offset = struct.unpack_from('<2I', data, originals + 8 * (number - 1))
+            if data[offset:offset + length] == identifier:
+                length, offset = struct.unpack_from('<2I', data, translations + 8 * (number - 1))
+                return data[offset:offset + length]
+            slot = (slot + increment) % hash_size
+
+    def test_mo_export(self):
+        """Test if the mo-export is read by gettext and every text is found by the hash table."""
+        texts = self.texts + [TextElement('item%d' % number, 'Item %d' % number, 'c.bmml', None) for number in range(200)]
+        OutputExporter(list(texts)).export(self.output_file, output_format='mo')
+        data = self.read_output()
+        catalog = gettext.GNUTranslations(open(self.output_file, 'rb'))._catalog
+        expected = dict((ExportReader.exported_identifier(txt.identifier), ExportReader.exported_text(txt.text)) for txt in texts)
+        self.assertEqual(dict((key, value) for key, value in catalog.items() if key), expected)
+        for identifier, text in expected.items():
+            self.assertEqual(self.mo_lookup(data, identifier.encode('utf8')), text.encode('utf8'))
+        self.assertEqual(self.mo_lookup(data, 'missing'), None)
+        self.assertEqual([OutputExporter.mo_hash_size(count) for count in (0, 3, 10, 100)], [3, 5, 13, 137])
+
+    def test_po_export(self):
+        """Test if the po-export containes every text with its metainformation and file."""
+        OutputExporter([self.texts[0], TextElement('first', 'Line%0A"quoted"', 'a.bmml', None)]).export(self.output_file, output_format='po')
+        self.assertEqual(self.read_output(), 'msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n'
+                                             '"Content-Transfer-Encoding: 8bit\\n"\n\n'
+                                             '#: a.bmml\nmsgid "first"\nmsgstr "Line\\n\\"quoted\\""\n\n'
+                                             '#. Meta info\n#: b.bmml\nmsgid "second"\nmsgstr "Text with \\"quotes\\""\n')
+
+    def test_catalog_export(self):
+        """Test if the texts of the catalog-export are found by their identifiers."""
+        OutputExporter(list(self.texts)).export(self.output_file, output_format='catalog')
+        with CompactCatalog(self.output_file) as catalog:
+            self.assertEqual(len(catalog), len(self.texts))
+            self.assertEqual(catalog['bar'], 'Item')
+            self.assertEqual(catalog[u'second'], 'Text with "quotes"')
+
+    def test_catalog_formats_keep_same_text_of_conflicting_identifiers(self):
+        """Test if the po-, mo- and catalog-export keep the same text of texts with the same identifier."""
+        texts = [TextElement('same', 'Later', 'b.bmml', None), TextElement('same', 'Earlier', 'a.bmml', None)]
+        OutputExporter(list(texts)).export(self.output_file, output_format='po')
+        self.assertIn('msgid "same"\nmsgstr "Earlier"\n', self.read_output())
+        self.assertNotIn('Later', self.read_output())
+        OutputExporter(list(texts)).export(self.output_file, output_format='mo')
+        self.assertEqual(self.mo_lookup(self.read_output(), 'same'), 'Earlier')
+        OutputExporter(list(texts)).export(self.output_file, output_format='catalog')
+        with CompactCatalog(self.output_file) as catalog:
+            self.assertEqual(catalog['same'], 'Earlier')
+
+    def test_sorted_texts_merges_runs_without_changing_texts(self):
+        """Test if the texts are returned in the total order of the elements and the given texts are not changed."""
+        texts = [TextElement('b', 'Second', 'b.bmml', None), TextElement('z', 'Item', 'a.bmml', None, 1),
+                 TextElement('z', 'Item', 'a.bmml', None, 0), TextElement('c', 'Text', 'c.bmml', None),
+                 TextElement('a', 'First', 'b.bmml', None), TextElement('y', 'Other', 'a.bmml', None)]
+        given = list(texts)
+        exporter = OutputExporter(texts)
+        self.assertEqual([(txt.filename, txt.identifier, txt.index) for txt in exporter.sorted_texts()],
+                         [('a.bmml', 'y', ''), ('a.bmml', 'z', 0), ('a.bmml', 'z', 1), ('b.bmml', 'a', ''), ('b.bmml', 'b', ''), ('c.bmml', 'c', '')])
+        exporter.export(self.output_file)
+        self.assertEqual([id(txt) for txt in texts], [id(txt) for txt in given])
+        self.assertEqual(list(OutputExporter(tuple(texts)).sorted_texts()), sorted(texts))
+
+    def test_minified_exports_do_not_depend_on_extraction_order(self):
+        """Test if minified JSON-, sharded, delta- and fake-translation-exports are written in the order of the exports."""
+        texts = [TextElement('z', 'Item', 'b.bmml', None), TextElement('a', 'First', 'b.bmml', None),
+                 TextElement('y', 'Other', 'a.bmml', None), TextElement('b', 'Second', 'a.bmml', None)]
+        baseline = os.path.join(self.directory, 'baseline.json')
+        OutputExporter(texts[:1]).export(baseline, json_format=True)
+        outputs = []
+        for given in (texts, texts[2:] + texts[:2]):
+            exporter = OutputExporter(list(given))
+            exporter.export(self.output_file, json_format=True, minified=True)
+            output = [self.read_output()]
+            exporter.export_delta(self.output_file, baseline, json_format=True, minified=True)
+            output.append(self.read_output())
+            exporter.export_localized(self.output_file + '_{locale}', [PseudoLocalizer('de')], json_format=True, minified=True)
+            with open(self.output_file + '_de') as inputfile:
+                output.append(inputfile.read())
+            shards = os.path.join(self.directory, 'shards')
+            exporter.export(shards, json_format=True, minified=True, shard_by='prefix')
+            output.extend(open(os.path.join(shards, name)).read() for name in sorted(os.listdir(shards)) if name != OutputExporter.SHARD_MANIFEST)
+            outputs.append(output)
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertTrue(outputs[0][0].index('"b"') < outputs[0][0].index('"y"') < outputs[0][0].index('"a"') < outputs[0][0].index('"z"'))
+
+    def read_shards(self):
+        """Return the manifest of the sharded export and the texts of every shard read like a JSON-export."""
+        with open(os.path.join(self.output_file, OutputExporter.SHARD_MANIFEST)) as manifest:
+            shards = json.load(manifest)['shards']
+        texts = {}
+        for name, shard in shards.items():
+            with open(os.path.join(self.output_file, shard['file']), 'rb') as shardfile:
+                self.assertEqual(hashlib.sha1(shardfile.read()).hexdigest(), shard['sha1'])
+            texts[name] = json.load(open(os.path.join(self.output_file, shard['file'])))
+            self.assertEqual(len(texts[name]), shard['texts'])
+        return shards, texts
+
+    def test_sharded_export(self):
+        """Test if the texts are split into shards by mockup-file and by prefix of their identifiers."""
+        self.texts.append(TextElement('first_item', 'Item', 'c/d.bmml', None))
+        OutputExporter(list(self.texts)).export(self.output_file, shard_by='file')
+        shards, texts = self.read_shards()
+        self.assertEqual(sorted(shards), ['a.bmml', 'b.bmml', 'c/d.bmml'])
+        self.assertEqual(shards['c/d.bmml']['file'], 'c_d.bmml.json')
+        self.assertEqual(texts['a.bmml'], {'bar': 'Item', 'first': '<b>Bold</b><br />text', 'path': 'C:\\temp\\%C3%84'})
+        self.assertEqual(texts['b.bmml'], {'second': 'Text%20with%20%22quotes%22'})
+        OutputExporter(list(self.texts)).export(self.output_file, minified=True, shard_by='prefix')
+        shards, texts = self.read_shards()
+        self.assertEqual(sorted(shards), ['bar', 'first', 'path', 'second'])
+        self.assertEqual(texts['first'], {'first': '<b>Bold</b><br />text', 'first_item': 'Item'})
+        self.assertEqual(sorted(os.listdir(self.output_file)), ['bar.json', 'first.json', OutputExporter.SHARD_MANIFEST,
+                                                                'path.json', 'second.json'])
+
+    def test_sharded_export_does_not_overwrite_manifest(self):
+        """Test if a shard named like the manifest is written into another file."""
+        self.texts.append(TextElement('manifest_title', 'Title', 'a.bmml', None))
+        OutputExporter(list(self.texts)).export(self.output_file, shard_by='prefix')
+        shards, texts = self.read_shards()
+        self.assertEqual(shards['manifest']['file'], 'manifest-2.json')
+        self.assertEqual(texts['manifest'], {'manifest_title': 'Title'})
+
+    def test_sharded_export_keeps_unchanged_shards(self):
+        """Test if only the shards whose texts changed are rewritten."""
+        OutputExporter(list(self.texts)).export(self.output_file, shard_by='file')
+        shards, _ = self.read_shards()
+        for shard in shards.values():
+            os.utime(os.path.join(self.output_file, shard['file']), (0, 0))
+        self.texts[0] = TextElement('second', 'Changed', 'b.bmml', None)
+        OutputExporter(list(self.texts)).export(self.output_file, shard_by='file')
+        changed, texts = self.read_shards()
+        self.assertEqual(texts['b.bmml'], {'second': 'Changed'})
+        self.assertEqual(changed['a.bmml'], shards['a.bmml'])
+        self.assertNotEqual(changed['b.bmml']['sha1'], shards['b.bmml']['sha1'])
+        self.assertEqual(os.path.getmtime(os.path.join(self.output_file, 'a.bmml.json')), 0)
+        self.assertNotEqual(os.path.getmtime(os.path.join(self.output_file, 'b.bmml.json')), 0)
+
+    def test_export_merged(self):
+        """Test if replacing the texts of changed files in a previous export equals the export of all texts."""
+        changed = [TextElement('first', 'Changed', 'a.bmml', None), TextElement('added', 'Added', 'a.bmml', None)]
+        texts = changed + [self.texts[0], TextElement('third', 'Third', 'c.bmml', None)]
+        baseline = os.path.join(self.directory, 'baseline.xml')
+        for minified in (False, True):
+            OutputExporter(self.texts + [TextElement('deleted', 'Deleted', 'd.bmml', None), texts[-1]]).export(baseline, minified=minified)
+            kept = [(text, fragment) for text, fragment in ExportReader.read_fragments(baseline) if text.filename not in ('a.bmml', 'd.bmml')]
+            exporter = OutputExporter(list(changed))
+            self.assertEqual(exporter.export_merged(self.output_file, kept, minified), (2, 2))
+            merged = self.read_output()
+            OutputExporter(texts).export(self.output_file, minified=minified)
+            self.assertEqual(merged, self.read_output())
+            self.assertRaises(ValueError, exporter.export_merged, self.output_file, kept, not minified)
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(OutputExporterTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
@@ -0,0 +1,95 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that is used to generate fake-translations of extracted texts.
+"""
+
+import math
+import re
+import urllib
+
+class PseudoLocalizer:
+    """ Class that turns extracted texts into fake-translations for one locale.
+
+        The text is enclosed in the locale, like #GR# text #GR#. Optionally the letters are replaced by accented
+        letters and the text is expanded, so missing translations, wrong encodings and too small controls can be
+        found before the real translation is done. Html-markup, percent-encoded characters and html-entities in
+        the texts are not changed.
+    """
+
+    ACCENTED_LETTERS = dict((letter, urllib.quote(accented.encode('utf8'))) for letter, accented in
+                            zip('aceinouyACEINOUY', u'\xe5\xe7\xe9\xee\xf1\xf6\xfc\xfd\xc5\xc7\xc9\xce\xd1\xd6\xdc\xdd'))
+    """Percent-encoded accented letters replacing the plain letters of a text."""
+
+    TOKENS = re.compile(r'(<[^>]*>|%[0-9A-Fa-f]{2}|&#?\w+;)|([aceinouyACEINOUY])')
+    """Pattern of regular expression that matches markup, percent-encoded characters, html-entities and accentable letters."""
+
+    MARKUP = re.compile(r'<[^>]*>|&#?\w+;')
+    """Pattern of regular expression that matches html-markup and html-entities."""
+
+    ENCODED_CHARACTER = re.compile(r'%[C-Fc-f][0-9A-Fa-f](?:%[89ABab][0-9A-Fa-f])+|%[0-9A-Fa-f]{2}')
+    """Pattern of regular expression that matches percent-encoded characters, the bytes of utf-8-sequences are matched together."""
+
+    EXPANSION_CHARACTER = '~'
+    """Character the texts are expanded with."""
+
+    def __init__(self, locale, expansion=0.0, accents=False):
+        """ Constructor.
+
+            @param locale: locale the texts are enclosed in.
+            @param expansion: rate the length of the texts is increased by, like 0.3 for 30 percent (default 0.0)
+            @param accents: flag indicating if letters are replaced by accented letters (default False)
+        """
+        self.locale = locale
+        self.expansion = expansion
+        self.accents = accents
+
+    def accent(self, text):
+        """ Return text with its letters replaced by accented letters.
+
+            @param text: extracted text.
+        """
+        return self.TOKENS.sub(lambda match: match.group(1) or self.ACCENTED_LETTERS[match.group(2)], text)
+
+    def visible_length(self, text):
+        """ Return the number of characters of a text without markup, counting encoded characters as one character.
+
+            @param text: extracted text.
+        """
+        return len(self.ENCODED_CHARACTER.sub('x', self.MARKUP.sub('', text)))
+
+    def localize(self, text):
+        """ Return the fake-translation of a text.
+
+            @param text: extracted text.
+        """
+        expansion = ''
+        if self.expansion:
+            expansion = self.EXPANSION_CHARACTER * int(math.ceil(self.visible_length(text) * self.expansion))
+        if self.accents:
+            text = self.accent(text)
+        text = text + expansion
+        return '#' + self.locale + '# ' + text + ' #' + self.locale + '#'
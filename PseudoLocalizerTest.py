@@ -0,0 +1,51 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import unittest
+
+from PseudoLocalizer import PseudoLocalizer
+
+class PseudoLocalizerTest(unittest.TestCase):
+    """Unittests for class PseudoLocalizer."""
+
+    def test_enclose_in_locale(self):
+        """Test if texts are enclosed in the locale like the former fake-translations."""
+        self.assertEqual(PseudoLocalizer('GR').localize('Save <b>all</b>'), '#GR# Save <b>all</b> #GR#')
+
+    def test_accents_skip_markup_and_encoded_characters(self):
+        """Test if letters are accented but html-markup, percent-encoded characters and entities are kept."""
+        result = PseudoLocalizer('DE', accents=True).localize('Once<br />%C3%84 &amp; C%2B%2B')
+        self.assertEqual(result, '#DE# %C3%96%C3%B1%C3%A7%C3%A9<br />%C3%84 &amp; %C3%87%2B%2B #DE#')
+
+    def test_expansion_counts_visible_characters(self):
+        """Test if texts are expanded by the rate of their characters without markup."""
+        localizer = PseudoLocalizer('FR', expansion=0.5)
+        self.assertEqual(localizer.localize('<b>Gr%C3%B6%C3%9Fe</b>'), '#FR# <b>Gr%C3%B6%C3%9Fe</b>~~~ #FR#')
+        self.assertEqual(localizer.localize(''), '#FR#  #FR#')
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(PseudoLocalizerTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
@@ -0,0 +1,187 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that stores the text-elements extracted from balsamiq-mockup-files on disk.
+"""
+
+import cPickle
+import os
+import sqlite3
+import tempfile
+
+class SqliteTextRegistry(object):
+    """ Registry of text-elements that is stored in a temporary SQLite-database instead of memory.
+
+        It can be used instead of a TextRegistry for corpora whose texts do not fit into memory. Every appended
+        element is written to the database, the checks for duplicated elements, for elements with same identifier
+        but different text and for ignored texts are indexed queries. The elements are read back one at a time,
+        in the order they were appended in or, by in_export_order, in the order of the exports, so exporters
+        can write them without holding them in memory.
+
+        The index of the texts is only used by checks, it is created when it is used first. The database is
+        removed when the registry is closed.
+    """
+
+    spilled = True
+    """Flag indicating that the elements are not held in memory."""
+
+    CACHE_SIZE = 2048
+    """Size of the cache of the database in kilobytes."""
+
+    def __init__(self, elements=(), directory=None):
+        """ Constructor.
+
+            @param elements: text-elements the registry should be filled with (default empty).
+            @param directory: directory the database is created in (default directory for temporary files)
+        """
+        self.connection = None
+        handle, self.path = tempfile.mkstemp(prefix='mockupstrings', suffix='.sqlite', dir=directory)
+        os.close(handle)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute("PRAGMA cache_size = -%d" % self.CACHE_SIZE)
+        self.connection.execute("CREATE TABLE texts (number INTEGER PRIMARY KEY, identifier BLOB, text BLOB, filename BLOB, position, meta BLOB, element BLOB)")
+        self.connection.execute("CREATE INDEX texts_identifier ON texts (identifier)")
+        self.length = 0
+        self.text_index = False
+        self.extend(elements)
+
+    @staticmethod
+    def key(value):
+        """ Return a string or unicode as value of the database that is compared like the string.
+
+            @param value: string, unicode or None.
+        """
+        if value is None:
+            return None
+        if isinstance(value, unicode):
+            value = value.encode('utf8')
+        return sqlite3.Binary(value)
+
+    def append(self, element):
+        """ Append a text-element to the registry.
+
+            @param element: text-element that should be appended.
+        """
+        self.connection.execute("INSERT INTO texts (identifier, text, filename, position, meta, element) VALUES (?, ?, ?, ?, ?, ?)",
+                                (self.key(element.identifier), self.key(element.text), self.key(element.filename), element.index,
+                                 self.key(element.meta), sqlite3.Binary(cPickle.dumps(element, cPickle.HIGHEST_PROTOCOL))))
+        self.length += 1
+
+    def extend(self, elements):
+        """ Append all given text-elements to the registry.
+
+            @param elements: iterable of text-elements.
+        """
+        for element in elements:
+            self.append(element)
+
+    def read(self, order):
+        """ Return an iterator reading the elements one at a time in the given order.
+
+            @param order: ORDER BY-clause of the query.
+        """
+        for row in self.connection.execute("SELECT element FROM texts ORDER BY " + order):
+            yield cPickle.loads(str(row[0]))
+
+    def in_export_order(self):
+        """ Return an iterator reading the elements in the order of the exports, sorted by the database like by
+            TextElement.SORT_KEY. The integer indexes of items are ordered before the empty index of other elements,
+            like in python.
+        """
+        return self.read("filename, identifier, position, text, meta, number")
+
+    def __len__(self):
+        """Return the number of elements in the registry."""
+        return self.length
+
+    def __iter__(self):
+        """Return an iterator reading the elements one at a time in the order they were appended in."""
+        return self.read("number")
+
+    def __contains__(self, element):
+        """Return if an element with same identifier, text, metainformation and index is contained in the registry."""
+        return element in self.with_identifier(element.identifier)
+
+    def contains_text(self, text):
+        """ Return if a text-element with the given text is contained in the registry.
+
+            @param text: text of the wanted text-element.
+        """
+        if not self.text_index:
+            self.connection.execute("CREATE INDEX texts_text ON texts (text)")
+            self.text_index = True
+        return self.connection.execute("SELECT 1 FROM texts WHERE text = ? LIMIT 1", (self.key(text),)).fetchone() is not None
+
+    def with_identifier(self, identifier):
+        """ Return all text-elements with the given identifier in the order they were appended in.
+
+            @param identifier: identifier of the wanted text-elements.
+        """
+        rows = self.connection.execute("SELECT element FROM texts WHERE identifier = ? ORDER BY number", (self.key(identifier),))
+        return [cPickle.loads(str(row[0])) for row in rows]
+
+    def conflicts(self, element):
+        """ Return all text-elements that have got the same identifier but a different text than the given element.
+
+            @param element: text-element that should be checked.
+        """
+        return [old for old in self.with_identifier(element.identifier) if old.text != element.text]
+
+    def column(self, name):
+        """ Return an iterator over one attribute of all text-elements in the order they were appended in.
+
+            @param name: name of the attribute, like identifier, text, filename, meta or index.
+        """
+        for element in self.read("number"):
+            yield getattr(element, name)
+
+    def identifiers(self):
+        """Return an iterator over the identifiers of all text-elements in the order they were appended in."""
+        return self.column('identifier')
+
+    def texts(self):
+        """Return an iterator over the texts of all text-elements in the order they were appended in."""
+        return self.column('text')
+
+    def filenames(self):
+        """Return an iterator over the filenames of all text-elements in the order they were appended in."""
+        return self.column('filename')
+
+    def close(self):
+        """Close and remove the database."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __del__(self):
+        """Remove the database when the registry is not used anymore."""
+        self.close()
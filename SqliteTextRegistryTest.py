@@ -0,0 +1,81 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from SqliteTextRegistry import SqliteTextRegistry
+from TextElement import TextElement
+
+class SqliteTextRegistryTest(unittest.TestCase):
+    """Unittests for class SqliteTextRegistry."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.elements = [TextElement('id', 'text', 'b.bmml', None), TextElement('single', u'T\xe4xt', 'a.bmml', None),
+                         TextElement('id', 'text', 'a.bmml', 'meta'), TextElement('id', 'other', 'b.bmml', None, 1)]
+        self.registry = SqliteTextRegistry(self.elements, self.directory)
+
+    def tearDown(self):
+        self.registry.close()
+        shutil.rmtree(self.directory)
+
+    def test_reads_elements_in_appended_order(self):
+        """Test if the elements are read back equal and in the order they were appended in."""
+        self.assertEqual(len(self.registry), 4)
+        self.assertEqual([(element.identifier, element.text, element.filename, element.meta, element.index) for element in self.registry],
+                         [(element.identifier, element.text, element.filename, element.meta, element.index) for element in self.elements])
+        self.assertEqual(list(self.registry.filenames()), ['b.bmml', 'a.bmml', 'a.bmml', 'b.bmml'])
+
+    def test_reads_elements_in_export_order(self):
+        """Test if the elements are read in the order of a sorted list in export order."""
+        self.registry.append(TextElement('id', 'text', 'b.bmml', None, 0))
+        self.assertEqual([(element.filename, element.identifier, element.index, element.text) for element in self.registry.in_export_order()],
+                         [(element.filename, element.identifier, element.index, element.text) for element in sorted(self.registry)])
+        self.assertEqual([element.filename for element in self.registry], ['b.bmml', 'a.bmml', 'a.bmml', 'b.bmml', 'b.bmml'])
+
+    def test_checks(self):
+        """Test if equal elements, conflicting elements and texts are found like in a TextRegistry."""
+        self.assertTrue(TextElement('id', 'text', 'c.bmml', 'meta') in self.registry)
+        self.assertFalse(TextElement('id', 'text', 'c.bmml', 'other meta') in self.registry)
+        self.assertEqual(self.registry.with_identifier('id'), [self.elements[0], self.elements[2], self.elements[3]])
+        self.assertEqual(self.registry.conflicts(TextElement('id', 'text', 'c.bmml', None)), [self.elements[3]])
+        self.assertTrue(self.registry.contains_text(u'T\xe4xt'))
+        self.assertFalse(self.registry.contains_text('missing'))
+        self.registry.append(TextElement('new', 'missing', 'c.bmml', None))
+        self.assertTrue(self.registry.contains_text('missing'))
+
+    def test_close_removes_database(self):
+        """Test if the database is removed when the registry is closed."""
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        self.registry.close()
+        self.assertEqual(os.listdir(self.directory), [])
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(SqliteTextRegistryTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
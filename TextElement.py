@@ -23,10 +23,22 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 '''
 
-class TextElement:
-    """Class holding information of text-elements and their text."""
+import operator
+
+class TextElement(object):
+    """ Class holding information of text-elements and their text.
+
+        The attributes are stored in slots instead of a dictionary per element. Filenames and meta-informations
+        are interned, so all elements of a file and all elements with the same meta-information share one string,
+        also after they were unpickled.
+    """
     # pylint: disable-msg=R0903
     # pylint: disable-msg=R0913
+    __slots__ = ('identifier', 'text', 'filename', 'meta', 'index')
+
+    SORT_KEY = operator.attrgetter('filename', 'identifier', 'index', 'text', 'meta')
+    """Function returning the key of the order of the exports, by filename, identifier and index, for a text-element."""
+
     def __init__(self, identifier, text, filename, metainfo, index=""):
         """Constructor.
 
@@ -37,16 +49,40 @@ class TextElement:
         """
         self.identifier = identifier
         self.text = text
-        self.filename = filename
-        self.meta = metainfo
+        self.filename = self.share(filename)
+        self.meta = self.share(metainfo)
         self.index = index
 
+    @staticmethod
+    def share(value):
+        """ Return the interned string equal to value, so equal strings are stored once. Other values are returned unchanged.
+
+            @param value: string, unicode or None.
+        """
+        if type(value) is str:
+            return intern(value)
+        return value
+
+    def __reduce__(self):
+        """Method that returns the arguments of the constructor, so pickled elements are small and share their strings."""
+        return (TextElement, (self.identifier, self.text, self.filename, self.meta, self.index))
+
     def __eq__(self, other):
         """Method that checks if two instances of this class are equal."""
         if self.identifier != other.identifier or self.text != other.text or self.meta != other.meta or self.index != other.index:
             return False
         return True
 
+    def __ne__(self, other):
+        """Method that checks if two instances of this class are not equal."""
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        """Method that returns a hash matching the equality of two instances of this class."""
+        return hash((self.identifier, self.text, self.meta, self.index))
+
     def __lt__(self, other):
-        """ Method used for sorting text-elements for export in output-file."""
-        return self.filename < other.filename
\ No newline at end of file
+        """ Method used for sorting text-elements for export in output-file, by filename, identifier and index.
+            Elements equal in these are ordered by their text and metainformation, so the order is total.
+        """
+        return self.SORT_KEY(self) < self.SORT_KEY(other)
\ No newline at end of file
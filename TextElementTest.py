@@ -0,0 +1,66 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import cPickle
+import unittest
+
+from TextElement import TextElement
+
+class TextElementTest(unittest.TestCase):
+    """Unittests for class TextElement."""
+
+    def test_equality(self):
+        """Test if elements are equal if identifier, text, metainformation and index are equal."""
+        element = TextElement('id', 'text', 'first.bmml', 'meta')
+        self.assertEqual(element, TextElement('id', 'text', 'second.bmml', 'meta'))
+        self.assertEqual(hash(element), hash(TextElement('id', 'text', 'second.bmml', 'meta')))
+        self.assertNotEqual(element, TextElement('id', 'text', 'first.bmml', 'meta', 1))
+        self.assertFalse(element != TextElement('id', 'text', 'second.bmml', 'meta'))
+
+    def test_sorted_by_filename_identifier_and_index(self):
+        """Test if elements are sorted by their filename, identifier and index, and by text and metainformation else."""
+        elements = [TextElement('c', 'text', 'b.bmml', None), TextElement('b', 'text', 'a.bmml', None), TextElement('a', 'text', 'b.bmml', None, 1),
+                    TextElement('a', 'text', 'b.bmml', None, 0), TextElement('a', 'text', 'b.bmml', 'meta'), TextElement('a', 'other', 'b.bmml', None)]
+        self.assertEqual([(element.identifier, element.index, element.text, element.meta) for element in sorted(elements)],
+                         [('b', '', 'text', None), ('a', 0, 'text', None), ('a', 1, 'text', None), ('a', '', 'other', None),
+                          ('a', '', 'text', 'meta'), ('c', '', 'text', None)])
+        self.assertEqual(sorted(elements, key=TextElement.SORT_KEY), sorted(elements))
+
+    def test_shares_strings(self):
+        """Test if filenames and metainformation of elements are stored once, also after pickling."""
+        first = TextElement('first', 'text', ''.join(['mockup', '.bmml']), ''.join(['me', 'ta']))
+        second = TextElement('second', 'text', ''.join(['mock', 'up.bmml']), ''.join(['m', 'eta']))
+        self.assertTrue(first.filename is second.filename)
+        self.assertTrue(first.meta is second.meta)
+        self.assertFalse(hasattr(first, '__dict__'))
+        for protocol in (0, cPickle.HIGHEST_PROTOCOL):
+            copy = cPickle.loads(cPickle.dumps(first, protocol))
+            self.assertEqual((copy.identifier, copy.text, copy.meta, copy.index), ('first', 'text', 'meta', ''))
+            self.assertTrue(copy.filename is first.filename)
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(TextElementTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
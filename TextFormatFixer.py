@@ -28,6 +28,9 @@ import re
 class TextFormatFixer():
     """Class that fixes format from balsamiq-mockups to plain text."""
 
+    spacesAfterBrPattern = re.compile(r'<br />[ ]*')
+    """Pattern of regular expression that matches a html-linebreak and the whitespaces after it."""
+
     def __init__(self):
         pass
 
@@ -75,6 +78,6 @@ class TextFormatFixer():
             @param text: Text that should be corrected.
         """
         try:
-            return re.sub(r'<br />[ ]*', '<br />', text)
+            return TextFormatFixer.spacesAfterBrPattern.sub('<br />', text)
         except:
             return ''
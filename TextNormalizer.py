@@ -0,0 +1,175 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that normalizes the format of texts from balsamiq-mockup-files in one pass.
+"""
+
+import itertools
+import logging
+import re
+
+class TextNormalizer():
+    """ Class that converts the formating of texts in mockups to the format used in exported texts.
+
+        It gives the same result as AdvancedMockupStringExtractor.substitute_formatingchars followed by
+        TextFormatFixer.fix_text but scans the text only once. The text is split by one precompiled pattern into
+        tokens and the characters between them. Whitespaces before or after linebreaks and list-items are dropped
+        depending on the tokens around them, so the whitespaces the former chain of replacements removed are
+        not written at all.
+    """
+
+    TOKENS = re.compile(r' \s*|\t\s*|\n\s*|\r\s*|\x0b\s*|\x0c\s*|%0A|<br\s+/>|breakNewLine|<li>|\*|<br%20/>')
+    """ Pattern of all tokens whose formating is changed. Every alternative starts with a literal character, so the
+        regular expression engine skips all other characters without trying the alternatives.
+    """
+
+    CHARACTERS, WHITESPACE, LINEBREAK, BREAK_NEW_LINE, LIST_ITEM, ASTERISK, HTML_LINEBREAK = range(7)
+    """Kinds of tokens, CHARACTERS is the kind of the text between two tokens."""
+
+    TOKEN_KINDS = {'%0A': LINEBREAK, 'breakNewLine': BREAK_NEW_LINE, '<li>': LIST_ITEM, '*': ASTERISK, '<br%20/>': HTML_LINEBREAK}
+    """Kinds of tokens that are matched literally, other tokens are whitespaces or linebreaks with whitespaces."""
+
+    @staticmethod
+    def normalize_text(text):
+        """ Return the text of a mockup-element in the format used in exported texts.
+
+            @param text: text from mockup containing format-information.
+        """
+        return TextNormalizer.normalize(text, True)
+
+    @staticmethod
+    def normalize_markup(text):
+        """ Return text with formating chars replaced by html-markup, html-whitespaces are kept.
+            This is used for the metainformation of mockup-elements.
+
+            @param text: text from mockup containing format-information.
+        """
+        return TextNormalizer.normalize(text, False)
+
+    @staticmethod
+    def normalize(text, replace_html_whitespaces):
+        """ Return text with formating chars replaced by html-markup.
+
+            Newlines become linebreaks, every sequence of whitespaces becomes one whitespace and whitespaces next
+            to linebreaks and list-items are removed. Text between pairs of asterisks is marked bold. If
+            replace_html_whitespaces is set, html-whitespaces are replaced, whitespaces after linebreaks are
+            removed and the result is stripped.
+
+            @param text: text from mockup containing format-information.
+            @param replace_html_whitespaces: flag indicating if html-whitespaces should be replaced.
+        """
+        if text is None:
+            logging.debug("Trying to substitute formating and html-chars in empty string.")
+            return ''
+        text = text.strip()
+        paired_asterisks = text.count('*') // 2 * 2
+        asterisks = 0
+        result = []
+        previous = None
+        whitespace = False
+        after_linebreak = False
+        position = 0
+        for match in itertools.chain(TextNormalizer.TOKENS.finditer(text), [None]):
+            if match is None:
+                start = end = len(text)
+                kind = TextNormalizer.CHARACTERS
+            else:
+                start, end = match.span()
+                kind = TextNormalizer.TOKEN_KINDS.get(match.group())
+                if kind is None:
+                    kind = TextNormalizer.LINEBREAK if text[start] == '<' else TextNormalizer.WHITESPACE
+            if start > position:
+                characters = text[position:start]
+                if replace_html_whitespaces:
+                    characters = characters.replace('%20', ' ')
+                    if after_linebreak:
+                        characters = characters.lstrip(' ')
+                TextNormalizer.append_whitespaces(result, previous, TextNormalizer.CHARACTERS, whitespace, replace_html_whitespaces and after_linebreak)
+                result.append(characters)
+                previous = TextNormalizer.CHARACTERS
+                whitespace = False
+                after_linebreak = after_linebreak and not characters
+            position = end
+            if kind == TextNormalizer.CHARACTERS:
+                continue
+            if kind == TextNormalizer.WHITESPACE:
+                whitespace = True
+                continue
+            TextNormalizer.append_whitespaces(result, previous, kind, whitespace, replace_html_whitespaces and after_linebreak)
+            whitespace = False
+            if kind == TextNormalizer.LINEBREAK or kind == TextNormalizer.BREAK_NEW_LINE:
+                result.append('<br />')
+                previous = TextNormalizer.LINEBREAK
+                after_linebreak = True
+            elif kind == TextNormalizer.LIST_ITEM:
+                result.append('<li>')
+                previous = TextNormalizer.LIST_ITEM
+                after_linebreak = False
+            elif kind == TextNormalizer.ASTERISK:
+                if asterisks == paired_asterisks:
+                    result.append('*')
+                elif asterisks % 2:
+                    result.append('</b>')
+                else:
+                    result.append('<b>')
+                asterisks += 1
+                previous = TextNormalizer.CHARACTERS
+                after_linebreak = False
+            elif replace_html_whitespaces:
+                result.append('<br />')
+                previous = TextNormalizer.CHARACTERS
+                after_linebreak = True
+            else:
+                result.append(match.group())
+                previous = TextNormalizer.CHARACTERS
+        result = text[:0].join(result)
+        if replace_html_whitespaces:
+            result = result.strip()
+        return result
+
+    @staticmethod
+    def append_whitespaces(result, previous, kind, whitespace, after_linebreak):
+        """ Append the whitespaces that remain between two tokens.
+
+            One whitespace from the text and one more before a breakNewLine are removed by the linebreak before them
+            and by the linebreak or list-item after them. A list-item before them only removes a whitespace that is
+            left then. Whitespaces after a linebreak are removed completely when html-whitespaces are replaced.
+
+            @param result: list of parts of the normalized text.
+            @param previous: kind of the token before the whitespaces.
+            @param kind: kind of the token after the whitespaces.
+            @param whitespace: flag indicating if there were whitespaces in the text between the two tokens.
+            @param after_linebreak: flag indicating if all whitespaces after a linebreak are removed.
+        """
+        count = whitespace + (kind == TextNormalizer.BREAK_NEW_LINE)
+        if count and previous == TextNormalizer.LINEBREAK:
+            count -= 1
+        if count and (kind == TextNormalizer.LINEBREAK or kind == TextNormalizer.BREAK_NEW_LINE or kind == TextNormalizer.LIST_ITEM):
+            count -= 1
+        if count and previous == TextNormalizer.LIST_ITEM:
+            count -= 1
+        if count and not after_linebreak:
+            result.append(' ' * count)
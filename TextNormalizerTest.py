@@ -0,0 +1,79 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import random
+import re
+import unittest
+
+from TextFormatFixer import TextFormatFixer
+from TextNormalizer import TextNormalizer
+
+def substitute_formatingchars(text):
+    """Chain of replacements the extractor used before TextNormalizer, used as reference for the tests."""
+    result = text.replace("%0A", "<br />")
+    result = re.sub(r'\s+', ' ', result).strip()
+    result = result.replace("breakNewLine", ' <br />')
+    result = result.replace("<br /> ", "<br />")
+    result = result.replace(" <br />", "<br />")
+    result = result.replace(" <li>", "<li>")
+    result = result.replace("<li> ", "<li>")
+    return re.sub(r'\*(.*?)\*', r'<b>\1</b>', result)
+
+FRAGMENTS = ["a", "b", " ", "  ", "\t", "\n", "\r\n", "%0A", "%20", "%2", "0", "A", "%", "<br />", "<br", "/>",
+             "<br  />", "<br%20/>", "breakNewLine", "break", "NewLine", "<li>", "<li", ">", "*", "**", "<", "/", "br",
+             u"\xa0", u"\xe4"]
+
+class TextNormalizerTest(unittest.TestCase):
+    """Unittests for class TextNormalizer."""
+
+    def test_normalize_text(self):
+        """Test if formating chars are replaced by html-markup and whitespaces are removed."""
+        result = TextNormalizer.normalize_text(' *Bold*%20text \n with%0A  a breakNewLine<li> item ')
+        self.assertEqual(result, '<b>Bold</b> text with<br />a <br /><li>item')
+
+    def test_normalize_markup_keeps_html_whitespaces(self):
+        """Test if html-whitespaces are kept in metainformation."""
+        result = TextNormalizer.normalize_markup('Meta%20information%0A  with *unpaired asterisk')
+        self.assertEqual(result, 'Meta%20information<br />with *unpaired asterisk')
+
+    def test_normalize_none(self):
+        """Test if missing texts are normalized to an empty string."""
+        self.assertEqual(TextNormalizer.normalize_text(None), '')
+        self.assertEqual(TextNormalizer.normalize_markup(None), '')
+
+    def test_equals_chain_of_replacements(self):
+        """Test if random texts are normalized like by the former chain of replacements."""
+        generator = random.Random(4711)
+        for _ in range(20000):
+            text = u''.join(generator.choice(FRAGMENTS) for _ in range(generator.randint(0, 16)))
+            for sample in (text, text.encode('utf8')):
+                markup = substitute_formatingchars(sample)
+                self.assertEqual(TextNormalizer.normalize_markup(sample), markup, repr(sample))
+                self.assertEqual(TextNormalizer.normalize_text(sample), TextFormatFixer.fix_text(markup), repr(sample))
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(TextNormalizerTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)
@@ -0,0 +1,129 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+"""This module containes a class that stores the text-elements extracted from balsamiq-mockup-files.
+"""
+
+import operator
+
+class TextRegistry(list):
+    """ List of text-elements that is indexed by the identifier and by the content of its elements.
+
+        The indexes make the checks for duplicated elements, for elements with same identifier but
+        different text and for ignored texts independent from the number of elements that were already extracted. The elements
+        are kept in the order they were appended in, so this class can be used like a list by exporters.
+        Only append and extend keep the indexes up to date.
+
+        Most identifiers belong to one element, so the index by identifier holds single elements and only lists
+        for identifiers of more than one element. Duplicated elements are found by comparing the elements with
+        the same identifier, so no further index of the elements is needed. The index of the texts is only used
+        by checks, it is built when it is used first.
+    """
+
+    spilled = False
+    """Flag indicating that the elements are not held in memory, see SqliteTextRegistry."""
+
+    def __init__(self, elements=()):
+        """ Constructor.
+
+            @param elements: text-elements the registry should be filled with (default empty).
+        """
+        list.__init__(self)
+        self.by_identifier = {}
+        self.contents = None
+        self.extend(elements)
+
+    def append(self, element):
+        """ Append a text-element to the registry and add it to the indexes.
+
+            @param element: text-element that should be appended.
+        """
+        list.append(self, element)
+        old = self.by_identifier.setdefault(element.identifier, element)
+        if old is not element:
+            if type(old) is list:
+                old.append(element)
+            else:
+                self.by_identifier[element.identifier] = [old, element]
+        if self.contents is not None:
+            self.contents.add(element.text)
+
+    def extend(self, elements):
+        """ Append all given text-elements to the registry.
+
+            @param elements: iterable of text-elements.
+        """
+        for element in elements:
+            self.append(element)
+
+    def __contains__(self, element):
+        """Return if an element with same identifier, text, metainformation and index is contained in the registry."""
+        return element in self.with_identifier(element.identifier)
+
+    def contains_text(self, text):
+        """ Return if a text-element with the given text is contained in the registry.
+
+            @param text: text of the wanted text-element.
+        """
+        if self.contents is None:
+            self.contents = set(self.texts())
+        return text in self.contents
+
+    def with_identifier(self, identifier):
+        """ Return all text-elements with the given identifier in the order they were appended in.
+
+            @param identifier: identifier of the wanted text-elements.
+        """
+        elements = self.by_identifier.get(identifier, [])
+        if type(elements) is list:
+            return elements
+        return [elements]
+
+    def conflicts(self, element):
+        """ Return all text-elements that have got the same identifier but a different text than the given element.
+
+            @param element: text-element that should be checked.
+        """
+        return [old for old in self.with_identifier(element.identifier) if old.text != element.text]
+
+    def column(self, name):
+        """ Return one attribute of all text-elements in the order they were appended in.
+
+            @param name: name of the attribute, like identifier, text, filename, meta or index.
+        """
+        return map(operator.attrgetter(name), self)
+
+    def identifiers(self):
+        """Return the identifiers of all text-elements in the order they were appended in."""
+        return self.column('identifier')
+
+    def texts(self):
+        """Return the texts of all text-elements in the order they were appended in."""
+        return self.column('text')
+
+    def filenames(self):
+        """Return the filenames of all text-elements in the order they were appended in."""
+        return self.column('filename')
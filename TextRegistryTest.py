@@ -0,0 +1,81 @@
+# coding: utf-8
+'''
+The MIT License (MIT)
+
+Copyright (c) 2014 Andreas "Akki" Nitsch
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+'''
+
+
+import unittest
+
+from TextElement import TextElement
+from TextRegistry import TextRegistry
+
+class TextRegistryTest(unittest.TestCase):
+    """Unittests for class TextRegistry."""
+
+    def test_contains_equal_element(self):
+        """Test if an element with same identifier, text, metainformation and index is found in the registry."""
+        registry = TextRegistry([TextElement('id', 'text', 'first.bmml', 'meta')])
+        self.assertTrue(TextElement('id', 'text', 'second.bmml', 'meta') in registry)
+        self.assertFalse(TextElement('id', 'text', 'first.bmml', 'other meta') in registry)
+        self.assertFalse(TextElement('id', 'text', 'first.bmml', 'meta', 1) in registry)
+
+    def test_conflicts_with_different_text(self):
+        """Test if elements with same identifier but different text are returned as conflicts in appended order."""
+        first = TextElement('id', 'first text', 'first.bmml', None)
+        second = TextElement('id', 'second text', 'second.bmml', None)
+        registry = TextRegistry([first, TextElement('other', 'first text', 'first.bmml', None), second])
+        self.assertEqual(registry.conflicts(TextElement('id', 'third text', 'third.bmml', None)), [first, second])
+        self.assertEqual(registry.conflicts(TextElement('id', 'first text', 'third.bmml', None)), [second])
+
+    def test_contains_text(self):
+        """Test if texts of appended elements are found independent from their identifier."""
+        registry = TextRegistry([TextElement('id', 'text', 'first.bmml', None)])
+        self.assertTrue(registry.contains_text('text'))
+        self.assertFalse(registry.contains_text('other text'))
+
+    def test_indexes_elements_with_same_identifier(self):
+        """Test if single elements and elements sharing their identifier are found by their identifier."""
+        elements = [TextElement('id', 'text', 'first.bmml', None), TextElement('single', 'text', 'first.bmml', None),
+                    TextElement('id', 'text', 'second.bmml', 'meta'), TextElement('id', 'other', 'second.bmml', None)]
+        registry = TextRegistry(elements)
+        self.assertEqual(registry.with_identifier('id'), [elements[0], elements[2], elements[3]])
+        self.assertEqual(registry.with_identifier('single'), [elements[1]])
+        self.assertEqual(registry.with_identifier('missing'), [])
+
+    def test_columns(self):
+        """Test if the columns contain the attributes of all elements in appended order."""
+        registry = TextRegistry([TextElement('first', 'First', 'b.bmml', None), TextElement('second', 'Second', 'a.bmml', 'meta', 1)])
+        self.assertEqual(registry.identifiers(), ['first', 'second'])
+        self.assertEqual(registry.texts(), ['First', 'Second'])
+        self.assertEqual(registry.filenames(), ['b.bmml', 'a.bmml'])
+        self.assertEqual(registry.column('index'), ['', 1])
+
+    def test_keeps_appended_order(self):
+        """Test if the registry keeps the order the elements were appended in."""
+        elements = [TextElement(str(number), 'text', 'file.bmml', None) for number in range(5, 0, -1)]
+        registry = TextRegistry(elements)
+        self.assertEqual(list(registry), elements)
+
+if __name__ == '__main__':
+    TESTSUITE = unittest.TestLoader().loadTestsFromTestCase(TextRegistryTest)
+    unittest.TextTestRunner(verbosity=1).run(TESTSUITE)